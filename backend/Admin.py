@@ -0,0 +1,110 @@
+import hmac
+import math
+import os
+from functools import wraps
+
+from flask import Blueprint, Response, jsonify, request
+from validators import json_error
+from consultas_lentas import entradas, establecer_umbral, limpiar, umbral_ms
+from perfilado import obtener_perfil, perfiles
+
+bp = Blueprint('admin', __name__)
+
+
+def token_admin_valido() -> bool:
+    """
+    True si el request trae el token de ADMIN_TOKEN en el header X-Admin-Token.
+    Nunca por query string: quedaría en los logs de acceso, del proxy y en el
+    historial del navegador.
+    """
+    esperado = os.environ.get('ADMIN_TOKEN')
+    if not esperado:
+        return False
+    recibido = request.headers.get('X-Admin-Token') or ''
+    return hmac.compare_digest(recibido.encode(), esperado.encode())
+
+
+def requiere_admin(f):
+    """
+    Restringe la ruta a quien envíe el token de administrador.
+    Sin ADMIN_TOKEN configurado la ruta no existe.
+    """
+    @wraps(f)
+    def envoltura(*args, **kwargs):
+        if not os.environ.get('ADMIN_TOKEN'):
+            return json_error('No encontrado', 404)
+        if not token_admin_valido():
+            return json_error('Token de administrador inválido', 403)
+        return f(*args, **kwargs)
+    return envoltura
+
+
+@bp.route('/admin/consultas-lentas', methods=['GET'])
+@requiere_admin
+def listar_consultas_lentas():
+    """
+    GET /api/admin/consultas-lentas[?limit=<n>]
+    Consultas que superaron el umbral, de la más reciente a la más antigua,
+    con su plan de ejecución.
+    """
+    registros = entradas()
+    limit = request.args.get('limit', type=int)
+    if limit is not None and limit >= 0:
+        registros = registros[:limit]
+    return jsonify({'umbralMs': umbral_ms(), 'total': len(registros), 'consultas': registros})
+
+
+@bp.route('/admin/consultas-lentas/umbral', methods=['PUT'])
+@requiere_admin
+def cambiar_umbral_consultas_lentas():
+    """
+    PUT /api/admin/consultas-lentas/umbral  {"umbralMs": <ms>}
+    Cambia el umbral en caliente para este proceso (0 apaga el registro).
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        valor = float(data.get('umbralMs'))
+    except (TypeError, ValueError):
+        return json_error('umbralMs debe ser un número de milisegundos', 400)
+    if not math.isfinite(valor) or valor < 0:
+        return json_error('umbralMs debe ser un número de milisegundos mayor o igual a 0', 400)
+    establecer_umbral(valor)
+    return jsonify({'umbralMs': umbral_ms()})
+
+
+@bp.route('/admin/consultas-lentas', methods=['DELETE'])
+@requiere_admin
+def limpiar_consultas_lentas():
+    limpiar()
+    return jsonify({'ok': True})
+
+
+@bp.route('/admin/perfiles', methods=['GET'])
+@requiere_admin
+def listar_perfiles():
+    """GET /api/admin/perfiles - perfiles guardados (sin las pilas)"""
+    return jsonify(perfiles())
+
+
+@bp.route('/admin/perfiles/<int:id>', methods=['GET'])
+@requiere_admin
+def get_perfil(id: int):
+    """
+    GET /api/admin/perfiles/<id>
+    Perfil completo: pilas en formato folded (o estadísticas de cProfile)
+    y línea de tiempo SQL del request.
+    """
+    perfil = obtener_perfil(id)
+    if perfil is None:
+        return json_error('Perfil no encontrado', 404)
+    return jsonify(perfil)
+
+
+@bp.route('/admin/perfiles/<int:id>/folded', methods=['GET'])
+@requiere_admin
+def get_perfil_folded(id: int):
+    """GET /api/admin/perfiles/<id>/folded - texto listo para flamegraph.pl o speedscope"""
+    perfil = obtener_perfil(id)
+    if perfil is None or 'folded' not in perfil:
+        return json_error('Perfil por muestreo no encontrado', 404)
+    return Response(perfil['folded'], mimetype='text/plain')
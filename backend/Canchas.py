@@ -1,22 +1,21 @@
 from flask import Blueprint, request, jsonify, send_from_directory
 from flask import send_file
+import logging
 import os
 from werkzeug.utils import secure_filename
 from uuid import uuid4
 from database.mapeoCanchas import SessionLocal, Cancha, Deporte, EstadoCancha, CanchaxServicio
-from basicas import _to_dict
+from basicas import _to_dict, _proyectar
+from validators import json_error, parse_fields
+from services.precios_service import invalidar_precios
 # import engine/Base for reflection fallback
 from backend.database import engine
 from sqlalchemy import Table, select, MetaData
 from io import BytesIO
-import urllib.request
-try:
-    from PIL import Image
-    PIL_AVAILABLE = True
-except Exception:
-    PIL_AVAILABLE = False
+from opcionales import pil_image
 
 bp = Blueprint('canchas', __name__)
+logger = logging.getLogger(__name__)
 
 # Upload folder (relative to project root)
 UPLOAD_FOLDER = os.path.join(os.path.dirname(__file__), '..', 'uploads')
@@ -69,6 +68,7 @@ def cancha_imagen(idCancha):
     - If PIL is available, we open and re-encode the image to ensure valid MIME and optionally
       provide a consistent response (JPEG/PNG). If not available, we stream bytes directly.
     """
+    Image = pil_image()
     session = SessionLocal()
     try:
         c = session.get(Cancha, idCancha)
@@ -80,7 +80,7 @@ def cancha_imagen(idCancha):
             filename = img.split('/uploads/',1)[1]
             full = os.path.abspath(os.path.join(UPLOAD_FOLDER, filename))
             if os.path.exists(full):
-                if PIL_AVAILABLE:
+                if Image is not None:
                     try:
                         im = Image.open(full)
                         bio = BytesIO()
@@ -100,7 +100,7 @@ def cancha_imagen(idCancha):
             assets_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'frontend-react', 'public', 'assets'))
             full = os.path.join(assets_dir, asset_name)
             if os.path.exists(full):
-                if PIL_AVAILABLE:
+                if Image is not None:
                     try:
                         im = Image.open(full)
                         bio = BytesIO(); fmt = 'JPEG' if im.format is None else im.format
@@ -114,10 +114,11 @@ def cancha_imagen(idCancha):
 
         # remote URL
         if img.startswith('http://') or img.startswith('https://'):
+            from urllib.request import urlopen
             try:
-                with urllib.request.urlopen(img, timeout=8) as resp:
+                with urlopen(img, timeout=8) as resp:
                     data = resp.read()
-                if PIL_AVAILABLE:
+                if Image is not None:
                     try:
                         im = Image.open(BytesIO(data))
                         bio = BytesIO(); fmt = 'JPEG' if im.format is None else im.format
@@ -207,6 +208,7 @@ def registrar_cancha():
                 except Exception:
                     session.rollback()
 
+            invalidar_precios(c.idCancha)
             return jsonify(_to_dict(c)), 201
 
         # Fallback: JSON body create (existing behavior)
@@ -232,6 +234,7 @@ def registrar_cancha():
                 session.commit()
         except Exception:
             session.rollback()
+        invalidar_precios(c.idCancha)
         return jsonify(_to_dict(c)), 201
     except Exception as e:
         session.rollback()
@@ -242,8 +245,15 @@ def registrar_cancha():
 
 @bp.route("/canchas", methods=["GET"])
 def listar_canchas():
+    """Con `?fields=a,b` sólo se consultan y devuelven esas columnas"""
+    try:
+        campos = parse_fields(request.args.get('fields'), Cancha)
+    except ValueError as e:
+        return json_error(str(e), 400)
     session = SessionLocal()
     try:
+        if campos:
+            return jsonify(_proyectar(Cancha, campos, session))
         rows = session.query(Cancha).all()
         return jsonify([_to_dict(r) for r in rows])
     finally:
@@ -356,6 +366,7 @@ def modificar_datos_cancha(idCancha):
             except Exception:
                 session.rollback()
         session.commit()
+        invalidar_precios(idCancha)
         return jsonify({'success': True})
     except Exception as e:
         session.rollback()
@@ -373,6 +384,7 @@ def eliminar_cancha(idCancha):
             return jsonify({'error': 'Cancha no encontrada'}), 404
         session.delete(c)
         session.commit()
+        invalidar_precios(idCancha)
         return jsonify({'success': True})
     except Exception as e:
         session.rollback()
@@ -414,7 +426,7 @@ def listar_estado_canchas():
             # Fallback: attempt to reflect the actual table schema and return rows
             # even if the ORM mapping doesn't match the DB. This helps when the
             # deployed SQLite file uses different column names than the model.
-            print(f"listar_estado_canchas: DB query failed: {e}")
+            logger.warning('listar_estado_canchas: falló la consulta ORM, se usa reflexión: %s', e)
             try:
                 # Reflect into a fresh MetaData to avoid clashes with ORM mappings
                 md = MetaData()
@@ -442,7 +454,7 @@ def listar_estado_canchas():
                     out.append({'idEstado': id_val, 'nombre': name_val})
                 return jsonify(out)
             except Exception as e2:
-                print(f"listar_estado_canchas: reflection fallback failed: {e2}")
+                logger.exception('listar_estado_canchas: falló también la reflexión: %s', e2)
                 return jsonify([])
     finally:
         session.close()
@@ -7,11 +7,15 @@ from database.mapeoCanchas import (
     DetalleReserva,
     CanchaxServicio,
     Horario,
+    Usuario,
+    Permiso,
     engine,
     DATABASE_URL,
 )
-from basicas import _to_dict
-from validators import validate_email, json_error
+from sqlalchemy import select
+from basicas import _to_dict, _proyectar
+from serializers import serializador_filas
+from validators import validate_email, json_error, parse_fields
 
 bp = Blueprint('clientes', __name__)
 
@@ -67,16 +71,80 @@ def registrar_cliente():
         session.close()
 
 
+def _clientes_con_usuario(session, campos=None) -> list:
+    """Clientes con su usuario y el nombre del permiso en una sola consulta (outer joins)"""
+    campos = campos or [attr.key for attr in Cliente.__mapper__.column_attrs]
+    atributos = Cliente.__mapper__.column_attrs
+    stmt = (
+        select(*(getattr(Cliente, c) for c in campos),
+               Usuario.idUsuario, Usuario.usuario, Usuario.permisos, Usuario.imagen, Permiso.nombre)
+        .outerjoin(Usuario, Usuario.idUsuario == Cliente.idUsuario)
+        .outerjoin(Permiso, Permiso.idPermiso == Usuario.permisos)
+        .order_by(Cliente.idCliente)
+    )
+    serializar = serializador_filas(campos, [atributos[c].columns[0].type for c in campos])
+    n = len(campos)
+    out = []
+    for fila in session.execute(stmt):
+        d = serializar(fila)
+        id_usuario, usuario, permisos, imagen, permiso_nombre = fila[n:]
+        # Sin la contraseña: el listado no la necesita
+        d['usuario'] = None if id_usuario is None else {
+            'idUsuario': id_usuario,
+            'usuario': usuario,
+            'permisos': permisos,
+            'imagen': imagen,
+            'permisoNombre': permiso_nombre,
+        }
+        out.append(d)
+    return out
+
+
 @bp.route("/clientes", methods=["GET"])
 def listar_clientes():
+    """Con `?fields=a,b` sólo se consultan y devuelven esas columnas.
+
+    Con `?include=usuario` cada cliente trae además `usuario` (idUsuario, usuario,
+    permisos, imagen y permisoNombre, o null si no tiene), resuelto en la misma consulta.
+    """
+    try:
+        campos = parse_fields(request.args.get('fields'), Cliente)
+    except ValueError as e:
+        return json_error(str(e), 400)
+    include = {x.strip() for x in (request.args.get('include') or '').split(',') if x.strip()}
     session = SessionLocal()
     try:
+        if 'usuario' in include:
+            return jsonify(_clientes_con_usuario(session, campos))
+        if campos:
+            return jsonify(_proyectar(Cliente, campos, session))
         rows = session.query(Cliente).all()
         return jsonify([_to_dict(r) for r in rows])
     finally:
         session.close()
 
 
+@bp.route("/clientes/buscar", methods=["GET"])
+def buscar_clientes():
+    """Búsqueda por prefijo (typeahead) en nombre, apellido, mail, documento, teléfono y usuario.
+
+    Query params: q (requerido), limit (20 por defecto, máximo 100), offset.
+    """
+    from services.busqueda_service import buscar_clientes as buscar
+
+    q = (request.args.get('q') or '').strip()
+    if not q:
+        return json_error('q es requerido', 400)
+    try:
+        limit = int(request.args['limit']) if request.args.get('limit') else 20
+        offset = int(request.args['offset']) if request.args.get('offset') else 0
+    except ValueError:
+        return json_error('limit y offset deben ser enteros', 400)
+    if limit < 1 or offset < 0:
+        return json_error('limit debe ser positivo y offset no negativo', 400)
+    return jsonify(buscar(q, limit=min(limit, 100), offset=offset))
+
+
 @bp.route("/clientes/<int:idCliente>", methods=["GET"])
 def get_cliente(idCliente: int):
     session = SessionLocal()
@@ -1,6 +1,8 @@
 from flask import Blueprint, request, jsonify
 from database.mapeoCanchas import Cancha, CanchaxServicio, Deporte, Horario, Servicio, SessionLocal, DetalleReserva
+from sqlalchemy import select
 from basicas import _to_dict
+from streaming import formato_streaming, iterar_objetos, respuesta_streaming
 
 bp = Blueprint('detalle_reserva', __name__)
 
@@ -26,6 +28,13 @@ def create_detalle():
 
 @bp.route('/detalle-reserva', methods=['GET'])
 def list_detalles():
+    """Con `?stream=1|ndjson` se emite en streaming"""
+    formato = formato_streaming()
+    if formato:
+        return respuesta_streaming(
+            lambda session: (_to_dict(r) for r in iterar_objetos(session, select(DetalleReserva))),
+            formato,
+        )
     session = SessionLocal()
     try:
         rows = session.query(DetalleReserva).all()
@@ -1,6 +1,9 @@
 from flask import Blueprint, request, jsonify
 from database.mapeoCanchas import SessionLocal, EquipoxCliente, Cliente, Usuario, Equipo
-from basicas import _to_dict
+from sqlalchemy import select
+from basicas import _to_dict, _proyectar
+from validators import json_error, parse_fields
+from streaming import formato_streaming, iterar_objetos, iterar_proyeccion, respuesta_streaming
 
 bp = Blueprint('equipoxcliente', __name__)
 
@@ -24,12 +27,52 @@ def create_ex():
         session.close()
 
 
+# Columnas extra que agrega el listado filtrado por torneo
+_EXTRAS_TORNEO = {
+    'nombreCliente': Cliente.nombre,
+    'apellidoCliente': Cliente.apellido,
+    'documentoCliente': Cliente.numeroDoc,
+    'nombreEquipo': Equipo.nombre,
+}
+
+
 @bp.route('/equipoxcliente', methods=['GET'])
 def list_ex():
+    """Con `?fields=a,b` sólo se consultan y devuelven esas columnas
+    (con `?torneo=` también se pueden pedir las columnas extra de cliente/equipo).
+    Sin torneo, `?stream=1|ndjson` emite el listado en streaming.
+    """
     torneo_id = request.args.get('torneo')
+    columnas_exc = [attr.key for attr in EquipoxCliente.__mapper__.column_attrs]
+    try:
+        permitidos = columnas_exc + list(_EXTRAS_TORNEO) if torneo_id else columnas_exc
+        campos = parse_fields(request.args.get('fields'), permitidos)
+    except ValueError as e:
+        return json_error(str(e), 400)
+    formato = formato_streaming()
+    if formato and not torneo_id:
+        if campos:
+            return respuesta_streaming(lambda session: iterar_proyeccion(session, EquipoxCliente, campos), formato)
+        return respuesta_streaming(
+            lambda session: (_to_dict(r) for r in iterar_objetos(session, select(EquipoxCliente))),
+            formato,
+        )
     session = SessionLocal()
     try:
         if torneo_id:
+            if campos:
+                columnas = [
+                    _EXTRAS_TORNEO[c].label(c) if c in _EXTRAS_TORNEO else getattr(EquipoxCliente, c).label(c)
+                    for c in campos
+                ]
+                rows = session.execute(
+                    select(*columnas)
+                    .join(Cliente, EquipoxCliente.idCliente == Cliente.idCliente)
+                    .join(Equipo, EquipoxCliente.idEquipo == Equipo.idEquipo)
+                    .where(EquipoxCliente.idTorneo == int(torneo_id))
+                ).all()
+                return jsonify([dict(zip(campos, r)) for r in rows])
+
             # Filter by torneo and join with Cliente, Usuario and Equipo to get client and team info
             rows = session.query(
                 EquipoxCliente,
@@ -55,6 +98,8 @@ def list_ex():
                 result.append(obj)
             return jsonify(result)
         else:
+            if campos:
+                return jsonify(_proyectar(EquipoxCliente, campos, session))
             rows = session.query(EquipoxCliente).all()
             return jsonify([_to_dict(r) for r in rows])
     finally:
@@ -5,12 +5,17 @@ from services.pago_service import (
     crear_pago, obtener_pago_por_reserva, listar_pagos_pendientes,
     actualizar_estado_pago, obtener_historial_pagos_cliente,
     verificar_reserva_pagada, calcular_monto_reserva,
-    inicializar_estados_y_metodos
+    inicializar_estados_y_metodos, listar_pagos, obtener_pagos_por_reservas, iterar_pagos
 )
-from validators import json_error
-import traceback
+from validators import json_error, parse_iso_date
+from streaming import formato_streaming, respuesta_streaming
+import logging
 
 bp = Blueprint('pago', __name__)
+logger = logging.getLogger(__name__)
+
+# Límite de ids aceptados por /pagos/reservas
+MAX_IDS_POR_CONSULTA = 5000
 
 
 @bp.route('/pagos', methods=['POST'])
@@ -176,7 +181,7 @@ def crear_nuevo_pago():
     except ValueError as e:
         return json_error(str(e), 400)
     except Exception as e:
-        traceback.print_exc()
+        logger.exception('Error en crear_nuevo_pago')
         return json_error(f'Error al crear pago: {str(e)}', 500)
 
 
@@ -190,18 +195,79 @@ def obtener_pago_reserva(idReserva):
             return jsonify(None), 200
         return jsonify(pago)
     except Exception as e:
-        traceback.print_exc()
+        logger.exception('Error en obtener_pago_reserva')
+        return json_error(str(e), 500)
+
+
+@bp.route('/pagos/reservas', methods=['GET', 'POST'])
+def obtener_pagos_reservas():
+    """
+    Devuelve el estado de pago de varias reservas en una sola llamada
+
+    GET  /pagos/reservas?ids=1,2,3  o  /pagos/reservas?desde=10&hasta=50
+    POST /pagos/reservas  Body: {"ids": [1, 2, 3]}
+
+    Respuesta: {"<idReserva>": {idPago, monto, estadoNombre, metodoPagoNombre, ...} | null}.
+    Con `ids` se incluye null para las reservas sin pago; con rango sólo las pagadas.
+    """
+    ids = None
+    desde = hasta = None
+    try:
+        if request.method == 'POST':
+            data = request.get_json() or {}
+            if not isinstance(data.get('ids'), list):
+                return json_error('ids debe ser una lista de idReserva', 400)
+            ids = [int(i) for i in data['ids']]
+        elif request.args.get('ids'):
+            ids = [int(i) for i in request.args['ids'].split(',') if i.strip()]
+        else:
+            desde = int(request.args['desde']) if request.args.get('desde') else None
+            hasta = int(request.args['hasta']) if request.args.get('hasta') else None
+            if desde is None and hasta is None:
+                return json_error('Se requiere ids o un rango desde/hasta', 400)
+    except (TypeError, ValueError):
+        return json_error('Los ids deben ser enteros', 400)
+
+    if ids is not None and len(ids) > MAX_IDS_POR_CONSULTA:
+        return json_error(f'Se aceptan hasta {MAX_IDS_POR_CONSULTA} ids por consulta', 400)
+
+    try:
+        pagos = obtener_pagos_por_reservas(ids=ids, desde=desde, hasta=hasta)
+        if ids is not None:
+            return jsonify({str(i): pagos.get(i) for i in ids})
+        return jsonify({str(k): v for k, v in pagos.items()})
+    except Exception as e:
+        logger.exception('Error en obtener_pagos_reservas')
         return json_error(str(e), 500)
 
 
 @bp.route('/pagos/pendientes', methods=['GET'])
 def obtener_pagos_pendientes():
-    """Lista todas las reservas sin pago"""
+    """Lista las reservas confirmadas sin pago.
+
+    Query params opcionales: start, end (ISO, filtran fechaReservada), limit, offset.
+    """
+    inicio = request.args.get('start')
+    fin = request.args.get('end')
+    try:
+        fechaDesde = parse_iso_date(inicio) if inicio else None
+        fechaHasta = parse_iso_date(fin) if fin else None
+    except ValueError as e:
+        return json_error(str(e), 400)
+    try:
+        limit = int(request.args['limit']) if request.args.get('limit') else None
+        offset = int(request.args['offset']) if request.args.get('offset') else 0
+    except ValueError:
+        return json_error('limit y offset deben ser enteros', 400)
+    if (limit is not None and limit < 0) or offset < 0:
+        return json_error('limit y offset no pueden ser negativos', 400)
     try:
-        pendientes = listar_pagos_pendientes()
+        pendientes = listar_pagos_pendientes(
+            fechaDesde=fechaDesde, fechaHasta=fechaHasta, limit=limit, offset=offset
+        )
         return jsonify(pendientes)
     except Exception as e:
-        traceback.print_exc()
+        logger.exception('Error en obtener_pagos_pendientes')
         return json_error(str(e), 500)
 
 
@@ -231,18 +297,21 @@ def cambiar_estado_pago(idPago):
     except ValueError as e:
         return json_error(str(e), 400)
     except Exception as e:
-        traceback.print_exc()
+        logger.exception('Error en cambiar_estado_pago')
         return json_error(str(e), 500)
 
 
 @bp.route('/pagos/cliente/<int:idCliente>', methods=['GET'])
 def obtener_historial_cliente(idCliente):
-    """Obtiene todos los pagos de un cliente"""
+    """Obtiene los pagos de un cliente (mismos filtros y paginación que /pagos/todos)"""
+    filtros, error = _leer_filtros_pagos()
+    if error:
+        return error
     try:
-        pagos = obtener_historial_pagos_cliente(idCliente)
-        return jsonify(pagos)
+        resultado = obtener_historial_pagos_cliente(idCliente, **filtros)
+        return jsonify(_respuesta_pagos(resultado, filtros))
     except Exception as e:
-        traceback.print_exc()
+        logger.exception('Error en obtener_historial_cliente')
         return json_error(str(e), 500)
 
 
@@ -253,7 +322,7 @@ def verificar_pago(idReserva):
         pagada = verificar_reserva_pagada(idReserva)
         return jsonify({'pagada': pagada})
     except Exception as e:
-        traceback.print_exc()
+        logger.exception('Error en verificar_pago')
         return json_error(str(e), 500)
 
 
@@ -266,7 +335,7 @@ def calcular_monto(idReserva):
     except ValueError as e:
         return json_error(str(e), 404)
     except Exception as e:
-        traceback.print_exc()
+        logger.exception('Error en calcular_monto')
         return json_error(str(e), 500)
 
 
@@ -277,51 +346,63 @@ def inicializar_datos():
         result = inicializar_estados_y_metodos()
         return jsonify(result)
     except Exception as e:
-        traceback.print_exc()
+        logger.exception('Error en inicializar_datos')
         return json_error(str(e), 500)
 
 
+def _leer_filtros_pagos():
+    """Lee los query params comunes de los listados de pagos.
+
+    start, end (ISO, sobre fechaPago), estado (idEstado), metodo (idMetodoPago),
+    after (cursor idPago), limit y resumen=1. Devuelve (filtros, error_response).
+    """
+    inicio = request.args.get('start')
+    fin = request.args.get('end')
+    try:
+        filtros = {
+            'fechaDesde': parse_iso_date(inicio) if inicio else None,
+            'fechaHasta': parse_iso_date(fin) if fin else None,
+        }
+    except ValueError as e:
+        return None, json_error(str(e), 400)
+    try:
+        for param, clave in (('estado', 'idEstado'), ('metodo', 'idMetodoPago'), ('after', 'after'), ('limit', 'limit')):
+            valor = request.args.get(param)
+            filtros[clave] = int(valor) if valor else None
+    except ValueError:
+        return None, json_error('estado, metodo, after y limit deben ser enteros', 400)
+    if filtros['limit'] is not None and filtros['limit'] <= 0:
+        return None, json_error('limit debe ser mayor a 0', 400)
+    filtros['resumen'] = request.args.get('resumen', '').lower() in ('1', 'true', 'si')
+    return filtros, None
+
+
+def _respuesta_pagos(resultado, filtros):
+    # Sin paginación ni resumen se mantiene la respuesta histórica (lista plana)
+    if filtros['limit'] is None and filtros['after'] is None and not filtros['resumen']:
+        return resultado['data']
+    return resultado
+
+
 @bp.route('/pagos/todos', methods=['GET'])
 def listar_todos_pagos():
-    """Lista todos los pagos con información completa"""
-    session = SessionLocal()
+    """Lista los pagos con información completa.
+
+    Sin parámetros devuelve la lista completa; con limit/after/resumen devuelve
+    {'data': [...], 'nextCursor': int|None, 'resumen': {...}|None}.
+    Con `?stream=1|ndjson` se emite la lista plana en streaming (respeta
+    filtros, after y limit; no incluye resumen).
+    """
+    filtros, error = _leer_filtros_pagos()
+    if error:
+        return error
+    formato = formato_streaming()
+    if formato:
+        filtros.pop('resumen', None)
+        return respuesta_streaming(lambda session: iterar_pagos(session, **filtros), formato)
     try:
-        pagos = session.query(Pago).all()
-        resultado = []
-        
-        for pago in pagos:
-            pago_dict = _to_dict(pago)
-            
-            # Enriquecer con información adicional
-            metodo = session.get(MetodoPago, pago.metodoPago)
-            if metodo:
-                pago_dict['metodoPagoNombre'] = metodo.descripcion
-            
-            estado = session.get(EstadoPago, pago.estado)
-            if estado:
-                pago_dict['estadoNombre'] = estado.nombre
-            
-            # Información de la reserva
-            from database.mapeoCanchas import Reserva, Cliente
-            reserva = session.get(Reserva, pago.idReserva)
-            if reserva:
-                pago_dict['fechaReservada'] = reserva.fechaReservada.isoformat() if reserva.fechaReservada else None
-                
-                cliente = session.get(Cliente, reserva.idCliente)
-                if cliente:
-                    pago_dict['cliente'] = {
-                        'idCliente': cliente.idCliente,
-                        'nombre': cliente.nombre,
-                        'apellido': cliente.apellido,
-                        'mail': cliente.mail
-                    }
-            
-            resultado.append(pago_dict)
-        
-        return jsonify(resultado)
-    
+        resultado = listar_pagos(**filtros)
+        return jsonify(_respuesta_pagos(resultado, filtros))
     except Exception as e:
-        traceback.print_exc()
+        logger.exception('Error en listar_todos_pagos')
         return json_error(str(e), 500)
-    finally:
-        session.close()
@@ -1,10 +1,14 @@
 from flask import Blueprint, request, jsonify
 from database.mapeoCanchas import SessionLocal, Partido, Equipo, Cancha, Horario, Torneo, EquipoxCliente
+from sqlalchemy import select
 from basicas import _to_dict
+from streaming import formato_streaming, iterar_objetos, respuesta_streaming
 from datetime import datetime, timedelta
+import logging
 import random
 
 bp = Blueprint('partido', __name__)
+logger = logging.getLogger(__name__)
 
 
 @bp.route('/partidos', methods=['POST'])
@@ -28,6 +32,13 @@ def create_partido():
 
 @bp.route('/partidos', methods=['GET'])
 def list_partidos():
+    """Sin torneo, `?stream=1|ndjson` emite el listado en streaming"""
+    formato = formato_streaming()
+    if formato and not request.args.get('torneo'):
+        return respuesta_streaming(
+            lambda session: (_to_dict(r) for r in iterar_objetos(session, select(Partido))),
+            formato,
+        )
     session = SessionLocal()
     try:
         torneo_id = request.args.get('torneo')
@@ -38,7 +49,7 @@ def list_partidos():
                 partidos = session.query(Partido).filter(Partido.idTorneo == int(torneo_id)).all()
             except Exception as e:
                 # Si la tabla no existe o hay error, devolver lista vacía
-                print(f"Error querying partidos: {e}")
+                logger.warning('Error consultando partidos del torneo %s: %s', torneo_id, e)
                 return jsonify([])
             
             result = []
@@ -73,7 +84,7 @@ def list_partidos():
             rows = session.query(Partido).all()
             return jsonify([_to_dict(r) for r in rows])
     except Exception as e:
-        print(f"Error in list_partidos: {e}")
+        logger.exception('Error en list_partidos: %s', e)
         return jsonify([])
     finally:
         session.close()
@@ -0,0 +1,61 @@
+from flask import Blueprint, jsonify, request
+from validators import json_error, parse_iso_date
+from services.precios_service import cotizar_lote
+
+bp = Blueprint('precios', __name__)
+
+# Máximo de combinaciones cotizadas por llamada
+MAX_ITEMS_COTIZACION = 5000
+
+
+@bp.route('/precios/cotizar', methods=['POST'])
+def cotizar_precios():
+    """
+    POST /api/precios/cotizar
+    Cotiza muchas reservas posibles en una sola llamada, con las mismas reglas
+    que se aplican al crear la reserva.
+
+    Body (cualquiera de las dos formas, o ambas):
+        {"items": [{"idCancha": 1, "fecha": "2025-11-20", "horarios": [9, 10], "servicios": [3]}]}
+        {"grilla": {"canchas": [1, 2], "fechas": ["2025-11-20", ...], "horarios": [1, ..., 10], "servicios": []}}
+
+    La grilla se expande a un item por cancha, fecha y horario (un turno cada uno).
+    Respuesta: {"resultados": [{idCancha, fecha, horarios, monto, idCxSBase, servicios, requiereIluminacion} | {..., error}]}
+    """
+    data = request.get_json() or {}
+    items = data.get('items') or []
+    if not isinstance(items, list):
+        return json_error('items debe ser una lista', 400)
+    items = list(items)
+
+    grilla = data.get('grilla')
+    if grilla:
+        if not isinstance(grilla, dict):
+            return json_error('grilla debe ser un objeto', 400)
+        canchas = grilla.get('canchas') or []
+        fechas = grilla.get('fechas') or []
+        horarios = grilla.get('horarios') or []
+        servicios = grilla.get('servicios') or []
+        if not all(isinstance(x, list) for x in (canchas, fechas, horarios, servicios)):
+            return json_error('canchas, fechas, horarios y servicios deben ser listas', 400)
+        if len(canchas) * len(fechas) * len(horarios) > MAX_ITEMS_COTIZACION:
+            return json_error(f'Se aceptan hasta {MAX_ITEMS_COTIZACION} combinaciones por llamada', 400)
+        for fecha in fechas:
+            try:
+                parse_iso_date(fecha)
+            except ValueError:
+                return json_error(f'Fecha inválida: {fecha}', 400)
+        for id_cancha in canchas:
+            for fecha in fechas:
+                for id_horario in horarios:
+                    items.append({'idCancha': id_cancha, 'fecha': fecha, 'horarios': [id_horario], 'servicios': servicios})
+
+    if not items:
+        return json_error('Se requiere items o grilla', 400)
+    if len(items) > MAX_ITEMS_COTIZACION:
+        return json_error(f'Se aceptan hasta {MAX_ITEMS_COTIZACION} combinaciones por llamada', 400)
+
+    try:
+        return jsonify({'resultados': cotizar_lote(items)})
+    except Exception as e:
+        return json_error(str(e), 500)
@@ -1,13 +1,17 @@
 from flask import Blueprint, request, jsonify
-from sqlalchemy import text
+from sqlalchemy import select, text
 from sqlalchemy.exc import OperationalError
-import traceback
+import logging
 from datetime import datetime, date
 from time import sleep
 from database.mapeoCanchas import SessionLocal, Reserva, EstadoReserva
 from basicas import _to_dict
+from metricas import contar
+from services import eventos_service
+from streaming import FILAS_POR_LOTE, formato_streaming, respuesta_streaming
 
 bp = Blueprint('reserva', __name__)
+logger = logging.getLogger(__name__)
 
 
 @bp.route('/reserva', methods=['POST'])
@@ -49,57 +53,73 @@ def create_reserva():
             session.rollback()
         except Exception:
             pass
-        # Print full traceback to server log to help debug 500 errors
-        traceback.print_exc()
+        logger.exception('Error en create_reserva')
         return jsonify({'error': str(e)}), 500
     finally:
         session.close()
 
 
+def _iterar_reservas(session, incluir_pago: bool = False, filas_por_lote: int = FILAS_POR_LOTE):
+    """Genera las reservas (con detalles y, opcionalmente, pago) lote por lote.
+
+    Por cada lote de reservas se resuelven los detalles (con horario y cancha)
+    y los pagos con una consulta cada uno, en vez de una por reserva.
+    """
+    from database.mapeoCanchas import DetalleReserva, Horario, CanchaxServicio, Cancha
+    from services.pago_service import obtener_pagos_por_reservas
+
+    stmt = select(Reserva).order_by(Reserva.idReserva).execution_options(yield_per=filas_por_lote)
+    for lote in session.execute(stmt).scalars().partitions():
+        ids = [r.idReserva for r in lote]
+        detalles_por_reserva = {}
+        try:
+            det_rows = (
+                session.query(DetalleReserva, Horario.horaInicio, Horario.horaFin, Cancha.idCancha)
+                .outerjoin(Horario, DetalleReserva.idHorario == Horario.idHorario)
+                .outerjoin(CanchaxServicio, DetalleReserva.idCxS == CanchaxServicio.idCxS)
+                .outerjoin(Cancha, CanchaxServicio.idCancha == Cancha.idCancha)
+                .filter(DetalleReserva.idReserva.in_(ids))
+                .order_by(DetalleReserva.idDetalle)
+                .all()
+            )
+            for det, hora_inicio, hora_fin, id_cancha in det_rows:
+                det_dict = _to_dict(det)
+                if hora_inicio is not None or hora_fin is not None:
+                    det_dict['horaInicio'] = hora_inicio
+                    det_dict['horaFin'] = hora_fin
+                if id_cancha is not None:
+                    det_dict['idCancha'] = id_cancha
+                detalles_por_reserva.setdefault(det.idReserva, []).append(det_dict)
+        except Exception:
+            pass
+        pagos = obtener_pagos_por_reservas(ids=ids, session=session) if incluir_pago else {}
+
+        for r in lote:
+            d = _to_dict(r)
+            fr = d.get('fechaReservada')
+            if isinstance(fr, str) and len(fr) >= 10:
+                d['fechaReservada'] = fr[:10]
+            d['detalles'] = detalles_por_reserva.get(r.idReserva, [])
+            if incluir_pago:
+                d['pago'] = pagos.get(r.idReserva)
+            yield d
+
+
 @bp.route('/reserva', methods=['GET'])
 def list_reservas():
+    """Lista las reservas con sus detalles.
+
+    Con `?include=pago` cada reserva trae además `pago` (estado, método y monto,
+    o null si no tiene). Con `?stream=1|ndjson` se emite en streaming.
+    """
+    include = {x.strip() for x in (request.args.get('include') or '').split(',') if x.strip()}
+    incluir_pago = 'pago' in include
+    formato = formato_streaming()
+    if formato:
+        return respuesta_streaming(lambda session: _iterar_reservas(session, incluir_pago), formato)
     session = SessionLocal()
     try:
-        from database.mapeoCanchas import DetalleReserva, Horario, CanchaxServicio, Cancha
-        rows = session.query(Reserva).all()
-        out = []
-        for r in rows:
-            d = _to_dict(r)
-            try:
-                fr = d.get('fechaReservada')
-                if fr is not None and hasattr(fr, 'isoformat'):
-                    d['fechaReservada'] = fr.isoformat()
-                else:
-                    if isinstance(fr, str) and len(fr) >= 10:
-                        d['fechaReservada'] = fr[:10]
-            except Exception:
-                pass
-            
-            # Include detalles with horario and cancha info
-            detalles = []
-            try:
-                det_rows = (
-                    session.query(DetalleReserva, Horario, CanchaxServicio, Cancha)
-                    .outerjoin(Horario, DetalleReserva.idHorario == Horario.idHorario)
-                    .outerjoin(CanchaxServicio, DetalleReserva.idCxS == CanchaxServicio.idCxS)
-                    .outerjoin(Cancha, CanchaxServicio.idCancha == Cancha.idCancha)
-                    .filter(DetalleReserva.idReserva == r.idReserva)
-                    .all()
-                )
-                for det, horario, cvs, cancha in det_rows:
-                    det_dict = _to_dict(det)
-                    if horario:
-                        det_dict['horaInicio'] = horario.horaInicio
-                        det_dict['horaFin'] = horario.horaFin
-                    if cancha:
-                        det_dict['idCancha'] = cancha.idCancha
-                    detalles.append(det_dict)
-            except Exception:
-                pass
-            
-            d['detalles'] = detalles
-            out.append(d)
-        return jsonify(out)
+        return jsonify(list(_iterar_reservas(session, incluir_pago)))
     finally:
         session.close()
 
@@ -163,7 +183,7 @@ def get_reserva(id):
                     det_dict['servicio'] = _to_dict(servicio)
                 detalles.append(det_dict)
         except Exception as e:
-            print(f"Error loading detalles: {e}")
+            logger.exception('Error cargando detalles de la reserva %s: %s', id, e)
         
         d['detalles'] = detalles
         return jsonify(d)
@@ -179,6 +199,7 @@ def update_reserva(id):
         obj = session.get(Reserva, id)
         if not obj:
             return jsonify({'error': 'Not found'}), 404
+        fecha_previa, estado_previo = obj.fechaReservada, obj.estado
         allowed = {c.name for c in Reserva.__table__.columns if not c.primary_key}
         for k, v in data.items():
             if k in allowed:
@@ -196,6 +217,14 @@ def update_reserva(id):
                         continue
                 # fallback for other fields
                 setattr(obj, k, v)
+        # Eventos para el stream de disponibilidad: mover la reserva libera los
+        # turnos del día anterior y ocupa los del nuevo
+        if obj.fechaReservada != fecha_previa:
+            _, por_cancha = eventos_service.turnos_de_reserva(session, id)
+            eventos_service.registrar(session, eventos_service.LIBERADO, id, turnos=(fecha_previa, por_cancha))
+            eventos_service.registrar(session, eventos_service.OCUPADO, id, turnos=(obj.fechaReservada, por_cancha))
+        if obj.estado != estado_previo and str(obj.estado) == '3':
+            eventos_service.registrar(session, eventos_service.CANCELADO, id)
         # commit with retry on SQLITE 'database is locked' errors
         attempts = 0
         while True:
@@ -206,6 +235,7 @@ def update_reserva(id):
                 msg = str(oe).lower()
                 if 'database is locked' in msg and attempts < 4:
                     attempts += 1
+                    contar('sqlite_busy_retries_total', operacion='modificar_reserva')
                     sleep(0.12 * attempts)  # small backoff
                     continue
                 # otherwise fail
@@ -229,6 +259,8 @@ def delete_reserva(id):
         obj = session.get(Reserva, id)
         if not obj:
             return jsonify({'error': 'Not found'}), 404
+        # Turnos que se liberan, leídos antes de borrar los detalles
+        turnos = eventos_service.turnos_de_reserva(session, id)
         # Perform manual deletes to avoid ORM lazy-loading issues when the
         # database schema differs from the ORM mapping (e.g. missing columns).
         # Delete DetalleReserva and Pago rows linked to this reserva first,
@@ -246,6 +278,7 @@ def delete_reserva(id):
             session = SessionLocal()
         # Finally delete the Reserva row
         session.execute(text("DELETE FROM Reserva WHERE idReserva = :id"), {"id": id})
+        eventos_service.registrar(session, eventos_service.LIBERADO, id, turnos=turnos)
         session.commit()
         return jsonify({'success': True})
     finally:
@@ -378,6 +411,7 @@ def cancelar_reserva(id_reserva):
         
         # Cambiar estado a cancelada (idEstado = 3)
         reserva.estado = 3
+        eventos_service.registrar(session, eventos_service.CANCELADO, id_reserva)
         session.commit()
         
         return '''
@@ -1,11 +1,12 @@
 from flask import Blueprint, request, jsonify, session
 from database.mapeoCanchas import (
-    SessionLocal, Reserva, DetalleReserva, Horario, CanchaxServicio, Cancha, EstadoCancha, Servicio, Cliente
+    SessionLocal, Horario, CanchaxServicio, EstadoCancha, Servicio, Cliente
 )
 from basicas import _to_dict
 from datetime import datetime
 from validators import parse_iso_date, is_future_or_today, json_error
 from services.reserva_service import ServicioReservas
+from services import disponibilidad_service
 
 bp = Blueprint('reservas_api', __name__)
 
@@ -15,53 +16,22 @@ def reservas_por_cancha(idCancha: int):
     """Devuelve eventos ocupados para FullCalendar.
     Acepta query params `start` y `end` (ISO dates) para filtrar rango de fechas.
     """
-    start = request.args.get('start')
-    end = request.args.get('end')
-    idCancha_q = request.args.get('idCancha')
-    session = SessionLocal()
-    try:
-        q = (
-            session.query(DetalleReserva, Reserva, Horario, CanchaxServicio)
-            .join(Reserva, DetalleReserva.idReserva == Reserva.idReserva)
-            .join(CanchaxServicio, DetalleReserva.idCxS == CanchaxServicio.idCxS)
-            .outerjoin(Horario, DetalleReserva.idHorario == Horario.idHorario)
-            .filter(CanchaxServicio.idCancha == idCancha)
-        )
+    return jsonify(disponibilidad_service.reservas_de_cancha(
+        idCancha, request.args.get('start'), request.args.get('end'), request.args.get('idCancha')
+    ))
 
-        if start:
-            try:
-                start_date = datetime.fromisoformat(start).date()
-                q = q.filter(Reserva.fechaReservada >= start_date)
-            except Exception:
-                pass
-        if end:
-            try:
-                end_date = datetime.fromisoformat(end).date()
-                q = q.filter(Reserva.fechaReservada <= end_date)
-            except Exception:
-                pass
-        if idCancha_q:
-            try:
-                q = q.filter(Cancha.idCancha == int(idCancha_q))
-            except Exception:
-                pass
-
-        rows = q.all()
-        # Return a compact, stable representation so the client can map
-        # horarios (from /api/horarios) to reservas by idHorario + fecha.
-        out = []
-        for detalle, reserva, horario, cvs in rows:
-            out.append({
-                'idDetalle': detalle.idDetalle,
-                'idReserva': reserva.idReserva,
-                'idHorario': detalle.idHorario if hasattr(detalle, 'idHorario') else None,
-                'fechaReservada': reserva.fechaReservada.isoformat(),
-                'idCxS': detalle.idCxS,
-            })
 
-        return jsonify(out)
-    finally:
-        session.close()
+@bp.route('/canchas/<int:idCancha>/horarios-libres', methods=['GET'])
+def horarios_libres_por_cancha(idCancha: int):
+    """Horarios sin reserva para la cancha en `fecha` (YYYY-MM-DD, por defecto hoy)"""
+    fecha = request.args.get('fecha')
+    if fecha:
+        fecha_d = disponibilidad_service.fecha_param(fecha)
+        if fecha_d is None:
+            return json_error('fecha inválida, usar YYYY-MM-DD', 400)
+    else:
+        fecha_d = datetime.now().date()
+    return jsonify(disponibilidad_service.horarios_libres(idCancha, fecha_d))
 
 
 @bp.route('/canchas/<int:idCancha>/reservas-resumen', methods=['GET'])
@@ -166,22 +136,9 @@ def reservas_resumen_por_cancha(idCancha: int):
 
 @bp.route('/horarios', methods=['GET'])
 def listar_horarios():
-    session = SessionLocal()
-    try:
-        rows = session.query(Horario).order_by(Horario.horaInicio).all()
-        out = []
-        for h in rows:
-            # horaInicio/horaFin may be stored as plain strings (HH:MM) in the
-            # legacy DB or as time/datetime objects depending on context. Be
-            # defensive: if the object exposes isoformat(), use it; otherwise
-            # coerce to str(). This avoids ValueError when DB strings like
-            # '00:00' would otherwise be parsed as datetimes.
-            hi = h.horaInicio.isoformat() if hasattr(h.horaInicio, 'isoformat') else str(h.horaInicio)
-            hf = h.horaFin.isoformat() if hasattr(h.horaFin, 'isoformat') else str(h.horaFin)
-            out.append({'idHorario': h.idHorario, 'horaInicio': hi, 'horaFin': hf})
-        return jsonify(out)
-    finally:
-        session.close()
+    # horaInicio/horaFin se guardan como texto (HH:MM) en la base legada;
+    # si vinieran como time se serializan con isoformat()
+    return jsonify(disponibilidad_service.listar_horarios())
 
 
 @bp.route('/reservas', methods=['POST'])
@@ -206,99 +163,72 @@ def reservas_calendar():
     idDeporte, nombreDeporte, idHorario, horaInicio, horaFin, idCxS, servicioDescripcion,
     idCliente, clienteNombre, clienteApellido
     """
-    start = request.args.get('start')
-    end = request.args.get('end')
-    session = SessionLocal()
-    try:
-        q_res = session.query(Reserva)
-        if start:
-            try:
-                start_date = datetime.fromisoformat(start).date()
-                q_res = q_res.filter(Reserva.fechaReservada >= start_date)
-            except Exception:
-                pass
-        if end:
-            try:
-                end_date = datetime.fromisoformat(end).date()
-                q_res = q_res.filter(Reserva.fechaReservada <= end_date)
-            except Exception:
-                pass
+    return jsonify(disponibilidad_service.calendario(request.args.get('start'), request.args.get('end')))
 
-        reservas = q_res.all()
-        out = []
-        for reserva in reservas:
-            # load detalles for this reserva and their horarios/canchas
-            det_q = (
-                session.query(DetalleReserva, Horario, CanchaxServicio, Cancha)
-                .join(CanchaxServicio, DetalleReserva.idCxS == CanchaxServicio.idCxS)
-                .join(Cancha, CanchaxServicio.idCancha == Cancha.idCancha)
-                .outerjoin(Horario, DetalleReserva.idHorario == Horario.idHorario)
-                .filter(DetalleReserva.idReserva == reserva.idReserva)
-            )
-            detalles = det_q.all()
-            if not detalles:
-                continue
 
-            # determine representative cancha/deporte using the first detalle
-            first_detalle, first_horario, first_cvs, first_cancha = detalles[0]
-            deporte_nombre = None
-            try:
-                deporte_obj = None
-                if first_cancha is not None:
-                    # try to get deporte name defensively
-                    deporte_obj = session.get(type(first_cancha).deporte.property.mapper.class_, first_cancha.deporte)
-                if deporte_obj is not None:
-                    deporte_nombre = getattr(deporte_obj, 'nombre', None)
-            except Exception:
-                deporte_nombre = None
+@bp.route('/stream/disponibilidad', methods=['GET'])
+def stream_disponibilidad():
+    """Server-Sent Events con los turnos que se ocupan, liberan o cancelan.
 
-            # compute min horaInicio and max horaFin across horarios (if present)
-            hora_inicio_vals = []
-            hora_fin_vals = []
-            for detalle, horario, cvs, cancha in detalles:
+    Query param opcional `idCancha` (sin él llegan los eventos de todas las canchas).
+    Al reconectar, el navegador manda `Last-Event-ID` (o `?desde=<id>`) y se reenvían
+    los eventos que se perdió. La conexión se cierra sola cada SSE_DURACION_SEGUNDOS
+    para liberar el hilo; EventSource reconecta y retoma desde el último id.
+
+    Acá cada conexión ocupa un hilo del worker (y se limita con MAX_SUSCRIPTORES);
+    en producción el proxy manda esta ruta a asgi.py, donde una conexión abierta
+    no ocupa ningún hilo.
+    """
+    import os
+    import queue
+    import time
+    from flask import Response
+    from services.eventos_service import canal, eventos_desde, mensaje_sse
+
+    idCancha = request.args.get('idCancha')
+    desde = request.headers.get('Last-Event-ID') or request.args.get('desde')
+    try:
+        idCancha = int(idCancha) if idCancha else None
+        desde = int(desde) if desde else None
+    except ValueError:
+        return json_error('idCancha y Last-Event-ID deben ser enteros', 400)
+
+    cola = canal.suscribir(idCancha)
+    if cola is None:
+        # Sin lugar: el cliente sigue con su consulta normal y reintenta más tarde
+        cuerpo, status = json_error('Demasiadas conexiones de eventos; reintente más tarde', 503)
+        return cuerpo, status, {'Retry-After': '30'}
+
+    duracion = float(os.getenv('SSE_DURACION_SEGUNDOS', '300'))
+    latido = float(os.getenv('SSE_LATIDO_SEGUNDOS', '15'))
+
+    def generar():
+        try:
+            ultimo = desde or 0
+            yield b'retry: 3000\n\n'
+            # Suscripto antes de leer lo pendiente: lo que llegue por la cola
+            # y ya se haya enviado se descarta por id
+            if desde is not None:
+                for evento in eventos_desde(desde, idCancha):
+                    ultimo = evento['id']
+                    yield mensaje_sse(evento)
+            fin = time.monotonic() + duracion
+            while time.monotonic() < fin:
                 try:
-                    if horario is not None and getattr(horario, 'horaInicio', None):
-                        hora_inicio_vals.append(horario.horaInicio)
-                    if horario is not None and getattr(horario, 'horaFin', None):
-                        hora_fin_vals.append(horario.horaFin)
-                except Exception:
+                    evento = cola.get(timeout=latido)
+                except queue.Empty:
+                    # Comentario SSE: mantiene viva la conexión a través de proxies
+                    yield b': ping\n\n'
                     continue
-
-            horaInicio = None
-            horaFin = None
-            try:
-                if hora_inicio_vals:
-                    # assume stored as strings like '09:00' or time objects; pick min lexicographically for strings
-                    horaInicio = sorted(hora_inicio_vals)[0]
-                if hora_fin_vals:
-                    horaFin = sorted(hora_fin_vals)[hora_fin_vals.__len__()-1]
-            except Exception:
-                horaInicio = hora_inicio_vals[0] if hora_inicio_vals else None
-                horaFin = hora_fin_vals[-1] if hora_fin_vals else None
-
-            # client name
-            cliente_nombre = None
-            try:
-                cl = session.get(Cliente, reserva.idCliente)
-                if cl:
-                    cliente_nombre = f"{getattr(cl,'nombre','')} {getattr(cl,'apellido','') }".strip()
-            except Exception:
-                cliente_nombre = None
-
-            out.append({
-                'idReserva': reserva.idReserva,
-                'fechaReservada': reserva.fechaReservada.isoformat() if hasattr(reserva.fechaReservada, 'isoformat') else str(reserva.fechaReservada),
-                'idCancha': first_cancha.idCancha if first_cancha is not None else None,
-                'nombreCancha': first_cancha.nombre if first_cancha is not None else None,
-                'idDeporte': first_cancha.deporte if first_cancha is not None else None,
-                'nombreDeporte': deporte_nombre,
-                'horaInicio': horaInicio,
-                'horaFin': horaFin,
-                'cantidadDetalles': len(detalles),
-                'idCliente': reserva.idCliente,
-                'clienteNombre': cliente_nombre,
-            })
-
-        return jsonify(out)
-    finally:
-        session.close()
+                if evento['id'] <= ultimo:
+                    continue
+                ultimo = evento['id']
+                yield mensaje_sse(evento)
+        finally:
+            canal.desuscribir(cola)
+
+    return Response(generar(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        # nginx: no acumular la respuesta, mandar cada evento apenas sale
+        'X-Accel-Buffering': 'no',
+    })
@@ -1,17 +1,12 @@
 from flask import Blueprint, request, jsonify, send_file, send_from_directory
 from database.mapeoCanchas import SessionLocal, Torneo, EstadoTorneo
-from basicas import _to_dict
+from basicas import _to_dict, _proyectar
+from validators import json_error, parse_fields
 import os
 from io import BytesIO
-import urllib.request
 from werkzeug.utils import secure_filename
 from datetime import datetime
-
-try:
-    from PIL import Image
-    PIL_AVAILABLE = True
-except ImportError:
-    PIL_AVAILABLE = False
+from opcionales import pil_image
 
 bp = Blueprint('torneo', __name__)
 
@@ -31,6 +26,7 @@ def torneo_imagen(idTorneo):
     - If imagen starts with /assets/, attempt to serve from frontend-react/public/assets.
     - If imagen is an http(s) URL, fetch it, optionally process with PIL, and stream it.
     """
+    Image = pil_image()
     session = SessionLocal()
     try:
         t = session.get(Torneo, idTorneo)
@@ -43,7 +39,7 @@ def torneo_imagen(idTorneo):
             filename = img.split('/uploads/',1)[1]
             full = os.path.abspath(os.path.join(UPLOAD_FOLDER, filename))
             if os.path.exists(full):
-                if PIL_AVAILABLE:
+                if Image is not None:
                     try:
                         im = Image.open(full)
                         bio = BytesIO()
@@ -63,7 +59,7 @@ def torneo_imagen(idTorneo):
             assets_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'frontend-react', 'public', 'assets'))
             full = os.path.join(assets_dir, asset_name)
             if os.path.exists(full):
-                if PIL_AVAILABLE:
+                if Image is not None:
                     try:
                         im = Image.open(full)
                         bio = BytesIO()
@@ -79,10 +75,11 @@ def torneo_imagen(idTorneo):
 
         # remote URL
         if img.startswith('http://') or img.startswith('https://'):
+            from urllib.request import urlopen
             try:
-                with urllib.request.urlopen(img, timeout=8) as resp:
+                with urlopen(img, timeout=8) as resp:
                     data = resp.read()
-                if PIL_AVAILABLE:
+                if Image is not None:
                     try:
                         im = Image.open(BytesIO(data))
                         bio = BytesIO()
@@ -171,8 +168,15 @@ def create_torneo():
 
 @bp.route('/torneos', methods=['GET'])
 def list_torneos():
+    """Con `?fields=a,b` sólo se consultan y devuelven esas columnas"""
+    try:
+        campos = parse_fields(request.args.get('fields'), Torneo)
+    except ValueError as e:
+        return json_error(str(e), 400)
     session = SessionLocal()
     try:
+        if campos:
+            return jsonify(_proyectar(Torneo, campos, session))
         rows = session.query(Torneo).all()
         return jsonify([_to_dict(r) for r in rows])
     finally:
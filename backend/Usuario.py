@@ -1,19 +1,17 @@
 from flask import Blueprint, request, jsonify, send_file, send_from_directory
+from sqlalchemy import select
 from database.mapeoCanchas import SessionLocal, Usuario, Permiso, Cliente, Empleado
-from basicas import _to_dict
-from validators import validate_email, validate_password_strength, json_error
+from basicas import _to_dict, _proyectar
+from validators import validate_email, validate_password_strength, json_error, parse_fields
 from werkzeug.utils import secure_filename
 from uuid import uuid4
+import logging
 import os
 from io import BytesIO
-import urllib.request
-try:
-    from PIL import Image
-    PIL_AVAILABLE = True
-except Exception:
-    PIL_AVAILABLE = False
+from opcionales import pil_image
 
 bp = Blueprint('usuario', __name__)
+logger = logging.getLogger(__name__)
 
 # Upload folder (same as canchas)
 UPLOAD_FOLDER = os.path.join(os.path.dirname(__file__), '..', 'uploads')
@@ -68,8 +66,15 @@ def create_usuario():
 
 @bp.route('/usuarios', methods=['GET'])
 def list_usuarios():
+    """Con `?fields=a,b` sólo se consultan y devuelven esas columnas"""
+    try:
+        campos = parse_fields(request.args.get('fields'), Usuario)
+    except ValueError as e:
+        return json_error(str(e), 400)
     session = SessionLocal()
     try:
+        if campos:
+            return jsonify(_proyectar(Usuario, campos, session))
         rows = session.query(Usuario).all()
         return jsonify([_to_dict(r) for r in rows])
     finally:
@@ -102,23 +107,25 @@ def get_permiso(id: int):
 def get_usuario(id):
     session = SessionLocal()
     try:
-        obj = session.get(Usuario, id)
-        if not obj:
+        # Usuario, su Cliente o Empleado y el Permiso en una sola consulta
+        fila = session.execute(
+            select(Usuario, Cliente, Empleado, Permiso.nombre)
+            .outerjoin(Cliente, Cliente.idUsuario == Usuario.idUsuario)
+            .outerjoin(Empleado, Empleado.idUsuario == Usuario.idUsuario)
+            .outerjoin(Permiso, Permiso.idPermiso == Usuario.permisos)
+            .where(Usuario.idUsuario == id)
+            .order_by(Cliente.idCliente, Empleado.idEmpleado)
+            .limit(1)
+        ).first()
+        if fila is None:
             return jsonify({'error': 'Not found'}), 404
-        
+        obj, cliente, empleado, permiso_nombre = fila
+
         # Get user data
         user_data = _to_dict(obj)
-        
-        # Try to find associated Cliente or Empleado
-        cliente = session.query(Cliente).filter(Cliente.idUsuario == id).first()
-        empleado = session.query(Empleado).filter(Empleado.idUsuario == id).first()
-        
-        # Debug: print what we found
-        print(f"DEBUG - Usuario {id}: cliente={cliente}, empleado={empleado}")
-        
+
         # Merge data from Cliente or Empleado (they have priority over Usuario fields)
         if cliente:
-            print(f"DEBUG - Cliente encontrado: {cliente.nombre} {cliente.apellido}")
             user_data['nombre'] = cliente.nombre
             user_data['apellido'] = cliente.apellido
             user_data['telefono'] = cliente.telefono
@@ -126,7 +133,6 @@ def get_usuario(id):
             user_data['tipoRegistro'] = 'cliente'
             user_data['idRegistro'] = cliente.idCliente
         elif empleado:
-            print(f"DEBUG - Empleado encontrado: {empleado.nombre} {empleado.apellido}")
             user_data['nombre'] = empleado.nombre
             user_data['apellido'] = empleado.apellido
             user_data['telefono'] = str(empleado.telefono) if empleado.telefono else None
@@ -134,25 +140,13 @@ def get_usuario(id):
             user_data['tipoRegistro'] = 'empleado'
             user_data['idRegistro'] = empleado.idEmpleado
         else:
-            print(f"DEBUG - No se encontró Cliente ni Empleado para usuario {id}")
             # No associated record, use Usuario fields if they exist
             user_data['tipoRegistro'] = None
             user_data['idRegistro'] = None
         # Include human-readable permiso name when available to avoid numeric mapping issues
-        try:
-            if getattr(obj, 'permiso_rel', None) and getattr(obj.permiso_rel, 'nombre', None):
-                user_data['permisoNombre'] = obj.permiso_rel.nombre
-            else:
-                # fallback: try to load Permiso by id
-                if getattr(obj, 'permisos', None) is not None:
-                    perm = session.get(Permiso, obj.permisos)
-                    if perm:
-                        user_data['permisoNombre'] = perm.nombre
-        except Exception:
-            # best-effort; do not break response on permission lookup failure
-            user_data['permisoNombre'] = None
+        if permiso_nombre is not None:
+            user_data['permisoNombre'] = permiso_nombre
 
-        print(f"DEBUG - Retornando: {user_data}")
         return jsonify(user_data)
     finally:
         session.close()
@@ -303,6 +297,7 @@ def usuario_imagen(id):
     - If imagen starts with /assets/, serve from frontend-react/public/assets.
     - If imagen is http(s), fetch and stream it.
     """
+    Image = pil_image()
     session = SessionLocal()
     try:
         u = session.get(Usuario, id)
@@ -334,10 +329,11 @@ def usuario_imagen(id):
         
         # remote URL
         if img.startswith('http://') or img.startswith('https://'):
+            from urllib.request import urlopen
             try:
-                with urllib.request.urlopen(img) as response:
+                with urlopen(img) as response:
                     data = response.read()
-                    if PIL_AVAILABLE:
+                    if Image is not None:
                         pil_img = Image.open(BytesIO(data))
                         buf = BytesIO()
                         pil_img.save(buf, format='JPEG')
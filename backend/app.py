@@ -1,36 +1,70 @@
 from flask import Flask, jsonify, send_from_directory
 import sys
 from pathlib import Path
+import logging
 import os
 
 ROOT = Path(__file__).resolve().parent.parent
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-# Import blueprints from this folder
-try:
-    from Clientes import bp as clientes_bp
-    from Canchas import bp as canchas_bp
-    from DetalleReserva import bp as detalle_reserva_bp
-    from Reserva import bp as reserva_bp
-    from ReservasApi import bp as reservas_api_bp
-    from reports import bp as informes_bp
-    from Torneo import bp as torneo_bp
-    from Equipo import bp as equipo_bp
-    from EquipoxCliente import bp as equipoxcliente_bp
-    from Partido import bp as partido_bp
-    from Pago import bp as pago_bp
-    from Usuario import bp as usuario_bp
-    from Empleados import bp as empleados_bp
-    from Deporte import bp as deporte_bp
-except Exception as e:
-    # If imports fail, raise a clearer error so the developer can fix import paths
-    raise ImportError(f"Fallo al importar blueprints: {e}")
+logger = logging.getLogger(__name__)
 
 
 def create_app():
     app = Flask(__name__)
 
+    # Logging con cola no bloqueante, niveles por módulo e id de request
+    from logging_config import configurar_logging, init_request_id
+    configurar_logging()
+    init_request_id(app)
+
+    # JSON con orjson (si está instalado) y compresión gzip/br de respuestas grandes
+    from json_provider import JSONProviderRapido
+    from compresion import init_compresion, estadisticas_respuestas
+    app.json = JSONProviderRapido(app)
+    init_compresion(app)
+
+    # Cantidad y tiempo de consultas SQL por request (X-Query-Count / Server-Timing)
+    from instrumentacion_sql import init_instrumentacion_sql
+    init_instrumentacion_sql(app)
+
+    # Latencias por ruta, conexiones y cachés en /metrics
+    from metricas import init_metricas
+    init_metricas(app)
+
+    # Perfilado a demanda (X-Profile con token de admin, o PROFILE_SAMPLE_RATE)
+    from perfilado import init_perfilado
+    init_perfilado(app)
+
+    # GET de informes y calendario sobre el pool de sólo lectura
+    from solo_lectura import init_solo_lectura
+    init_solo_lectura(app)
+
+    # Los blueprints se importan acá y no a nivel de módulo: importar `app`
+    # (wsgi, scripts, benchmarks) no arrastra todos los modelos y servicios
+    # hasta que realmente se crea la aplicación
+    try:
+        from Clientes import bp as clientes_bp
+        from Canchas import bp as canchas_bp
+        from DetalleReserva import bp as detalle_reserva_bp
+        from Reserva import bp as reserva_bp
+        from ReservasApi import bp as reservas_api_bp
+        from reports import bp as informes_bp
+        from Torneo import bp as torneo_bp
+        from Equipo import bp as equipo_bp
+        from EquipoxCliente import bp as equipoxcliente_bp
+        from Partido import bp as partido_bp
+        from Pago import bp as pago_bp
+        from Usuario import bp as usuario_bp
+        from Empleados import bp as empleados_bp
+        from Deporte import bp as deporte_bp
+        from Precios import bp as precios_bp
+        from Admin import bp as admin_bp
+    except Exception as e:
+        # If imports fail, raise a clearer error so the developer can fix import paths
+        raise ImportError(f"Fallo al importar blueprints: {e}")
+
     # Register all blueprints under /api so routes become /api/<route>
     app.register_blueprint(clientes_bp, url_prefix='/api')
     app.register_blueprint(canchas_bp, url_prefix='/api')
@@ -46,83 +80,26 @@ def create_app():
     app.register_blueprint(usuario_bp, url_prefix='/api')
     app.register_blueprint(empleados_bp, url_prefix='/api')
     app.register_blueprint(deporte_bp, url_prefix='/api')
+    app.register_blueprint(precios_bp, url_prefix='/api')
+    app.register_blueprint(admin_bp, url_prefix='/api')
 
     @app.route('/health')
     def health():
         return jsonify({'status': 'ok'})
 
-    # --- seed mínimo para TipoDocumento si está vacío ---
+    @app.route('/health/respuestas')
+    def health_respuestas():
+        """Tiempo de codificación JSON y tamaño de payload acumulados por endpoint"""
+        return jsonify(estadisticas_respuestas())
+
+    # Migraciones de esquema y catálogos por defecto: una sola lectura de
+    # SchemaVersion cuando la base ya está al día
     try:
-        from database.mapeoCanchas import SessionLocal, TipoDocumento
-        # Asegurar que la columna 'descripcion' exista en Cancha (migración ligera)
-        try:
-            from database.mapeoCanchas import ensure_cancha_descripcion_column
-            try:
-                created = ensure_cancha_descripcion_column()
-                if created:
-                    print("Migración: columna 'descripcion' añadida a Cancha")
-            except Exception:
-                # No bloquear el arranque si la migración falla; dejar que admin la resuelva.
-                pass
-            # Asegurar que la columna 'imagen' exista en Cancha (migración ligera)
-            try:
-                from database.mapeoCanchas import ensure_cancha_imagen_column
-                try:
-                    created_img = ensure_cancha_imagen_column()
-                    if created_img:
-                        print("Migración: columna 'imagen' añadida a Cancha")
-                except Exception:
-                    pass
-            except Exception:
-                pass
-            # Asegurar que la columna 'imagen' exista en Usuario (migración ligera)
-            try:
-                from database.mapeoCanchas import ensure_usuario_imagen_column
-                try:
-                    created_usr_img = ensure_usuario_imagen_column()
-                    if created_usr_img:
-                        print("Migración: columna 'imagen' añadida a Usuario")
-                except Exception:
-                    pass
-            except Exception:
-                pass
-            # Asegurar que la columna 'imagen' exista en Torneo (migración ligera)
-            try:
-                from database.mapeoCanchas import ensure_torneo_imagen_column
-                try:
-                    created_trn_img = ensure_torneo_imagen_column()
-                    if created_trn_img:
-                        print("Migración: columna 'imagen' añadida a Torneo")
-                except Exception:
-                    pass
-            except Exception:
-                pass
-            # Asegurar que la columna 'maxIntegrantes' exista en Torneo
-            try:
-                from database.mapeoCanchas import ensure_torneo_max_integrantes_column
-                try:
-                    created_max_int = ensure_torneo_max_integrantes_column()
-                    if created_max_int:
-                        print("Migración: columna 'maxIntegrantes' añadida a Torneo")
-                except Exception:
-                    pass
-            except Exception:
-                pass
-        except Exception:
-            pass
-        session = SessionLocal()
-        try:
-            cnt = session.query(TipoDocumento).count()
-            if cnt == 0:
-                defaults = ['DNI', 'LC', 'LE', 'PASAPORTE']
-                for n in defaults:
-                    session.add(TipoDocumento(nombre=n))
-                session.commit()
-        finally:
-            session.close()
+        from database.migraciones import aplicar_migraciones
+        aplicar_migraciones()
     except Exception:
-        # No bloquear el arranque si algo falla aquí; solo intentamos un seed seguro.
-        pass
+        # No bloquear el arranque; `python database/migraciones.py` permite reintentar
+        logger.exception('No se pudieron aplicar las migraciones de esquema')
 
     # Serve uploaded files from /uploads/<filename> (saved to backend/uploads)
     uploads_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), 'uploads'))
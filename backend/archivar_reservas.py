@@ -0,0 +1,39 @@
+"""
+Script para mover las reservas históricas (con sus detalles y pagos) a las
+tablas de archivo. Debe ejecutarse periódicamente (una vez por día, fuera del
+horario pico) mediante cron/task scheduler. Ver services/archivo_service.py.
+
+Uso (desde backend/):
+    python archivar_reservas.py                  # horizonte ARCHIVO_HORIZONTE_DIAS
+    python archivar_reservas.py --dias 365 --lote 1000
+"""
+import argparse
+import logging
+import os
+import sys
+
+# Agregar el directorio raíz del proyecto al path (backend/ ya está por ser el del script)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend.logging_config import configurar_logging
+from services.archivo_service import HORIZONTE_DIAS, LOTE, archivar
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Archiva las reservas anteriores al horizonte')
+    parser.add_argument('--dias', type=int, default=HORIZONTE_DIAS,
+                        help=f'antigüedad mínima en días de las reservas a archivar ({HORIZONTE_DIAS})')
+    parser.add_argument('--lote', type=int, default=LOTE, help=f'reservas por transacción ({LOTE})')
+    parser.add_argument('--max-lotes', type=int, default=None, help='cortar después de esta cantidad de lotes')
+    args = parser.parse_args()
+
+    configurar_logging()
+    logger.info('Iniciando archivo de reservas históricas')
+    archivar(horizonte_dias=args.dias, lote=args.lote, max_lotes=args.max_lotes)
+    logger.info('Proceso completado')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,337 @@
+"""
+Modo async (ASGI) para las lecturas de disponibilidad y calendario
+
+    cd backend
+    pip install "sqlalchemy[asyncio]" aiosqlite uvicorn
+    uvicorn asgi:app --host 0.0.0.0 --port 5001 --workers 2
+
+Sirve, con los mismos contratos JSON que la app Flask:
+
+    GET /api/canchas/<id>/reservas          (?start, ?end, ?idCancha)
+    GET /api/canchas/<id>/horarios-libres   (?fecha)
+    GET /api/horarios
+    GET /api/reservas/calendar              (?start, ?end)
+    GET /api/stream/disponibilidad          (?idCancha, Last-Event-ID / ?desde)
+    GET /health
+
+Las consultas son las de services/disponibilidad_service.py ejecutadas con
+una AsyncSession (database_async.py), así una espera a la base no bloquea
+un hilo y un proceso atiende miles de sondeos concurrentes del calendario.
+Además, requests idénticos que llegan mientras uno está en curso comparten
+su resultado en lugar de repetir la consulta.
+
+El stream SSE de disponibilidad vive acá y no en gunicorn: en la app Flask
+cada conexión abierta retiene un hilo del worker durante SSE_DURACION_SEGUNDOS,
+mientras que acá es una cola del event loop. Una sola tarea por proceso lee
+los eventos nuevos cada SSE_INTERVALO_MS y los reparte a todas las conexiones
+(SSE_MAX_CONEXIONES_ASYNC, 2000 por defecto).
+
+El resto de la API sigue en la app Flask (wsgi.py): el proxy reverso manda
+estos GET al puerto del modo async y todo lo demás a gunicorn, p. ej. en nginx
+
+    location ~ ^/api/(horarios|reservas/calendar|canchas/\\d+/(reservas|horarios-libres))$ {
+        if ($request_method = GET) { proxy_pass http://127.0.0.1:5001; }
+        proxy_pass http://127.0.0.1:5000;
+    }
+    location = /api/stream/disponibilidad {
+        proxy_pass http://127.0.0.1:5001;
+        proxy_http_version 1.1;
+        proxy_read_timeout 1h;
+    }
+"""
+import asyncio
+import gzip
+import logging
+import os
+import re
+import sys
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import parse_qs
+
+AQUI = Path(__file__).resolve().parent
+ROOT = AQUI.parent
+# Igual que app.py: la raíz primero para que `database` sea el paquete database/
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+if str(AQUI) not in sys.path:
+    sys.path.append(str(AQUI))
+
+from database_async import ASYNC_AVAILABLE, async_engine, SesionAsync
+from services import disponibilidad_service as disp
+from services import eventos_service as eventos
+from json_provider import dumps_bytes
+from compresion import COMPRESION_MIN_BYTES, NIVEL_GZIP
+from logging_config import configurar_logging
+
+if not ASYNC_AVAILABLE:
+    raise RuntimeError(
+        'El modo async requiere SQLAlchemy con asyncio y aiosqlite: '
+        'pip install "sqlalchemy[asyncio]" aiosqlite'
+    )
+
+logger = logging.getLogger(__name__)
+
+
+async def _consultar(stmt, armar):
+    async with SesionAsync() as session:
+        filas = (await session.execute(stmt)).all()
+    return armar(filas)
+
+
+# ---------------- Handlers: devuelven (status, objeto JSON) ----------------
+
+async def _reservas_cancha(idCancha, params):
+    stmt = disp.consulta_reservas_cancha(idCancha, params.get('start'), params.get('end'), params.get('idCancha'))
+    return 200, await _consultar(stmt, disp.armar_reservas_cancha)
+
+
+async def _horarios_libres(idCancha, params):
+    fecha = params.get('fecha')
+    if fecha:
+        fecha_d = disp.fecha_param(fecha)
+        if fecha_d is None:
+            return 400, {'error': 'fecha inválida, usar YYYY-MM-DD'}
+    else:
+        fecha_d = datetime.now().date()
+    return 200, await _consultar(disp.consulta_horarios_libres(idCancha, fecha_d), disp.armar_horarios)
+
+
+async def _horarios(params):
+    return 200, await _consultar(disp.consulta_horarios(), disp.armar_horarios)
+
+
+async def _calendario(params):
+    stmt = disp.consulta_calendario(params.get('start'), params.get('end'))
+    return 200, await _consultar(stmt, disp.armar_calendario)
+
+
+async def _health(params):
+    return 200, {'status': 'ok'}
+
+
+RUTAS = [
+    (re.compile(r'^/api/canchas/(\d+)/reservas$'), _reservas_cancha),
+    (re.compile(r'^/api/canchas/(\d+)/horarios-libres$'), _horarios_libres),
+    (re.compile(r'^/api/horarios$'), _horarios),
+    (re.compile(r'^/api/reservas/calendar$'), _calendario),
+    (re.compile(r'^/health$'), _health),
+]
+
+
+# ---------------- Requests idénticos en curso ----------------
+
+_en_curso = {}
+
+
+async def _resolver(handler, argumentos, params, clave):
+    """Ejecuta el handler una sola vez por clave mientras haya una ejecución pendiente"""
+    tarea = _en_curso.get(clave)
+    if tarea is None:
+        async def _ejecutar():
+            try:
+                status, objeto = await handler(*argumentos, params)
+                return status, dumps_bytes(objeto)
+            finally:
+                _en_curso.pop(clave, None)
+        tarea = asyncio.ensure_future(_ejecutar())
+        _en_curso[clave] = tarea
+    # shield: si un cliente corta, la consulta sigue para los demás que esperan
+    return await asyncio.shield(tarea)
+
+
+# ---------------- Stream SSE de disponibilidad ----------------
+
+SSE_MAX_CONEXIONES = int(os.getenv('SSE_MAX_CONEXIONES_ASYNC', '2000'))
+SSE_DURACION_SEGUNDOS = float(os.getenv('SSE_DURACION_SEGUNDOS', '300'))
+SSE_LATIDO_SEGUNDOS = float(os.getenv('SSE_LATIDO_SEGUNDOS', '15'))
+RUTA_STREAM = '/api/stream/disponibilidad'
+
+
+async def _eventos_desde(ultimo_id, idCancha=None):
+    async with SesionAsync() as session:
+        try:
+            filas = (await session.execute(eventos.consulta_eventos(ultimo_id, idCancha))).all()
+        except Exception:
+            # Sin tabla EventoDisponibilidad (migración 7 no aplicada): sin eventos
+            logger.exception('Error leyendo eventos de disponibilidad')
+            return []
+    return [eventos.fila_a_evento(f) for f in filas]
+
+
+async def _ultimo_evento():
+    async with SesionAsync() as session:
+        try:
+            return (await session.execute(eventos.CONSULTA_ULTIMO_EVENTO)).scalar() or 0
+        except Exception:
+            return 0
+
+
+class CanalAsync:
+    """Como eventos_service.CanalEventos, con colas asyncio y una tarea en lugar de un hilo"""
+
+    def __init__(self):
+        self._suscriptores = {}
+        self._tarea = None
+        self._ultimo = 0
+        self._lock = None
+
+    async def suscribir(self, idCancha=None):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if len(self._suscriptores) >= SSE_MAX_CONEXIONES:
+                return None
+            if self._tarea is None:
+                # Punto de partida fijado antes de devolver la cola (ver CanalEventos.suscribir)
+                self._ultimo = await _ultimo_evento()
+                self._tarea = asyncio.ensure_future(self._seguir())
+            cola = asyncio.Queue()
+            self._suscriptores[cola] = idCancha
+            return cola
+
+    def desuscribir(self, cola):
+        self._suscriptores.pop(cola, None)
+
+    async def _seguir(self):
+        while True:
+            await asyncio.sleep(eventos.INTERVALO_SEGUNDOS)
+            if not self._suscriptores:
+                self._tarea = None
+                return
+            nuevos = await _eventos_desde(self._ultimo)
+            if not nuevos:
+                continue
+            self._ultimo = nuevos[-1]['id']
+            for evento in nuevos:
+                for cola, id_cancha in list(self._suscriptores.items()):
+                    if id_cancha is None or id_cancha == evento['idCancha']:
+                        cola.put_nowait(evento)
+
+
+canal = CanalAsync()
+
+
+async def _stream_disponibilidad(receive, send, params, headers_request):
+    """Mismo contrato que ReservasApi.stream_disponibilidad"""
+    try:
+        idCancha = int(params['idCancha']) if params.get('idCancha') else None
+        desde = headers_request.get(b'last-event-id', b'').decode('latin-1') or params.get('desde')
+        desde = int(desde) if desde else None
+    except ValueError:
+        await _responder(send, 400, dumps_bytes({'error': 'idCancha y Last-Event-ID deben ser enteros'}),
+                         headers_request, 'GET')
+        return
+
+    cola = await canal.suscribir(idCancha)
+    if cola is None:
+        await _responder(send, 503, dumps_bytes({'error': 'Demasiadas conexiones de eventos; reintente más tarde'}),
+                         headers_request, 'GET', extra=[(b'retry-after', b'30')])
+        return
+
+    desconectado = asyncio.Event()
+
+    async def _vigilar():
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+        desconectado.set()
+        cola.put_nowait(None)
+
+    vigilante = asyncio.ensure_future(_vigilar())
+
+    async def _enviar(cuerpo):
+        await send({'type': 'http.response.body', 'body': cuerpo, 'more_body': True})
+
+    try:
+        await send({'type': 'http.response.start', 'status': 200, 'headers': [
+            (b'content-type', b'text/event-stream'),
+            (b'cache-control', b'no-cache'),
+            (b'x-accel-buffering', b'no'),
+        ]})
+        await _enviar(b'retry: 3000\n\n')
+        ultimo = desde or 0
+        if desde is not None:
+            for evento in await _eventos_desde(desde, idCancha):
+                ultimo = evento['id']
+                await _enviar(eventos.mensaje_sse(evento))
+        loop = asyncio.get_running_loop()
+        fin = loop.time() + SSE_DURACION_SEGUNDOS
+        while not desconectado.is_set() and loop.time() < fin:
+            try:
+                evento = await asyncio.wait_for(cola.get(), timeout=min(SSE_LATIDO_SEGUNDOS, fin - loop.time()))
+            except asyncio.TimeoutError:
+                await _enviar(b': ping\n\n')
+                continue
+            if evento is None or evento['id'] <= ultimo:
+                continue
+            ultimo = evento['id']
+            await _enviar(eventos.mensaje_sse(evento))
+        if not desconectado.is_set():
+            await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+    except OSError:
+        # El cliente cortó mientras se escribía (uvicorn: ClientDisconnected)
+        pass
+    finally:
+        canal.desuscribir(cola)
+        vigilante.cancel()
+
+
+# ---------------- ASGI ----------------
+
+async def _responder(send, status, cuerpo, headers_request, metodo, extra=()):
+    headers = [(b'content-type', b'application/json'), (b'vary', b'Accept-Encoding'), *extra]
+    if len(cuerpo) >= COMPRESION_MIN_BYTES and b'gzip' in headers_request.get(b'accept-encoding', b''):
+        cuerpo = gzip.compress(cuerpo, compresslevel=NIVEL_GZIP)
+        headers.append((b'content-encoding', b'gzip'))
+    headers.append((b'content-length', str(len(cuerpo)).encode()))
+    await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+    await send({'type': 'http.response.body', 'body': b'' if metodo == 'HEAD' else cuerpo})
+
+
+async def _lifespan(receive, send):
+    while True:
+        mensaje = await receive()
+        if mensaje['type'] == 'lifespan.startup':
+            configurar_logging()
+            logger.info('Modo async listo (pool de %d conexiones)', async_engine.pool.size())
+            await send({'type': 'lifespan.startup.complete'})
+        elif mensaje['type'] == 'lifespan.shutdown':
+            await async_engine.dispose()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        await _lifespan(receive, send)
+        return
+    if scope['type'] != 'http':
+        return
+
+    headers_request = dict(scope.get('headers') or [])
+    metodo = scope['method']
+    ruta = scope['path']
+    if ruta == RUTA_STREAM and metodo == 'GET':
+        query = scope.get('query_string', b'').decode('latin-1')
+        await _stream_disponibilidad(receive, send, {k: v[0] for k, v in parse_qs(query).items()}, headers_request)
+        return
+    for patron, handler in RUTAS:
+        coincidencia = patron.match(ruta)
+        if coincidencia:
+            break
+    else:
+        await _responder(send, 404, dumps_bytes({'error': 'Not found'}), headers_request, metodo)
+        return
+    if metodo not in ('GET', 'HEAD'):
+        await _responder(send, 405, dumps_bytes({'error': 'Method not allowed'}), headers_request, metodo)
+        return
+
+    query = scope.get('query_string', b'').decode('latin-1')
+    params = {k: v[0] for k, v in parse_qs(query).items()}
+    argumentos = [int(g) for g in coincidencia.groups()]
+    try:
+        status, cuerpo = await _resolver(handler, argumentos, params, (ruta, query))
+    except Exception:
+        logger.exception('Error en %s', ruta)
+        status, cuerpo = 500, dumps_bytes({'error': 'Error interno'})
+    await _responder(send, status, cuerpo, headers_request, metodo)
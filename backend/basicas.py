@@ -2,10 +2,11 @@
 #(LO PONGO EN UN SOLO ARCHIVO PARA QUE SEA MÁS FÁCIL EL IMPORT DE VARIAS FUNCIONES A LA VEZ)
 
 from typing import List, Dict, Any
-from sqlalchemy import func, desc
+from sqlalchemy import func, desc, select
 
 from database.mapeoCanchas import (
 	SessionLocal,
+	de_solo_lectura,
 	Cliente,
 	Cancha,
 	Horario,
@@ -28,54 +29,43 @@ from database.mapeoCanchas import (
 	CanchaxServicio,
     EquipoxCliente,
 )
+from services.precios_service import obtener_tabla
+from services.archivo_service import tablas_reservas
+from serializers import serializador, serializador_filas, valor_json
 
 
 def _to_dict(obj) -> Dict[str, Any]:
 	"""Convierte un objeto ORM a diccionario plano.
 
 	No intenta serializar relaciones complejas; solo devuelve las columnas
-	definidas en la tabla para que sea simple de leer.
+	definidas en la tabla para que sea simple de leer. Las claves son los
+	nombres de atributo del mapper (no los nombres físicos de columna) y las
+	fechas se devuelven como 'YYYY-MM-DD' / 'YYYY-MM-DD HH:MM:SS'.
+
+	Usa el serializador precompilado de la clase (ver serializers.py).
 	"""
 	if obj is None:
 		return {}
-	"""Serialize a SQLAlchemy mapped object to a dict using mapper attribute keys.
+	if getattr(obj, "__mapper__", None) is None:
+		# Fallback: try table columns (best-effort)
+		return {col.key: valor_json(getattr(obj, col.key)) for col in obj.__table__.columns}
+	return serializador(type(obj))(obj)
+
 
-	Using the mapper's column_attrs ensures we use the Python attribute names
-	(column.key) exposed by the ORM instead of the physical DB column names
-	(which may contain non-ASCII characters). This makes JSON stable and
-	avoids AttributeError when the DB column name doesn't match the Python
-	attribute.
+def _proyectar(cls, campos, session, *criterios) -> List[Dict[str, Any]]:
+	"""SELECT de sólo las columnas `campos` de cls (nombres de atributo).
+
+	Devuelve dicts con esas claves, en el mismo formato que _to_dict, sin
+	hidratar objetos ORM ni pasar por el identity map.
 	"""
-	from datetime import date, datetime
-	
-	mapper = getattr(obj, "__mapper__", None)
-	if mapper is None:
-		# Fallback: try table columns (best-effort)
-		result = {}
-		for col in obj.__table__.columns:
-			val = getattr(obj, col.key)
-			# Convert date/datetime to string
-			if isinstance(val, datetime):
-				result[col.key] = val.strftime('%Y-%m-%d %H:%M:%S')
-			elif isinstance(val, date):
-				result[col.key] = val.strftime('%Y-%m-%d')
-			else:
-				result[col.key] = val
-		return result
-
-	result = {}
-	for attr in mapper.column_attrs:
-		key = attr.key
-		# Some mapped attributes may not be present on the instance (deferred); use getattr safely
-		val = getattr(obj, key)
-		# Convert date/datetime to string to avoid GMT timestamp in JSON
-		if isinstance(val, datetime):
-			result[key] = val.strftime('%Y-%m-%d %H:%M:%S')
-		elif isinstance(val, date):
-			result[key] = val.strftime('%Y-%m-%d')
-		else:
-			result[key] = val
-	return result
+	atributos = cls.__mapper__.column_attrs
+	columnas = [getattr(cls, c) for c in campos]
+	tipos = [atributos[c].columns[0].type for c in campos]
+	q = select(*columnas)
+	if criterios:
+		q = q.where(*criterios)
+	fn = serializador_filas(campos, tipos)
+	return [fn(fila) for fila in session.execute(q)]
 
 
 #---------------- Tipo Documento ----------------
@@ -202,6 +192,7 @@ def delete_cliente(idCliente: int) -> bool:
 		session.close()
 
 
+@de_solo_lectura
 def list_reservas_por_cliente_en_periodo(fechaDesde=None, fechaHasta=None, idCliente: int = None) -> List[Dict[str, Any]]:
 	"""Devuelve un listado de reservas agrupadas por cliente dentro de un periodo.
 
@@ -227,17 +218,19 @@ def list_reservas_por_cliente_en_periodo(fechaDesde=None, fechaHasta=None, idCli
 	if fechaDesde is not None and fechaHasta is not None and fechaDesde > fechaHasta:
 		raise ValueError("fechaDesde no puede ser posterior a fechaHasta")
 
+	# Si el periodo llega a reservas archivadas, Reserva es la unión caliente + archivo
+	R = tablas_reservas(fechaDesde).Reserva
 	session = SessionLocal()
 	try:
-		q = session.query(Reserva)
+		q = session.query(R)
 		if idCliente is not None:
-			q = q.filter(Reserva.idCliente == idCliente)
+			q = q.filter(R.idCliente == idCliente)
 		if fechaDesde is not None:
-			q = q.filter(Reserva.fechaReservada >= fechaDesde)
+			q = q.filter(R.fechaReservada >= fechaDesde)
 		if fechaHasta is not None:
-			q = q.filter(Reserva.fechaReservada <= fechaHasta)
+			q = q.filter(R.fechaReservada <= fechaHasta)
 
-		reservas = q.order_by(Reserva.idCliente, Reserva.fechaReservada, Reserva.fechaCreacion).all()
+		reservas = q.order_by(R.idCliente, R.fechaReservada, R.fechaCreacion).all()
 
 		# Agrupar por cliente
 		clientes_map = {}
@@ -329,17 +322,19 @@ def delete_cancha(idCancha: int) -> bool:
 		session.close()
 		
 
+@de_solo_lectura
 def cancha_mas_usada() -> Dict[str, Any]:
 	"""Devuelve un resumen de la cancha más utilizada.
 	La métrica usada es el número de reservas (count distinct idReserva) en las que
-	aparece la cancha según la tabla DetalleReserva.
+	aparece la cancha según la tabla DetalleReserva (incluidas las archivadas).
 	"""
+	D = tablas_reservas().DetalleReserva
 	session = SessionLocal()
 	try:
 		# contar reservas por cancha (distinct idReserva)
 		q = (
-			session.query(CanchaxServicio.idCancha.label('idCancha'), func.count(func.distinct(DetalleReserva.idReserva)).label('cnt'))
-			.join(DetalleReserva, DetalleReserva.idCxS == CanchaxServicio.idCxS)
+			session.query(CanchaxServicio.idCancha.label('idCancha'), func.count(func.distinct(D.idReserva)).label('cnt'))
+			.join(D, D.idCxS == CanchaxServicio.idCxS)
 			.group_by(CanchaxServicio.idCancha)
 			.order_by(desc('cnt'))
 		)
@@ -358,6 +353,7 @@ def cancha_mas_usada() -> Dict[str, Any]:
 		session.close()
 
 
+@de_solo_lectura
 def list_reservas_por_cancha(idCancha: int, fechaDesde=None, fechaHasta=None) -> List[Dict[str, Any]]:
 	"""Devuelve las reservas que incluyen la cancha indicada, con sus detalles (sólo los detalles de esa cancha).
 
@@ -381,31 +377,32 @@ def list_reservas_por_cancha(idCancha: int, fechaDesde=None, fechaHasta=None) ->
 	if fechaDesde is not None and fechaHasta is not None and fechaDesde > fechaHasta:
 		raise ValueError("fechaDesde no puede ser posterior a fechaHasta")
 
+	R, D, _ = tablas_reservas(fechaDesde)
 	session = SessionLocal()
 	try:
 		q = (
-			session.query(Reserva)
-			.join(DetalleReserva, Reserva.idReserva == DetalleReserva.idReserva)
-			.join(CanchaxServicio, DetalleReserva.idCxS == CanchaxServicio.idCxS)
+			session.query(R)
+			.join(D, R.idReserva == D.idReserva)
+			.join(CanchaxServicio, D.idCxS == CanchaxServicio.idCxS)
 			.filter(CanchaxServicio.idCancha == idCancha)
 			.distinct()
 		)
 
 		if fechaDesde is not None:
-			q = q.filter(Reserva.fechaReservada >= fechaDesde)
+			q = q.filter(R.fechaReservada >= fechaDesde)
 		if fechaHasta is not None:
-			q = q.filter(Reserva.fechaReservada <= fechaHasta)
+			q = q.filter(R.fechaReservada <= fechaHasta)
 
-		reservas = q.order_by(Reserva.fechaReservada, Reserva.fechaCreacion).all()
+		reservas = q.order_by(R.fechaReservada, R.fechaCreacion).all()
 
 		results = []
 		for r in reservas:
 			rdict = _to_dict(r)
 			# Obtener sólo los detalles relacionados con esta cancha
 			detalles = (
-				session.query(DetalleReserva)
-				.join(CanchaxServicio, DetalleReserva.idCxS == CanchaxServicio.idCxS)
-				.filter(DetalleReserva.idReserva == r.idReserva, CanchaxServicio.idCancha == idCancha)
+				session.query(D)
+				.join(CanchaxServicio, D.idCxS == CanchaxServicio.idCxS)
+				.filter(D.idReserva == r.idReserva, CanchaxServicio.idCancha == idCancha)
 				.all()
 			)
 			rdict['detalles'] = [_to_dict(d) for d in detalles]
@@ -533,26 +530,8 @@ def list_horarios_libres(idCancha: int, fechaReservada) -> List[Dict[str, Any]]:
 	Parámetros:
 	- idCancha: id de la cancha a consultar
 	- fechaReservada: objeto date (igual que se guarda en Reserva.fechaReservada)"""
-	
-	session = SessionLocal()
-	try:
-		# subquery con horarios ya ocupados para esa cancha y fecha
-		subq = (
-			session.query(DetalleReserva.idHorario)
-			.join(Reserva, Reserva.idReserva == DetalleReserva.idReserva)
-			.filter(DetalleReserva.idCancha == idCancha, Reserva.fechaReservada == fechaReservada)
-			.distinct()
-		)
-
-		occupied = [r[0] for r in subq.all() if r[0] is not None]
-
-		q = session.query(Horario)
-		if occupied:
-			q = q.filter(~Horario.idHorario.in_(occupied))
-
-		return [_to_dict(h) for h in q.order_by(Horario.horaInicio).all()]
-	finally:
-		session.close()
+	from services.disponibilidad_service import horarios_libres
+	return horarios_libres(idCancha, fechaReservada)
 
 
 def update_horario(idHorario: int, horaInicio=None, horaFin=None) -> Dict[str, Any]:
@@ -887,6 +866,7 @@ def update_reserva(idReserva: int, idCliente: int = None, fechaReservada=None, e
 		session.close()
 
 
+@de_solo_lectura
 def reservas_por_cancha() -> List[Dict[str, Any]]:
 	"""Devuelve la cantidad de reservas asociadas a cada cancha.
 
@@ -1239,26 +1219,20 @@ def get_precio_cancha_servicio(idCancha: int, idServicio: int) -> Dict[str, Any]
 	Si no se encuentra la cancha devuelve {}. Si no existe una fila en CanchaxServicio
 	se asume precioAdicional = 0.0.
 	"""
-	session = SessionLocal()
-	try:
-		cancha = session.get(Cancha, idCancha)
-		if not cancha:
-			return {}
-		precio_base = float(cancha.precioHora)
-
-		cvs = session.query(CanchaxServicio).filter_by(idCancha=idCancha, idServicio=idServicio).first()
-		precio_adicional = float(cvs.precioAdicional) if cvs is not None else 0.0
+	tabla = obtener_tabla(idCancha)
+	if tabla is None:
+		return {}
+	precio_base = tabla.precioHora
+	precio_adicional = tabla.porServicio.get(idServicio, 0.0)
 
-		precio_total = precio_base + precio_adicional
-		return {
-			'idCancha': idCancha,
-			'idServicio': idServicio,
-			'precioBase': precio_base,
-			'precioAdicional': precio_adicional,
-			'precioTotal': precio_total,
-		}
-	finally:
-		session.close()
+	precio_total = precio_base + precio_adicional
+	return {
+		'idCancha': idCancha,
+		'idServicio': idServicio,
+		'precioBase': precio_base,
+		'precioAdicional': precio_adicional,
+		'precioTotal': precio_total,
+	}
 
 
 def reservas_por_estado(idEstado: int = None, nombre: str = None) -> List[Dict[str, Any]]:
@@ -1303,6 +1277,7 @@ def pagos_por_estado(idEstado: int = None, nombre: str = None) -> List[Dict[str,
         session.close()
 
 
+@de_solo_lectura
 def utilizacion_mensual(year: int = None, idCancha: int = None) -> List[Dict[str, Any]]:
 	"""Devuelve la utilización mensual de canchas para un año dado.
 
@@ -1315,17 +1290,18 @@ def utilizacion_mensual(year: int = None, idCancha: int = None) -> List[Dict[str
 	if year is None:
 		year = _date.today().year
 
+	R, D, _ = tablas_reservas(_date(int(year), 1, 1))
 	session = SessionLocal()
 	try:
 		# Usamos strftime para extraer mes/año en sqlite. Funciona también en otros backends
 		# cuando SQLAlchemy lo traduce apropiadamente.
-		month_expr = func.strftime('%m', Reserva.fechaReservada)
-		year_expr = func.strftime('%Y', Reserva.fechaReservada)
+		month_expr = func.strftime('%m', R.fechaReservada)
+		year_expr = func.strftime('%Y', R.fechaReservada)
 
 		q = (
-			session.query(month_expr.label('month'), func.count(func.distinct(Reserva.idReserva)).label('cnt'))
-			.join(DetalleReserva, Reserva.idReserva == DetalleReserva.idReserva)
-			.join(CanchaxServicio, DetalleReserva.idCxS == CanchaxServicio.idCxS)
+			session.query(month_expr.label('month'), func.count(func.distinct(R.idReserva)).label('cnt'))
+			.join(D, R.idReserva == D.idReserva)
+			.join(CanchaxServicio, D.idCxS == CanchaxServicio.idCxS)
 		)
 		if idCancha is not None:
 			q = q.filter(CanchaxServicio.idCancha == idCancha)
@@ -0,0 +1,178 @@
+"""
+Throughput bajo concurrencia contra un servidor HTTP real
+
+Uso (desde backend/):
+    # contra un servidor ya levantado
+    python benchmarks/bench_concurrencia.py --url http://127.0.0.1:5000 --clientes 1,8,32
+
+    # levanta gunicorn (gunicorn.conf.py) con 1, 2 y 4 workers sobre la base sintética
+    python benchmarks/bench_concurrencia.py --db /tmp/bench.db --workers 1,2,4 --clientes 8,32,128
+
+Cada cliente es un hilo con su propia conexión keep-alive que pide en ronda
+las rutas de --rutas durante --duracion segundos. Por cada combinación
+(workers, clientes) se informa requests/s, p50/p95 en ms y errores; el
+resultado queda en benchmarks/resultados/concurrencia.json.
+
+En un Linux multinúcleo el throughput de lectura debería crecer casi lineal
+con los workers hasta la cantidad de núcleos; las altas de reservas no,
+porque SQLite serializa las escrituras (ver gunicorn.conf.py).
+"""
+import argparse
+import http.client
+import json
+import os
+import platform
+import signal
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from urllib.parse import urlsplit
+
+AQUI = Path(__file__).resolve().parent
+RESULTADO = AQUI / 'resultados' / 'concurrencia.json'
+
+
+def _rutas_por_defecto():
+    hoy = date.today()
+    semana = f'start={hoy.isoformat()}&end={(hoy + timedelta(days=7)).isoformat()}'
+    return ['/api/canchas', '/api/horarios', f'/api/canchas/1/reservas?{semana}']
+
+
+def _cliente(host, puerto, rutas, fin, latencias, errores):
+    conexion = http.client.HTTPConnection(host, puerto, timeout=30)
+    i = 0
+    while time.perf_counter() < fin:
+        ruta = rutas[i % len(rutas)]
+        i += 1
+        t0 = time.perf_counter()
+        try:
+            conexion.request('GET', ruta, headers={'Accept-Encoding': 'gzip'})
+            respuesta = conexion.getresponse()
+            respuesta.read()
+            if respuesta.status >= 400:
+                errores.append(respuesta.status)
+                continue
+        except (OSError, http.client.HTTPException) as e:
+            errores.append(type(e).__name__)
+            conexion.close()
+            conexion = http.client.HTTPConnection(host, puerto, timeout=30)
+            continue
+        latencias.append((time.perf_counter() - t0) * 1000)
+    conexion.close()
+
+
+def medir(url, clientes, duracion, rutas):
+    partes = urlsplit(url)
+    latencias, errores = [], []
+    fin = time.perf_counter() + duracion
+    hilos = [
+        threading.Thread(target=_cliente, args=(partes.hostname, partes.port or 80, rutas, fin, latencias, errores))
+        for _ in range(clientes)
+    ]
+    inicio = time.perf_counter()
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+    transcurrido = time.perf_counter() - inicio
+    latencias.sort()
+    return {
+        'clientes': clientes,
+        'requests': len(latencias),
+        'rps': round(len(latencias) / transcurrido, 1),
+        'p50_ms': round(statistics.median(latencias), 2) if latencias else None,
+        'p95_ms': round(latencias[int(len(latencias) * 0.95) - 1], 2) if len(latencias) >= 20 else None,
+        'errores': len(errores),
+    }
+
+
+def _esperar_servidor(url, proceso, limite=60):
+    partes = urlsplit(url)
+    fin = time.time() + limite
+    while time.time() < fin:
+        if proceso.poll() is not None:
+            raise RuntimeError('gunicorn terminó antes de aceptar conexiones')
+        try:
+            conexion = http.client.HTTPConnection(partes.hostname, partes.port, timeout=2)
+            conexion.request('GET', '/health')
+            if conexion.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.3)
+    raise RuntimeError(f'{url} no respondió en {limite} s')
+
+
+def _levantar_gunicorn(db, workers, hilos, puerto):
+    entorno = dict(
+        os.environ,
+        DATABASE_URL=f'sqlite:///{Path(db).resolve().as_posix()}',
+        WEB_CONCURRENCY=str(workers),
+        GUNICORN_THREADS=str(hilos),
+        GUNICORN_BIND=f'127.0.0.1:{puerto}',
+        LOG_LEVEL=os.environ.get('LOG_LEVEL', 'WARNING'),
+        SQL_QUERY_BUDGET='0',
+        SLOW_QUERY_MS='0',
+    )
+    return subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app'],
+        cwd=AQUI.parent, env=entorno,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Throughput bajo concurrencia')
+    parser.add_argument('--url', default=None, help='servidor ya levantado (si no, se usa --db y --workers)')
+    parser.add_argument('--db', default=None, help='base SQLite para levantar gunicorn (nunca la del proyecto)')
+    parser.add_argument('--workers', default='1,2,4', help='cantidades de workers de gunicorn a probar')
+    parser.add_argument('--hilos', type=int, default=4, help='hilos por worker')
+    parser.add_argument('--clientes', default='1,8,32', help='clientes concurrentes a probar')
+    parser.add_argument('--duracion', type=float, default=10.0, help='segundos por medición')
+    parser.add_argument('--rutas', default=None, help='rutas GET separadas por coma')
+    parser.add_argument('--puerto', type=int, default=5055)
+    args = parser.parse_args()
+
+    rutas = args.rutas.split(',') if args.rutas else _rutas_por_defecto()
+    niveles = [int(c) for c in args.clientes.split(',')]
+    filas = []
+
+    if args.url:
+        for clientes in niveles:
+            fila = dict(medir(args.url, clientes, args.duracion, rutas), workers=None)
+            filas.append(fila)
+            print(f"clientes={clientes:4d}  {fila['rps']:8.1f} req/s  p50={fila['p50_ms']} ms  "
+                  f"p95={fila['p95_ms']} ms  errores={fila['errores']}")
+    else:
+        if not args.db or not Path(args.db).exists():
+            parser.error('sin --url hace falta --db con una base existente (ver sembrar_datos.py)')
+        url = f'http://127.0.0.1:{args.puerto}'
+        for workers in [int(w) for w in args.workers.split(',')]:
+            proceso = _levantar_gunicorn(args.db, workers, args.hilos, args.puerto)
+            try:
+                _esperar_servidor(url, proceso)
+                medir(url, 1, 1.0, rutas)  # calentamiento
+                for clientes in niveles:
+                    fila = dict(medir(url, clientes, args.duracion, rutas), workers=workers)
+                    filas.append(fila)
+                    print(f"workers={workers:2d}  clientes={clientes:4d}  {fila['rps']:8.1f} req/s  "
+                          f"p50={fila['p50_ms']} ms  p95={fila['p95_ms']} ms  errores={fila['errores']}")
+            finally:
+                proceso.send_signal(signal.SIGTERM)
+                proceso.wait(timeout=60)
+
+    RESULTADO.parent.mkdir(parents=True, exist_ok=True)
+    RESULTADO.write_text(json.dumps({
+        'fecha': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'entorno': {'python': platform.python_version(), 'nucleos': os.cpu_count(), 'sistema': platform.platform()},
+        'hilosPorWorker': args.hilos,
+        'rutas': rutas,
+        'mediciones': filas,
+    }, indent=2, ensure_ascii=False), encoding='utf-8')
+    print(f'\nResultado en {RESULTADO}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,280 @@
+"""
+Benchmark de los endpoints más usados a través del cliente de pruebas de Flask
+
+Uso (desde backend/):
+    python benchmarks/bench_endpoints.py --db /tmp/bench.db [--sembrar] [--repeticiones 20]
+        [--presupuesto 15] [--solo calendario,pagos] [--guardar-baseline] [--tolerancia 0.25]
+
+La base se genera con benchmarks/sembrar_datos.py (o con --sembrar si no existe;
+nunca se usa la base del proyecto, porque el benchmark crea y borra reservas).
+
+Cada escenario se repite hasta --repeticiones veces o hasta agotar
+--presupuesto segundos (los endpoints con N+1 sobre una base grande pueden
+tardar varios segundos por request). Se registra p50/p95/media/mínimo en ms,
+consultas SQL por request (X-Query-Count) y bytes de respuesta. El resultado se guarda en
+benchmarks/resultados/ultimo.json; con --guardar-baseline también en
+benchmarks/baseline.json. Si existe un baseline, se compara contra él y el
+proceso termina con código 1 cuando el p50 de algún escenario empeora más que
+--tolerancia (0.25 = 25 %).
+
+Las fechas de los requests salen de la fecha ancla con que se generó la base
+(tabla DatosBenchmark, ver sembrar_datos.py), así una misma base recibe los
+mismos requests cualquier día; los parámetros de la base quedan en el
+resultado (`datos`) y se avisa si no coinciden con los del baseline.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+from importlib.metadata import version
+from pathlib import Path
+
+AQUI = Path(__file__).resolve().parent
+sys.path.insert(0, str(AQUI.parent))
+sys.path.insert(0, str(AQUI.parent.parent))
+
+BASELINE = AQUI / 'baseline.json'
+ULTIMO = AQUI / 'resultados' / 'ultimo.json'
+CALENTAMIENTO = 2
+MIN_MUESTRAS = 3
+
+
+def _preparar_entorno(ruta_db):
+    # database.py lee DATABASE_URL al importarse: hay que fijarlo antes de importar la app
+    os.environ['DATABASE_URL'] = f'sqlite:///{Path(ruta_db).resolve().as_posix()}'
+    os.environ.setdefault('LOG_LEVEL', 'ERROR')
+    os.environ.setdefault('SQL_QUERY_BUDGET', '0')
+    os.environ.setdefault('SQL_REPETICIONES_N1', '1000000')
+    os.environ.setdefault('SLOW_QUERY_MS', '0')
+
+
+def _datos_referencia():
+    """Ids y fechas reales de la base para armar los requests"""
+    from sqlalchemy import func
+    from database.mapeoCanchas import SessionLocal, Cancha, Cliente, Reserva, Usuario
+    from sembrar_datos import leer_parametros
+
+    session = SessionLocal()
+    try:
+        total_reservas = session.query(func.count(Reserva.idReserva)).scalar()
+        id_cancha = session.query(Cancha.idCancha).filter(Cancha.estado == 1).order_by(Cancha.idCancha).first()[0]
+        id_cliente = (
+            session.query(Cliente.idCliente)
+            .join(Usuario, Cliente.idUsuario == Usuario.idUsuario)
+            .filter(Usuario.permisos == 1)
+            .order_by(Cliente.idCliente)
+            .first()[0]
+        )
+        ultimas = [r[0] for r in session.query(Reserva.idReserva).order_by(Reserva.idReserva.desc()).limit(500)]
+        maxima = session.query(func.max(Reserva.fechaReservada)).scalar()
+        # Bases generadas antes de registrar los parámetros: se usa la fecha de hoy
+        datos = leer_parametros(session.connection())
+        return {'idCancha': id_cancha, 'idCliente': id_cliente, 'idsReserva': ultimas,
+                'totalReservas': total_reservas, 'ultimaFecha': maxima, 'datos': datos,
+                'fechaAncla': date.fromisoformat(datos['fechaAncla']) if 'fechaAncla' in datos else date.today()}
+    finally:
+        session.close()
+
+
+def _escenarios(ref):
+    hoy = ref['fechaAncla']
+    mes_desde, mes_hasta = (hoy - timedelta(days=30)).isoformat(), hoy.isoformat()
+    semana_desde, semana_hasta = hoy.isoformat(), (hoy + timedelta(days=7)).isoformat()
+    anio = (hoy - timedelta(days=365)).isoformat()
+    c = ref['idCancha']
+    return [
+        ('canchas.listado', 'GET', '/api/canchas', None),
+        ('disponibilidad.cancha-semana', 'GET', f'/api/canchas/{c}/reservas?start={semana_desde}&end={semana_hasta}', None),
+        ('disponibilidad.resumen', 'GET', f'/api/canchas/{c}/reservas-resumen', None),
+        ('calendario.semana', 'GET', f'/api/reservas/calendar?start={semana_desde}&end={semana_hasta}', None),
+        ('calendario.mes', 'GET', f'/api/reservas/calendar?start={mes_desde}&end={mes_hasta}', None),
+        ('informes.reporte-reservas-cancha', 'GET',
+         f'/api/informes/reporte-reservas-cancha?idCancha={c}&start={mes_desde}&end={mes_hasta}', None),
+        ('informes.canchas-mas-usadas', 'GET', f'/api/informes/reporte-canchas-mas-usadas?start={anio}&end={mes_hasta}', None),
+        ('informes.utilizacion-mensual', 'GET', f'/api/informes/utilizacion-mensual?year={hoy.year}', None),
+        ('pagos.todos-pagina', 'GET', '/api/pagos/todos?limit=100', None),
+        ('pagos.por-reservas', 'POST', '/api/pagos/reservas', {'ids': ref['idsReserva']}),
+        ('precios.cotizar-grilla', 'POST', '/api/precios/cotizar', {'grilla': {
+            'canchas': [c], 'fechas': [(hoy + timedelta(days=d)).isoformat() for d in range(7)],
+            'horarios': list(range(1, 11)), 'servicios': []}}),
+    ]
+
+
+def _medir(hacer, repeticiones, presupuesto):
+    """
+    Ejecuta `hacer()` (devuelve la respuesta) CALENTAMIENTO + repeticiones veces.
+    Un endpoint lento corta antes: el calentamiento termina con la primera
+    llamada de más de un segundo y las mediciones paran al superar
+    `presupuesto` segundos, siempre con al menos MIN_MUESTRAS.
+    """
+    for _ in range(CALENTAMIENTO):
+        t0 = time.perf_counter()
+        hacer()
+        if time.perf_counter() - t0 > 1.0:
+            break
+    tiempos, consultas, tamanios = [], [], []
+    inicio = time.perf_counter()
+    while len(tiempos) < repeticiones:
+        t0 = time.perf_counter()
+        r = hacer()
+        tiempos.append((time.perf_counter() - t0) * 1000)
+        consultas.append(int(r.headers.get('X-Query-Count', 0)))
+        tamanios.append(len(r.get_data()))
+        if len(tiempos) >= MIN_MUESTRAS and time.perf_counter() - inicio > presupuesto:
+            break
+    return tiempos, consultas, tamanios
+
+
+def _request(cliente, metodo, url, cuerpo):
+    def hacer():
+        r = cliente.open(url, method=metodo, json=cuerpo)
+        if r.status_code >= 400:
+            raise RuntimeError(f'{metodo} {url} devolvió {r.status_code}: {r.get_data(as_text=True)[:200]}')
+        return r
+    return hacer
+
+
+def _alta_reserva(cliente, ref):
+    """Alta en turnos libres lejanos; cada reserva se borra fuera de la medición"""
+    # La app rechaza fechas pasadas: acá cuenta el hoy real, no la fecha ancla
+    base = max(ref['ultimaFecha'], date.today()) + timedelta(days=30)
+    contador = iter(range(10 ** 6))
+    pendientes = []
+
+    def hacer():
+        if pendientes:
+            cliente.delete(f'/api/reserva/{pendientes.pop()}')
+        i = next(contador)
+        cuerpo = {'idCancha': ref['idCancha'], 'idCliente': ref['idCliente'],
+                  'fechaReservada': (base + timedelta(days=i // 10)).isoformat(), 'idHorario': i % 10 + 1}
+        r = cliente.post('/api/reservas', json=cuerpo)
+        if r.status_code != 201:
+            raise RuntimeError(f'POST /api/reservas devolvió {r.status_code}: {r.get_data(as_text=True)[:200]}')
+        pendientes.append(r.get_json()['idReserva'])
+        return r
+
+    def limpiar():
+        while pendientes:
+            cliente.delete(f'/api/reserva/{pendientes.pop()}')
+
+    return hacer, limpiar
+
+
+def _resumen(tiempos, consultas, tamanios):
+    ordenados = sorted(tiempos)
+    p95 = ordenados[min(len(ordenados) - 1, int(round(0.95 * (len(ordenados) - 1))))]
+    return {
+        'p50Ms': round(statistics.median(ordenados), 3),
+        'p95Ms': round(p95, 3),
+        'mediaMs': round(statistics.fmean(ordenados), 3),
+        'minMs': round(ordenados[0], 3),
+        'consultas': round(statistics.fmean(consultas), 1),
+        'bytes': int(statistics.fmean(tamanios)),
+        'repeticiones': len(tiempos),
+    }
+
+
+def _comparar(actual, baseline, tolerancia):
+    """Imprime la comparación y devuelve los escenarios que empeoraron"""
+    regresiones = []
+    previos = baseline.get('resultados', {})
+    print(f"\nComparación con baseline del {baseline.get('fecha', '?')} (tolerancia {tolerancia:.0%} en p50)")
+    if baseline.get('datos') != actual.get('datos'):
+        print(f"  AVISO: la base no se generó igual que la del baseline: {baseline.get('datos')} vs {actual.get('datos')}")
+    for nombre, res in actual['resultados'].items():
+        previo = previos.get(nombre)
+        if not previo:
+            print(f'  {nombre:<36} (nuevo)')
+            continue
+        delta = (res['p50Ms'] - previo['p50Ms']) / previo['p50Ms'] if previo['p50Ms'] else 0.0
+        marca = ''
+        if delta > tolerancia:
+            marca = '  <-- REGRESIÓN'
+            regresiones.append(nombre)
+        extra = ''
+        if res['consultas'] != previo.get('consultas'):
+            extra = f"  consultas {previo.get('consultas')} -> {res['consultas']}"
+        print(f"  {nombre:<36} {previo['p50Ms']:9.2f} -> {res['p50Ms']:9.2f} ms ({delta:+.0%}){extra}{marca}")
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db', required=True, help='base generada con sembrar_datos.py')
+    parser.add_argument('--sembrar', action='store_true', help='generar la base con la escala por defecto si no existe')
+    parser.add_argument('--repeticiones', type=int, default=20)
+    parser.add_argument('--presupuesto', type=float, default=15.0,
+                        help='segundos máximos de medición por escenario')
+    parser.add_argument('--solo', help='nombres (o prefijos) de escenarios separados por coma')
+    parser.add_argument('--baseline', default=str(BASELINE))
+    parser.add_argument('--guardar-baseline', action='store_true')
+    parser.add_argument('--tolerancia', type=float, default=0.25)
+    args = parser.parse_args()
+
+    ruta = Path(args.db)
+    if not ruta.exists():
+        if not args.sembrar:
+            parser.error(f'{ruta} no existe; generarla con benchmarks/sembrar_datos.py o usar --sembrar')
+        from sembrar_datos import sembrar
+        print(f'Generando {ruta}...')
+        sembrar(ruta)
+
+    _preparar_entorno(ruta)
+    from app import create_app
+
+    app = create_app()
+    cliente = app.test_client()
+    ref = _datos_referencia()
+    filtros = [f.strip() for f in (args.solo or '').split(',') if f.strip()]
+
+    def incluir(nombre):
+        return not filtros or any(nombre.startswith(f) for f in filtros)
+
+    resultados = {}
+
+    def registrar(nombre, hacer):
+        res = resultados[nombre] = _resumen(*_medir(hacer, args.repeticiones, args.presupuesto))
+        print(f"{nombre:<36} p50 {res['p50Ms']:9.2f} ms  p95 {res['p95Ms']:9.2f} ms"
+              f"  {res['consultas']:7.1f} consultas  ({res['repeticiones']} muestras)")
+
+    for nombre, metodo, url, cuerpo in _escenarios(ref):
+        if incluir(nombre):
+            registrar(nombre, _request(cliente, metodo, url, cuerpo))
+    if incluir('reservas.crear'):
+        hacer, limpiar = _alta_reserva(cliente, ref)
+        try:
+            registrar('reservas.crear', hacer)
+        finally:
+            limpiar()
+
+    actual = {
+        'fecha': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'entorno': {'python': platform.python_version(), 'flask': version('flask'),
+                    'sqlalchemy': version('sqlalchemy'), 'plataforma': platform.platform()},
+        'datos': ref['datos'],
+        'reservasEnBase': ref['totalReservas'],
+        'repeticiones': args.repeticiones,
+        'resultados': resultados,
+    }
+
+    ULTIMO.parent.mkdir(exist_ok=True)
+    ULTIMO.write_text(json.dumps(actual, indent=2, ensure_ascii=False), encoding='utf-8')
+    ruta_baseline = Path(args.baseline)
+    if args.guardar_baseline:
+        ruta_baseline.write_text(json.dumps(actual, indent=2, ensure_ascii=False), encoding='utf-8')
+        print(f'\nBaseline guardado en {ruta_baseline}')
+        return 0
+    if ruta_baseline.exists():
+        regresiones = _comparar(actual, json.loads(ruta_baseline.read_text(encoding='utf-8')), args.tolerancia)
+        if regresiones:
+            print(f"\n{len(regresiones)} escenario(s) con regresión: {', '.join(regresiones)}")
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
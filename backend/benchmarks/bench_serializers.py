@@ -0,0 +1,102 @@
+"""
+Microbenchmark: serializers precompilados vs. el _to_dict original
+
+Uso (desde backend/):
+    python benchmarks/bench_serializers.py [--filas 100000] [--repeticiones 3]
+
+Mide sobre una base SQLite en memoria con la tabla Reserva:
+- _to_dict original (mapper.column_attrs + getattr + isinstance por valor)
+- serializador precompilado sobre objetos ORM ya cargados
+- serializador de filas Core (sin hidratar objetos ORM)
+"""
+import argparse
+import sys
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+AQUI = Path(__file__).resolve().parent
+sys.path.insert(0, str(AQUI.parent))
+sys.path.insert(0, str(AQUI.parent.parent))
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import sessionmaker
+
+from database.mapeoCanchas import Reserva
+from serializers import serializador, serializar_resultado
+
+
+def _to_dict_original(obj):
+    """Copia de basicas._to_dict previo a los serializadores precompilados"""
+    from datetime import date, datetime
+
+    result = {}
+    for attr in obj.__mapper__.column_attrs:
+        key = attr.key
+        val = getattr(obj, key)
+        if isinstance(val, datetime):
+            result[key] = val.strftime('%Y-%m-%d %H:%M:%S')
+        elif isinstance(val, date):
+            result[key] = val.strftime('%Y-%m-%d')
+        else:
+            result[key] = val
+    return result
+
+
+def _medir(nombre, fn, repeticiones):
+    mejor = None
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        resultado = fn()
+        dt = time.perf_counter() - t0
+        mejor = dt if mejor is None else min(mejor, dt)
+    print(f'{nombre:<40} {mejor * 1000:10.1f} ms')
+    return mejor, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--filas', type=int, default=100_000)
+    parser.add_argument('--repeticiones', type=int, default=3)
+    args = parser.parse_args()
+
+    engine = create_engine('sqlite://')
+    Reserva.__table__.create(engine)
+    base = datetime(2025, 1, 1, 9, 0, 0)
+    with engine.begin() as conn:
+        conn.execute(insert(Reserva.__table__), [
+            {
+                'idCliente': i % 50 + 1,
+                'fechaReservada': date(2025, 1, 1) + timedelta(days=i % 365),
+                'estado': i % 4 + 1,
+                'monto': 8000.0 + (i % 7) * 500,
+                'fechaCreacion': base + timedelta(minutes=i),
+            }
+            for i in range(args.filas)
+        ])
+
+    session = sessionmaker(bind=engine)()
+    objetos = session.query(Reserva).all()
+    print(f'{len(objetos)} filas de Reserva\n')
+
+    t_original, esperado = _medir('_to_dict original (ORM)', lambda: [_to_dict_original(o) for o in objetos], args.repeticiones)
+    fn = serializador(Reserva)
+    t_orm, obtenido = _medir('serializador precompilado (ORM)', lambda: [fn(o) for o in objetos], args.repeticiones)
+    assert obtenido == esperado, 'El serializador ORM no coincide con _to_dict'
+
+    stmt = select(Reserva.__table__)
+    with engine.connect() as conn:
+        t_core, filas = _medir('serializador de filas Core', lambda: serializar_resultado(conn.execute(stmt), stmt), args.repeticiones)
+    assert filas == esperado, 'El serializador Core no coincide con _to_dict'
+
+    t_hidratar, _ = _medir('hidratar ORM + serializador', lambda: [fn(o) for o in sessionmaker(bind=engine)().query(Reserva).all()], 1)
+    t_hidratar_original, _ = _medir('hidratar ORM + _to_dict original', lambda: [_to_dict_original(o) for o in sessionmaker(bind=engine)().query(Reserva).all()], 1)
+
+    print()
+    print(f'ORM precompilado: {t_original / t_orm:5.1f}x más rápido que _to_dict')
+    print(f'Core (incluye consulta) vs hidratar + _to_dict: {t_hidratar_original / t_core:5.1f}x')
+    session.close()
+
+
+if __name__ == '__main__':
+    main()
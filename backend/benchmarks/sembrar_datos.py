@@ -0,0 +1,381 @@
+"""
+Generador de datos sintéticos para medir el sistema de reservas
+
+Uso (desde backend/):
+    python benchmarks/sembrar_datos.py --db /tmp/bench.db [--canchas 24] [--clientes 2000]
+        [--anios 2] [--ocupacion 0.45] [--torneos 12] [--semilla 42] [--fecha-ancla 2026-01-01] [--forzar]
+
+Crea una base SQLite nueva con el esquema de backend/models.py y la llena con:
+- los catálogos de la base de referencia (estados, deportes, servicios, horarios,
+  métodos de pago, permisos), con los mismos ids que usa la lógica de negocio
+- canchas por deporte con precio, techada/sin techar y servicios adicionales
+- clientes con su usuario; unos pocos clientes concentran muchas reservas
+- `anios` años de reservas hacia atrás de la fecha ancla (y 30 días hacia
+  adelante) con más
+  demanda a la tarde-noche y los fines de semana; parte de las reservas toma
+  dos turnos seguidos o servicios extra, y el monto sale del motor de precios
+- pagos para las reservas confirmadas/finalizadas, torneos con equipos,
+  integrantes y partidos
+
+Las fechas salen de --fecha-ancla (el "hoy" de los datos generados, fijo por
+defecto), no de la fecha en que se corre: con la misma semilla y la misma
+fecha ancla los datos son idénticos entre corridas. Los parámetros quedan en
+la tabla DatosBenchmark de la base generada, de donde los toma
+bench_endpoints.py para armar los requests y registrarlos en el resultado.
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+AQUI = Path(__file__).resolve().parent
+sys.path.insert(0, str(AQUI.parent))
+sys.path.insert(0, str(AQUI.parent.parent))
+
+from sqlalchemy import create_engine, event, func, insert, select, text
+from sqlalchemy.orm import sessionmaker
+
+from database.mapeoCanchas import (
+    Base, TipoDocumento, EstadoCancha, EstadoReserva, EstadoTorneo, EstadoPago, Deporte,
+    Servicio, Horario, MetodoPago, Permiso, Usuario, Cliente, Empleado, Cancha,
+    CanchaxServicio, Reserva, DetalleReserva, Pago, Torneo, TorneoxCancha, Equipo,
+    EquipoxCliente, Partido,
+)
+from services.precios_service import compilar_tablas, cotizar
+
+# "Hoy" de los datos generados: reservas pasadas/futuras, resultados de partidos
+FECHA_ANCLA = date(2026, 1, 1)
+
+# Catálogos tal como están en database/DatabaseCanchas.db
+CATALOGOS = {
+    TipoDocumento: [{'idTipoDoc': i, 'nombre': n} for i, n in enumerate(['Pasaporte', 'DNI', 'CUIL'], 1)],
+    EstadoCancha: [{'idEstado': i, 'nombre': n} for i, n in enumerate(['activa', 'en mantenimiento'], 1)],
+    EstadoReserva: [{'idEstado': i, 'nombre': n} for i, n in enumerate(
+        ['Pendiente', 'Confirmada', 'Cancelada', 'Finalizada'], 1)],
+    EstadoTorneo: [{'idEstadoTorneo': i, 'nombre': n} for i, n in enumerate(['activo', 'suspendido', 'cancelado'], 1)],
+    EstadoPago: [{'idEstado': i, 'nombre': n} for i, n in enumerate(
+        ['pendiente', 'completado', 'rechazado', 'Pendiente', 'Pagado', 'Cancelado', 'Reembolsado'], 1)],
+    Deporte: [{'idDeporte': i, 'nombre': n} for i, n in enumerate(
+        ['Padel', 'Futbol', 'Tenis', 'Hockey', 'Volley', 'Basquet'], 1)],
+    Servicio: [{'idServicio': i, 'descripcion': n} for i, n in enumerate([
+        'Iluminación', 'Estacionamiento', 'Alquiler de pelotas', 'Alquiler de raquetas',
+        'Alquiler de remeras / pecheras', 'Servicio de bar o kiosco', 'WiFi', 'Comida post partido', 'ninguno',
+    ], 1)],
+    Horario: [{'idHorario': i, 'horaInicio': a, 'horaFin': b} for i, (a, b) in enumerate([
+        ('09:00', '10:30'), ('10:30', '12:00'), ('12:00', '13:30'), ('13:30', '15:00'), ('15:00', '16:30'),
+        ('16:30', '18:00'), ('18:00', '19:30'), ('19:30', '21:00'), ('21:00', '22:30'), ('22:30', '00:00'),
+    ], 1)],
+    MetodoPago: [{'idMetodoPago': i, 'descripcion': n} for i, n in enumerate([
+        'Efectivo', 'Débido', 'Crédito', 'Transferencia', 'Tarjeta de Débito', 'Tarjeta de Crédito',
+        'Transferencia Bancaria', 'MercadoPago',
+    ], 1)],
+    Permiso: [{'idPermiso': i, 'nombre': n} for i, n in enumerate(['Cliente', 'Administrador', 'supervisor'], 1)],
+}
+
+ID_SERVICIO_ILUMINACION = 1
+ID_SERVICIO_NINGUNO = 9
+# Servicio -> precio adicional de referencia
+PRECIOS_SERVICIO = {2: 1000, 3: 1500, 4: 3000, 5: 2000, 6: 10000, 7: 200, 8: 20000}
+# Deporte -> (prefijo del nombre, precio por turno de referencia, peso en la cantidad de canchas)
+DEPORTES = {1: ('P', 8000, 0.35), 2: ('F', 12000, 0.25), 3: ('T', 9000, 0.15),
+            4: ('H', 14000, 0.05), 5: ('V', 7000, 0.10), 6: ('B', 10000, 0.10)}
+
+# Demanda relativa por turno (idHorario 1..10) y por día de la semana (lunes=0)
+DEMANDA_HORARIO = [0.35, 0.40, 0.45, 0.40, 0.45, 0.60, 0.90, 1.00, 0.95, 0.60]
+DEMANDA_DIA = [0.80, 0.80, 0.85, 0.90, 1.00, 1.15, 0.90]
+_DEMANDA_MEDIA = (sum(DEMANDA_HORARIO) / len(DEMANDA_HORARIO)) * (sum(DEMANDA_DIA) / len(DEMANDA_DIA))
+
+ESTADO_PENDIENTE, ESTADO_CONFIRMADA, ESTADO_CANCELADA, ESTADO_FINALIZADA = 1, 2, 3, 4
+PAGO_PENDIENTE, PAGO_PAGADO, PAGO_REEMBOLSADO = 4, 5, 7
+
+NOMBRES = ['Valentina', 'Martín', 'Sofía', 'Juan', 'Camila', 'Mateo', 'Lucía', 'Santiago', 'Agustina',
+           'Tomás', 'Julieta', 'Nicolás', 'Florencia', 'Facundo', 'Micaela', 'Joaquín', 'Carolina',
+           'Franco', 'Paula', 'Bautista', 'Ana María', 'Ricardo', 'Milagros', 'Ignacio']
+APELLIDOS = ['Pérez', 'González', 'Rodríguez', 'Fernández', 'López', 'Martínez', 'García', 'Romero',
+             'Sosa', 'Álvarez', 'Torres', 'Ruiz', 'Ramírez', 'Flores', 'Acosta', 'Benítez', 'Medina',
+             'Herrera', 'Suárez', 'Aguirre', 'Giménez', 'Gutiérrez', 'Molina', 'Castro']
+
+LOTE_INSERCION = 5000
+
+
+def _insertar(session, modelo, filas):
+    """INSERT masivo del ORM: las filas usan los nombres de atributo del modelo"""
+    for i in range(0, len(filas), LOTE_INSERCION):
+        session.execute(insert(modelo), filas[i:i + LOTE_INSERCION])
+
+
+def _elegir_ponderado(rnd, opciones):
+    """opciones: [(valor, peso)]"""
+    return rnd.choices([v for v, _ in opciones], weights=[p for _, p in opciones])[0]
+
+
+def _generar_canchas(rnd, cantidad):
+    canchas, cxs = [], []
+    id_cxs = 1
+    por_deporte = {}
+    for id_cancha in range(1, cantidad + 1):
+        # Al menos una cancha por deporte, el resto según el peso de cada uno
+        if id_cancha <= len(DEPORTES):
+            deporte = id_cancha
+        else:
+            deporte = _elegir_ponderado(rnd, [(d, peso) for d, (_, _, peso) in DEPORTES.items()])
+        prefijo, precio_ref, _ = DEPORTES[deporte]
+        numero = por_deporte[deporte] = por_deporte.get(deporte, 0) + 1
+        precio = round(precio_ref * rnd.uniform(0.95, 1.15) / 500) * 500
+        canchas.append({
+            'idCancha': id_cancha,
+            'nombre': f'{prefijo}{numero}',
+            'deporte': deporte,
+            'precioHora': float(precio),
+            'estado': 1 if rnd.random() < 0.92 else 2,
+            'descripcion': 'techada' if rnd.random() < 0.4 else 'sin techar',
+            'imagen': None,
+        })
+        servicios = [(ID_SERVICIO_NINGUNO, 0.0),
+                     (ID_SERVICIO_ILUMINACION, float(round(precio * rnd.uniform(0.05, 0.1) / 50) * 50))]
+        for id_servicio in rnd.sample(sorted(PRECIOS_SERVICIO), rnd.randint(2, 4)):
+            servicios.append((id_servicio, float(PRECIOS_SERVICIO[id_servicio])))
+        for id_servicio, precio_adicional in servicios:
+            cxs.append({'idCxS': id_cxs, 'idCancha': id_cancha, 'idServicio': id_servicio,
+                        'precioAdicional': precio_adicional})
+            id_cxs += 1
+    return canchas, cxs
+
+
+def _generar_personas(rnd, cantidad_clientes, desde, hoy):
+    usuarios, clientes, empleados = [], [], []
+    id_usuario = 1
+    for i in range(1, 4):
+        usuarios.append({'idUsuario': id_usuario, 'usuario': f'admin{i}', 'contrasena': 'admin123',
+                         'permisos': 2, 'imagen': None})
+        empleados.append({'idEmpleado': i, 'idUsuario': id_usuario, 'tipoDoc': 2, 'documento': 20000000 + i,
+                          'nombre': rnd.choice(NOMBRES), 'apellido': rnd.choice(APELLIDOS),
+                          'fechaIngreso': desde, 'telefono': 3510000000 + i, 'mail': f'empleado{i}@gofield.com'})
+        id_usuario += 1
+    dias = max((hoy - desde).days, 1)
+    for id_cliente in range(1, cantidad_clientes + 1):
+        nombre, apellido = rnd.choice(NOMBRES), rnd.choice(APELLIDOS)
+        usuarios.append({'idUsuario': id_usuario, 'usuario': f'cliente{id_cliente}', 'contrasena': 'cliente123',
+                         'permisos': 1, 'imagen': None})
+        registro = datetime.combine(desde + timedelta(days=rnd.randrange(dias)), datetime.min.time())
+        clientes.append({
+            'idCliente': id_cliente, 'idTipoDoc': 2, 'numeroDoc': 30000000 + id_cliente,
+            'nombre': nombre, 'apellido': apellido, 'mail': f'cliente{id_cliente}@correo.com',
+            'telefono': str(3510000000 + id_cliente),
+            'fechaRegistro': registro + timedelta(minutes=rnd.randrange(24 * 60)),
+            'idUsuario': id_usuario,
+        })
+        id_usuario += 1
+    return usuarios, clientes, empleados
+
+
+def _generar_reservas(rnd, tablas, canchas, cantidad_clientes, desde, hasta, hoy, ocupacion):
+    """Recorre cancha x día x turno y decide si está ocupado según la demanda"""
+    reservas, detalles, pagos = [], [], []
+    id_reserva = id_detalle = id_pago = 1
+    activas = [c for c in canchas if c['estado'] == 1]
+    horas = [int(h['horaInicio'][:2]) for h in CATALOGOS[Horario]]
+    metodos = [(1, 0.3), (4, 0.15), (5, 0.15), (6, 0.15), (8, 0.25)]
+    dia = desde
+    while dia <= hasta:
+        factor_dia = DEMANDA_DIA[dia.weekday()]
+        # Un poco más de demanda en los meses templados
+        factor_mes = 1.1 if dia.month in (3, 4, 5, 9, 10, 11) else 0.95
+        for cancha in activas:
+            tabla = tablas[cancha['idCancha']]
+            turno = 0
+            while turno < len(horas):
+                p = ocupacion * DEMANDA_HORARIO[turno] * factor_dia * factor_mes / _DEMANDA_MEDIA
+                if rnd.random() >= min(p, 0.97):
+                    turno += 1
+                    continue
+                turnos = [turno]
+                if turno + 1 < len(horas) and rnd.random() < 0.3:
+                    turnos.append(turno + 1)
+                servicios = []
+                if rnd.random() < 0.25:
+                    extras = [i for i in tabla.cxs if i != tabla.idCxSBase and i != tabla.idCxSIluminacion]
+                    servicios = rnd.sample(extras, min(len(extras), rnd.randint(1, 2)))
+                cot = cotizar(tabla, [horas[t] for t in turnos], servicios)
+
+                if dia < hoy:
+                    estado = _elegir_ponderado(rnd, [(ESTADO_FINALIZADA, 0.82), (ESTADO_CANCELADA, 0.12),
+                                                     (ESTADO_CONFIRMADA, 0.06)])
+                else:
+                    estado = _elegir_ponderado(rnd, [(ESTADO_PENDIENTE, 0.6), (ESTADO_CONFIRMADA, 0.35),
+                                                     (ESTADO_CANCELADA, 0.05)])
+                creacion = datetime.combine(dia, datetime.min.time()) - timedelta(
+                    days=rnd.randint(0, 14), minutes=rnd.randrange(24 * 60))
+                # Pocos clientes concentran la mayoría de las reservas
+                id_cliente = 1 + int(cantidad_clientes * rnd.random() ** 2.2)
+                reservas.append({'idReserva': id_reserva, 'idCliente': id_cliente, 'fechaReservada': dia,
+                                 'estado': estado, 'monto': cot['monto'], 'fechaCreacion': creacion})
+                for t in turnos:
+                    for id_cxs in [tabla.idCxSBase] + cot['servicios']:
+                        detalles.append({'idDetalle': id_detalle, 'idCxS': id_cxs, 'idHorario': t + 1,
+                                         'idReserva': id_reserva})
+                        id_detalle += 1
+
+                estado_pago = None
+                if estado in (ESTADO_CONFIRMADA, ESTADO_FINALIZADA) and rnd.random() < 0.92:
+                    estado_pago = PAGO_PAGADO
+                elif estado == ESTADO_CANCELADA and rnd.random() < 0.3:
+                    estado_pago = PAGO_REEMBOLSADO
+                elif estado == ESTADO_PENDIENTE and rnd.random() < 0.2:
+                    estado_pago = PAGO_PENDIENTE
+                if estado_pago is not None:
+                    pagos.append({
+                        'idPago': id_pago, 'idReserva': id_reserva, 'metodoPago': _elegir_ponderado(rnd, metodos),
+                        'monto': cot['monto'], 'estado': estado_pago,
+                        'fechaPago': creacion + timedelta(minutes=rnd.randint(5, 60 * 24 * 3)),
+                        'comprobante': None, 'detalles': None, 'idEmpleado': None,
+                    })
+                    id_pago += 1
+                id_reserva += 1
+                turno += len(turnos)
+        dia += timedelta(days=1)
+    return reservas, detalles, pagos
+
+
+def _generar_torneos(rnd, cantidad, canchas, cantidad_clientes, desde, hasta, hoy):
+    torneos, txc, equipos, exc, partidos = [], [], [], [], []
+    id_equipo = id_exc = id_partido = id_txc = 1
+    dias = max((hasta - desde).days, 1)
+    for id_torneo in range(1, cantidad + 1):
+        deporte = rnd.choice(sorted({c['deporte'] for c in canchas}))
+        canchas_deporte = [c['idCancha'] for c in canchas if c['deporte'] == deporte]
+        inicio = desde + timedelta(days=rnd.randrange(dias))
+        fin = inicio + timedelta(days=rnd.randint(7, 45))
+        integrantes = rnd.randint(4, 6)
+        torneos.append({'idTorneo': id_torneo, 'nombreTorneo': f'Torneo {id_torneo} {inicio.year}',
+                        'deporte': deporte, 'fechaInicio': inicio, 'fechaFin': fin,
+                        'estado': 1 if rnd.random() < 0.85 else rnd.choice([2, 3]), 'imagen': None,
+                        'maxIntegrantes': integrantes})
+        for id_cancha in rnd.sample(canchas_deporte, min(len(canchas_deporte), 2)):
+            txc.append({'idTorneoCancha': id_txc, 'idTorneo': id_torneo, 'idCancha': id_cancha, 'idHorario': None})
+            id_txc += 1
+        ids_equipos = []
+        for _ in range(rnd.randint(4, 8)):
+            equipos.append({'idEquipo': id_equipo, 'nombre': f'Equipo {id_equipo}'})
+            for id_cliente in rnd.sample(range(1, cantidad_clientes + 1), min(integrantes, cantidad_clientes)):
+                exc.append({'idExC': id_exc, 'idEquipo': id_equipo, 'idCliente': id_cliente, 'idTorneo': id_torneo})
+                id_exc += 1
+            ids_equipos.append(id_equipo)
+            id_equipo += 1
+        duracion = (fin - inicio).days
+        for i, local in enumerate(ids_equipos):
+            for visitante in ids_equipos[i + 1:]:
+                fecha = inicio + timedelta(days=rnd.randint(0, duracion))
+                partidos.append({
+                    'idPartido': id_partido, 'idTorneo': id_torneo, 'idCancha': rnd.choice(canchas_deporte),
+                    'fecha': fecha, 'idHorario': rnd.randint(1, 10), 'equipo1': local, 'equipo2': visitante,
+                    'resultado': f'{rnd.randint(0, 5)}-{rnd.randint(0, 5)}' if fecha < hoy else None,
+                })
+                id_partido += 1
+    return torneos, txc, equipos, exc, partidos
+
+
+def leer_parametros(conn) -> dict:
+    """Parámetros con que se generó la base (tabla DatosBenchmark); {} si no está"""
+    try:
+        return dict(conn.execute(text('SELECT parametro, valor FROM "DatosBenchmark"')).all())
+    except Exception:
+        return {}
+
+
+def sembrar(ruta_db, canchas=24, clientes=2000, anios=2, ocupacion=0.45, torneos=12, semilla=42,
+            fecha_ancla=FECHA_ANCLA, forzar=False) -> dict:
+    """Crea la base en `ruta_db` y devuelve la cantidad de filas por tabla"""
+    ruta = Path(ruta_db)
+    if ruta.exists():
+        if not forzar:
+            raise FileExistsError(f'{ruta} ya existe (usar --forzar para reemplazarla)')
+        for sufijo in ('', '-wal', '-shm'):
+            Path(str(ruta) + sufijo).unlink(missing_ok=True)
+
+    rnd = random.Random(semilla)
+    hoy = fecha_ancla
+    hasta = hoy + timedelta(days=30)
+    desde = hoy - timedelta(days=int(365 * anios))
+
+    engine = create_engine(f'sqlite:///{ruta.as_posix()}')
+
+    @event.listens_for(engine, 'connect')
+    def _pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('PRAGMA synchronous=OFF')
+        cursor.close()
+
+    Base.metadata.create_all(engine)
+
+    filas_canchas, filas_cxs = _generar_canchas(rnd, canchas)
+    usuarios, filas_clientes, empleados = _generar_personas(rnd, clientes, desde, hoy)
+    Sesion = sessionmaker(bind=engine)
+    with Sesion.begin() as session:
+        for modelo, filas in CATALOGOS.items():
+            _insertar(session, modelo, filas)
+        _insertar(session, Cancha, filas_canchas)
+        _insertar(session, CanchaxServicio, filas_cxs)
+        _insertar(session, Usuario, usuarios)
+        _insertar(session, Cliente, filas_clientes)
+        _insertar(session, Empleado, empleados)
+
+    # El monto de cada reserva sale del mismo motor de precios que usa la app
+    with Sesion() as session:
+        tablas = compilar_tablas(session, [c['idCancha'] for c in filas_canchas])
+
+    reservas, detalles, pagos = _generar_reservas(rnd, tablas, filas_canchas, clientes, desde, hasta, hoy, ocupacion)
+    filas_torneos, txc, equipos, exc, partidos = _generar_torneos(rnd, torneos, filas_canchas, clientes, desde, hasta, hoy)
+    with Sesion.begin() as session:
+        _insertar(session, Reserva, reservas)
+        _insertar(session, DetalleReserva, detalles)
+        _insertar(session, Pago, pagos)
+        _insertar(session, Torneo, filas_torneos)
+        _insertar(session, TorneoxCancha, txc)
+        _insertar(session, Equipo, equipos)
+        _insertar(session, EquipoxCliente, exc)
+        _insertar(session, Partido, partidos)
+        session.execute(text('CREATE TABLE "DatosBenchmark" (parametro VARCHAR(30) PRIMARY KEY, valor VARCHAR(30))'))
+        parametros = {'semilla': semilla, 'fechaAncla': hoy.isoformat(), 'canchas': canchas, 'clientes': clientes,
+                      'anios': anios, 'ocupacion': ocupacion, 'torneos': torneos}
+        session.execute(text('INSERT INTO "DatosBenchmark" (parametro, valor) VALUES (:parametro, :valor)'),
+                        [{'parametro': k, 'valor': str(v)} for k, v in parametros.items()])
+
+    with engine.connect() as conn:
+        conteos = {
+            modelo.__tablename__: conn.execute(select(func.count()).select_from(modelo.__table__)).scalar()
+            for modelo in (Cancha, CanchaxServicio, Cliente, Usuario, Reserva, DetalleReserva, Pago,
+                           Torneo, Equipo, EquipoxCliente, Partido)
+        }
+    engine.dispose()
+    return conteos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db', required=True, help='archivo SQLite a crear')
+    parser.add_argument('--canchas', type=int, default=24)
+    parser.add_argument('--clientes', type=int, default=2000)
+    parser.add_argument('--anios', type=float, default=2, help='años de historia de reservas')
+    parser.add_argument('--ocupacion', type=float, default=0.45, help='ocupación media de los turnos (0-1)')
+    parser.add_argument('--torneos', type=int, default=12)
+    parser.add_argument('--semilla', type=int, default=42)
+    parser.add_argument('--fecha-ancla', type=date.fromisoformat, default=FECHA_ANCLA,
+                        help=f'"hoy" de los datos generados, YYYY-MM-DD ({FECHA_ANCLA.isoformat()})')
+    parser.add_argument('--forzar', action='store_true', help='reemplazar la base si ya existe')
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    conteos = sembrar(args.db, canchas=args.canchas, clientes=args.clientes, anios=args.anios,
+                      ocupacion=args.ocupacion, torneos=args.torneos, semilla=args.semilla,
+                      fecha_ancla=args.fecha_ancla, forzar=args.forzar)
+    for tabla, n in conteos.items():
+        print(f'{tabla:<20} {n:>10}')
+    print(f'Base generada en {args.db} en {time.perf_counter() - t0:.1f} s')
+
+
+if __name__ == '__main__':
+    main()
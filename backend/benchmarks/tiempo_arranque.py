@@ -0,0 +1,117 @@
+"""
+Presupuesto de tiempo de arranque (python -X importtime)
+
+Uso (desde backend/):
+    python benchmarks/tiempo_arranque.py [--repeticiones 5] [--limite-app 900]
+        [--limite-scheduler 600] [--db /tmp/bench.db] [--detalle 15]
+
+Lanza un intérprete nuevo por repetición con `-X importtime` para cada
+objetivo (crear la app Flask y cargar el scheduler de recordatorios), toma la
+mediana del tiempo total y falla (código 1) si:
+  - supera el límite en ms del objetivo, o
+  - se importó al arrancar alguno de los módulos que deben cargarse en el
+    primer uso (Pillow, urllib.request, smtplib, cProfile...).
+
+Con --detalle N se listan los N módulos con más tiempo acumulado de la
+última corrida, para encontrar qué empeoró.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+AQUI = Path(__file__).resolve().parent
+BACKEND = AQUI.parent
+
+# Módulos que no deben importarse al arrancar (se cargan dentro del handler que los usa)
+DIFERIDOS = ('PIL', 'urllib.request', 'smtplib', 'email.mime', 'cProfile', 'pstats', 'openpyxl')
+
+OBJETIVOS = {
+    'app': (
+        'import time; t = time.perf_counter()\n'
+        'import app; app.create_app()\n'
+        'print((time.perf_counter() - t) * 1000)'
+    ),
+    'scheduler': (
+        'import time; t = time.perf_counter()\n'
+        'import reservation_scheduler\n'
+        'print((time.perf_counter() - t) * 1000)'
+    ),
+}
+
+
+def _parsear_importtime(stderr: str):
+    """Devuelve [(modulo, propio_us, acumulado_us, profundidad)] de la salida de -X importtime"""
+    filas = []
+    for linea in stderr.splitlines():
+        if not linea.startswith('import time:') or 'self [us]' in linea:
+            continue
+        partes = linea[len('import time:'):].split('|')
+        if len(partes) != 3:
+            continue
+        propio, acumulado, nombre = partes
+        profundidad = (len(nombre) - len(nombre.lstrip(' ')) - 1) // 2
+        filas.append((nombre.strip(), int(propio), int(acumulado), profundidad))
+    return filas
+
+
+def medir(objetivo: str, db_url: str):
+    entorno = dict(os.environ, DATABASE_URL=db_url)
+    proceso = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', OBJETIVOS[objetivo]],
+        cwd=BACKEND, env=entorno, capture_output=True, text=True, timeout=120,
+    )
+    if proceso.returncode != 0:
+        raise RuntimeError(f'{objetivo}: el arranque falló\n{proceso.stderr[-2000:]}')
+    total_ms = float(proceso.stdout.strip().splitlines()[-1])
+    return total_ms, _parsear_importtime(proceso.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Presupuesto de tiempo de arranque')
+    parser.add_argument('--repeticiones', type=int, default=5)
+    parser.add_argument('--limite-app', type=float, default=float(os.getenv('ARRANQUE_LIMITE_APP_MS', '900')))
+    parser.add_argument('--limite-scheduler', type=float, default=float(os.getenv('ARRANQUE_LIMITE_SCHEDULER_MS', '600')))
+    parser.add_argument('--db', default=None, help='base SQLite a usar (por defecto una vacía temporal)')
+    parser.add_argument('--detalle', type=int, default=10)
+    args = parser.parse_args()
+
+    limites = {'app': args.limite_app, 'scheduler': args.limite_scheduler}
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta_db = os.path.abspath(args.db) if args.db else os.path.join(tmp, 'arranque.db')
+        db_url = f'sqlite:///{ruta_db}'
+
+        fallas = []
+        for objetivo, limite in limites.items():
+            # Una corrida previa deja los .pyc compilados y no cuenta
+            medir(objetivo, db_url)
+            tiempos = []
+            for _ in range(max(1, args.repeticiones)):
+                total_ms, modulos = medir(objetivo, db_url)
+                tiempos.append(total_ms)
+            mediana = statistics.median(tiempos)
+
+            print(f'{objetivo}: mediana {mediana:.1f} ms (mín {min(tiempos):.1f}, límite {limite:.0f})')
+            for nombre, propio, acumulado, profundidad in sorted(modulos, key=lambda m: -m[2])[:args.detalle]:
+                print(f'    {acumulado / 1000:8.1f} ms  {"  " * profundidad}{nombre}')
+
+            if mediana > limite:
+                fallas.append(f'{objetivo}: {mediana:.1f} ms supera el límite de {limite:.0f} ms')
+            cargados = {m[0] for m in modulos}
+            for diferido in DIFERIDOS:
+                if any(m == diferido or m.startswith(diferido + '.') for m in cargados):
+                    fallas.append(f'{objetivo}: se importó {diferido} al arrancar')
+
+    if fallas:
+        print('\nPresupuesto de arranque excedido:')
+        for f in fallas:
+            print(f'  - {f}')
+        sys.exit(1)
+    print('\nArranque dentro del presupuesto')
+
+
+if __name__ == '__main__':
+    main()
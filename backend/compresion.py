@@ -0,0 +1,127 @@
+"""
+Compresión negociada de respuestas y métricas de tamaño por endpoint
+
+- gzip (y brotli si el paquete `brotli` está instalado) según Accept-Encoding
+- sólo para tipos de texto/JSON y cuerpos de al menos COMPRESION_MIN_BYTES
+- no toca respuestas en streaming (exportes, SSE) ni las ya comprimidas
+
+Cada respuesta agrega `Server-Timing: json;dur=<ms>, gzip;dur=<ms>` y
+`X-Payload-Bytes` (tamaño sin comprimir), y se acumula por endpoint el
+tiempo de codificación y los bytes enviados (ver estadisticas_respuestas()).
+"""
+import gzip
+import os
+import threading
+import time
+
+from flask import g, request
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except Exception:
+    brotli = None
+    BROTLI_AVAILABLE = False
+
+
+# Por debajo de este tamaño la compresión no compensa el costo
+COMPRESION_MIN_BYTES = int(os.environ.get('COMPRESION_MIN_BYTES', '1024'))
+NIVEL_GZIP = int(os.environ.get('COMPRESION_NIVEL_GZIP', '6'))
+NIVEL_BROTLI = int(os.environ.get('COMPRESION_NIVEL_BROTLI', '5'))
+
+_TIPOS_COMPRIMIBLES = (
+    'application/json', 'text/', 'application/javascript', 'application/xml', 'image/svg+xml',
+)
+
+_estadisticas = {}
+_lock = threading.Lock()
+
+
+def _comprimible(response) -> bool:
+    if response.direct_passthrough or response.is_streamed:
+        return False
+    if response.status_code < 200 or response.status_code in (204, 206, 304):
+        return False
+    if 'Content-Encoding' in response.headers:
+        return False
+    mimetype = response.mimetype or ''
+    return mimetype.startswith(_TIPOS_COMPRIMIBLES)
+
+
+def _elegir_codificacion():
+    aceptadas = request.accept_encodings
+    if BROTLI_AVAILABLE and aceptadas['br']:
+        return 'br'
+    if aceptadas['gzip']:
+        return 'gzip'
+    return None
+
+
+def _registrar(endpoint, encode_ms, bytes_crudos, bytes_enviados):
+    with _lock:
+        st = _estadisticas.get(endpoint)
+        if st is None:
+            st = _estadisticas[endpoint] = {
+                'respuestas': 0, 'encodeMsTotal': 0.0, 'encodeMsMax': 0.0,
+                'bytesTotal': 0, 'bytesEnviadosTotal': 0, 'bytesMax': 0,
+            }
+        st['respuestas'] += 1
+        st['encodeMsTotal'] += encode_ms
+        st['encodeMsMax'] = max(st['encodeMsMax'], encode_ms)
+        st['bytesTotal'] += bytes_crudos
+        st['bytesEnviadosTotal'] += bytes_enviados
+        st['bytesMax'] = max(st['bytesMax'], bytes_crudos)
+
+
+def estadisticas_respuestas() -> dict:
+    """Copia de las estadísticas acumuladas, con promedios por endpoint"""
+    with _lock:
+        copia = {k: dict(v) for k, v in _estadisticas.items()}
+    for st in copia.values():
+        n = st['respuestas'] or 1
+        st['encodeMsPromedio'] = round(st['encodeMsTotal'] / n, 3)
+        st['bytesPromedio'] = st['bytesTotal'] // n
+        st['encodeMsTotal'] = round(st['encodeMsTotal'], 3)
+        st['encodeMsMax'] = round(st['encodeMsMax'], 3)
+    return copia
+
+
+def agregar_server_timing(response, metrica):
+    previo = response.headers.get('Server-Timing')
+    response.headers['Server-Timing'] = f'{previo}, {metrica}' if previo else metrica
+
+
+def init_compresion(app):
+    """Registra el after_request de compresión y métricas en la app"""
+
+    @app.after_request
+    def _comprimir_respuesta(response):
+        if response.is_streamed or response.direct_passthrough:
+            return response
+
+        encode_ms = getattr(g, 'json_encode_ms', None)
+        if encode_ms is not None:
+            agregar_server_timing(response, f'json;dur={encode_ms:.2f}')
+
+        cuerpo = response.get_data()
+        bytes_crudos = len(cuerpo)
+        response.headers['X-Payload-Bytes'] = str(bytes_crudos)
+        bytes_enviados = bytes_crudos
+
+        if bytes_crudos >= COMPRESION_MIN_BYTES and _comprimible(response):
+            response.vary.add('Accept-Encoding')
+            codificacion = _elegir_codificacion()
+            if codificacion:
+                t0 = time.perf_counter()
+                if codificacion == 'br':
+                    comprimido = brotli.compress(cuerpo, quality=NIVEL_BROTLI)
+                else:
+                    comprimido = gzip.compress(cuerpo, compresslevel=NIVEL_GZIP, mtime=0)
+                agregar_server_timing(response, f'{codificacion};dur={(time.perf_counter() - t0) * 1000:.2f}')
+                response.set_data(comprimido)
+                response.headers['Content-Encoding'] = codificacion
+                bytes_enviados = len(comprimido)
+
+        if request.endpoint:
+            _registrar(request.endpoint, encode_ms or 0.0, bytes_crudos, bytes_enviados)
+        return response
@@ -0,0 +1,41 @@
+"""
+Configuración común de pytest (correr desde backend/: `python -m pytest`).
+
+Los tests usan una base SQLite nueva en una carpeta temporal, nunca la del
+proyecto: DATABASE_URL se fija antes de importar la aplicación.
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# La raíz primero: `database` es el paquete de la raíz, no backend/database.py
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+_DIR_TESTS = Path(tempfile.mkdtemp(prefix='canchas-tests-'))
+os.environ['DATABASE_URL'] = f"sqlite:///{(_DIR_TESTS / 'test.db').as_posix()}"
+os.environ.setdefault('INFORMES_JOBS_DIR', str(_DIR_TESTS / 'informes_jobs'))
+# El presupuesto lo controla cada test con el fixture presupuesto_sql
+os.environ['SQL_QUERY_BUDGET'] = '0'
+
+pytest_plugins = ['pytester', 'pytest_presupuesto_sql']
+
+
+@pytest.fixture(scope='session')
+def app():
+    from app import create_app
+    from database.mapeoCanchas import Base, engine, seed_minimal_demo
+
+    # Lo mismo que `python database/mapeoCanchas.py` sobre una base vacía
+    Base.metadata.create_all(bind=engine)
+    seed_minimal_demo()
+    app = create_app()
+    app.config.update(TESTING=True)
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
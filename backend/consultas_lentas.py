@@ -0,0 +1,182 @@
+"""
+Registro de consultas lentas con EXPLAIN QUERY PLAN
+
+Toda sentencia que tarde más de SLOW_QUERY_MS (por defecto 200 ms; 0 lo
+desactiva) se registra con:
+
+- la sentencia normalizada y los parámetros redactados (los textos se
+  reemplazan por su largo; números y NULL se conservan)
+- la ruta de Flask que la ejecutó y el punto del código de la app que la originó
+- el plan de `EXPLAIN QUERY PLAN` (sólo SQLite), obtenido con el cursor DBAPI
+  crudo, así no vuelve a pasar por los eventos del engine
+
+Las entradas quedan en un buffer circular (SLOW_QUERY_BUFFER, por defecto 200)
+visible en /api/admin/consultas-lentas y, si se define SLOW_QUERY_LOG, también
+en ese archivo rotativo (una línea JSON por consulta).
+"""
+import json
+import logging
+import os
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+_config = {
+    'umbral_ms': float(os.environ.get('SLOW_QUERY_MS', '200')),
+}
+_buffer = deque(maxlen=int(os.environ.get('SLOW_QUERY_BUFFER', '200')))
+_lock = threading.Lock()
+
+_RAIZ_APP = str(Path(__file__).resolve().parent.parent)
+_ARCHIVOS_PROPIOS = (__file__, 'instrumentacion_sql.py', 'metricas.py', 'database.py')
+
+_archivo_logger = None
+if os.environ.get('SLOW_QUERY_LOG'):
+    _archivo_logger = logging.getLogger(__name__ + '.archivo')
+    _archivo_logger.propagate = False
+    _archivo_logger.setLevel(logging.INFO)
+    _handler = RotatingFileHandler(
+        os.environ['SLOW_QUERY_LOG'],
+        maxBytes=int(os.environ.get('SLOW_QUERY_LOG_BYTES', str(5 * 1024 * 1024))),
+        backupCount=int(os.environ.get('SLOW_QUERY_LOG_BACKUPS', '3')),
+        encoding='utf-8',
+    )
+    _handler.setFormatter(logging.Formatter('%(message)s'))
+    _archivo_logger.addHandler(_handler)
+
+
+def umbral_ms() -> float:
+    return _config['umbral_ms']
+
+
+def establecer_umbral(ms: float):
+    """Cambia el umbral en caliente (0 desactiva el registro)"""
+    _config['umbral_ms'] = float(ms)
+
+
+def entradas() -> list:
+    """Consultas lentas registradas, de la más reciente a la más antigua"""
+    with _lock:
+        return list(reversed(_buffer))
+
+
+def limpiar():
+    with _lock:
+        _buffer.clear()
+
+
+def _redactar(valor):
+    if valor is None or isinstance(valor, (bool, int, float)):
+        return valor
+    if isinstance(valor, (str, bytes)):
+        return f'<{type(valor).__name__} len={len(valor)}>'
+    return f'<{type(valor).__name__}>'
+
+
+def _redactar_parametros(parametros):
+    if isinstance(parametros, dict):
+        return {k: _redactar(v) for k, v in parametros.items()}
+    if isinstance(parametros, (list, tuple)):
+        return [_redactar(v) for v in parametros]
+    return _redactar(parametros)
+
+
+def _origen():
+    """Último frame de la app (fuera de librerías y de la instrumentación)"""
+    for frame in reversed(traceback.extract_stack()[:-3]):
+        archivo = frame.filename
+        if not archivo.startswith(_RAIZ_APP) or 'site-packages' in archivo:
+            continue
+        if archivo.endswith(_ARCHIVOS_PROPIOS):
+            continue
+        return f'{os.path.relpath(archivo, _RAIZ_APP)}:{frame.lineno} en {frame.name}'
+    return None
+
+
+def _ruta():
+    try:
+        from flask import has_request_context, request
+        if has_request_context():
+            regla = request.url_rule.rule if request.url_rule is not None else request.path
+            return f'{request.method} {regla}'
+    except Exception:
+        pass
+    return None
+
+
+def _plan(cursor, sentencia, parametros, executemany):
+    """EXPLAIN QUERY PLAN con el cursor DBAPI crudo (sólo sentencias DML/SELECT)"""
+    palabras = sentencia.split(None, 1)
+    if not palabras or palabras[0].upper() not in ('SELECT', 'WITH', 'UPDATE', 'DELETE', 'INSERT', 'REPLACE'):
+        return None
+    if executemany and parametros:
+        parametros = parametros[0]
+    try:
+        explain = cursor.connection.cursor()
+        try:
+            explain.execute('EXPLAIN QUERY PLAN ' + sentencia, parametros or ())
+            return [str(fila[-1]) for fila in explain.fetchall()]
+        finally:
+            explain.close()
+    except Exception as e:
+        return [f'(no se pudo obtener el plan: {e})']
+
+
+def _antes(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('_inicios_lentas', []).append(time.perf_counter())
+
+
+def _despues(conn, cursor, statement, parameters, context, executemany):
+    inicios = conn.info.get('_inicios_lentas')
+    if not inicios:
+        return
+    duracion_ms = (time.perf_counter() - inicios.pop()) * 1000
+    umbral = _config['umbral_ms']
+    if umbral <= 0 or duracion_ms < umbral:
+        return
+    try:
+        _registrar(conn, cursor, statement, parameters, executemany, duracion_ms)
+    except Exception:
+        logger.exception('No se pudo registrar la consulta lenta')
+
+
+def _registrar(conn, cursor, statement, parameters, executemany, duracion_ms):
+    try:
+        from instrumentacion_sql import huella
+    except ImportError:
+        from backend.instrumentacion_sql import huella
+
+    plan = None
+    if conn.dialect.name == 'sqlite':
+        plan = _plan(cursor, statement, parameters, executemany)
+    entrada = {
+        'fecha': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'duracionMs': round(duracion_ms, 2),
+        'sql': huella(statement),
+        'parametros': _redactar_parametros(parameters),
+        'ruta': _ruta(),
+        'origen': _origen(),
+        'plan': plan,
+    }
+    with _lock:
+        _buffer.append(entrada)
+    escaneos = [p for p in (plan or []) if p.startswith('SCAN')]
+    logger.warning('Consulta lenta (%.1f ms) en %s desde %s%s: %s',
+                   duracion_ms, entrada['ruta'] or '-', entrada['origen'] or '-',
+                   f' [{"; ".join(escaneos)}]' if escaneos else '', entrada['sql'][:300])
+    if _archivo_logger is not None:
+        _archivo_logger.info(json.dumps(entrada, ensure_ascii=False, default=str))
+
+
+def instalar_consultas_lentas(engine):
+    """Engancha el registro de consultas lentas en un engine"""
+    event.listen(engine, 'before_cursor_execute', _antes)
+    event.listen(engine, 'after_cursor_execute', _despues)
@@ -1,6 +1,9 @@
 from sqlalchemy import create_engine, event
-from sqlalchemy.orm import sessionmaker, declarative_base
-from sqlalchemy.pool import NullPool
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from sqlalchemy.pool import NullPool, QueuePool
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
 import os
 from pathlib import Path
 
@@ -16,11 +19,19 @@ else:
     db_path = project_root / "database" / "DatabaseCanchas.db"
     DATABASE_URL = f"sqlite:///{db_path.as_posix()}"
 
+# Sin DB_POOL_SIZE cada sesión abre su propia conexión (NullPool). En producción
+# (gunicorn.conf.py) se usa un pool por worker del tamaño de sus hilos.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "0"))
+if DB_POOL_SIZE > 0:
+    _opciones_pool = {"poolclass": QueuePool, "pool_size": DB_POOL_SIZE, "max_overflow": DB_POOL_SIZE}
+else:
+    _opciones_pool = {"poolclass": NullPool}
+
 engine = create_engine(
     DATABASE_URL,
     echo=False,  # Se puede poner en True para depurar queries SQL
     connect_args={"check_same_thread": False, "timeout": 30},
-    poolclass=NullPool,
+    **_opciones_pool,
 )
 
 # Ensure WAL mode and a reasonable busy timeout to reduce "database is locked"
@@ -35,7 +46,97 @@ def _set_sqlite_pragma(dbapi_connection, connection_record):
         # Best-effort; if it fails (e.g., not sqlite) we ignore
         pass
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Registro de consultas lentas con EXPLAIN QUERY PLAN (umbral en SLOW_QUERY_MS)
+try:
+    from consultas_lentas import instalar_consultas_lentas
+except ImportError:
+    from backend.consultas_lentas import instalar_consultas_lentas
+instalar_consultas_lentas(engine)
+
+# --- Conexiones de sólo lectura (informes, calendario, disponibilidad) ---
+#
+# Misma base que `engine` (o una réplica con READ_DATABASE_URL), pero cada
+# conexión se abre con PRAGMA query_only: nunca toma el lock de escritura,
+# así un escaneo largo no compite con el BEGIN IMMEDIATE de una reserva.
+# READ_MMAP_BYTES (256 MB) y READ_CACHE_KB (64 MB) ajustan la caché para scans.
+READ_DATABASE_URL = os.getenv("READ_DATABASE_URL") or DATABASE_URL
+READ_MMAP_BYTES = int(os.getenv("READ_MMAP_BYTES", str(256 * 1024 * 1024)))
+READ_CACHE_KB = int(os.getenv("READ_CACHE_KB", str(64 * 1024)))
+
+read_engine = create_engine(
+    READ_DATABASE_URL,
+    echo=False,
+    connect_args={"check_same_thread": False, "timeout": 30},
+    **_opciones_pool,
+)
+
+
+@event.listens_for(read_engine, "connect")
+def _set_sqlite_pragma_lectura(dbapi_connection, connection_record):
+    try:
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA busy_timeout = 30000;")
+        cursor.execute("PRAGMA query_only = ON;")
+        cursor.execute(f"PRAGMA mmap_size = {READ_MMAP_BYTES};")
+        cursor.execute(f"PRAGMA cache_size = -{READ_CACHE_KB};")
+        cursor.execute("PRAGMA temp_store = MEMORY;")
+        cursor.close()
+    except Exception:
+        pass
+
+instalar_consultas_lentas(read_engine)
+
+_solo_lectura = ContextVar("solo_lectura", default=False)
+
+
+class SesionEnrutada(Session):
+    """
+    Session que usa `read_engine` si se crea dentro de `sesiones_de_lectura()`
+    (o de un request marcado como de lectura, ver solo_lectura.py) y `engine`
+    en cualquier otro caso. La elección se hace al crearla y vale para toda
+    la sesión.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.solo_lectura = _solo_lectura.get()
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self.solo_lectura:
+            return read_engine
+        return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+
+
+@contextmanager
+def sesiones_de_lectura():
+    """Las sesiones de SessionLocal creadas dentro del bloque usan el pool de lectura"""
+    token = _solo_lectura.set(True)
+    try:
+        yield
+    finally:
+        _solo_lectura.reset(token)
+
+
+def activar_solo_lectura():
+    """Marca el contexto actual como de lectura; devuelve el token para restaurarlo"""
+    return _solo_lectura.set(True)
+
+
+def restaurar_solo_lectura(token):
+    _solo_lectura.reset(token)
+
+
+def de_solo_lectura(fn):
+    """Decorador: la función y lo que llame abren sus sesiones en el pool de lectura"""
+    @wraps(fn)
+    def envoltura(*args, **kwargs):
+        with sesiones_de_lectura():
+            return fn(*args, **kwargs)
+    return envoltura
+
+
+SessionLocal = sessionmaker(class_=SesionEnrutada, autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 Base = declarative_base()
 
 def get_db():
@@ -0,0 +1,62 @@
+"""
+Engine y sesiones async (SQLAlchemy asyncio + aiosqlite) para asgi.py
+
+Usa la misma base que las lecturas de database.py (READ_DATABASE_URL, o
+ASYNC_DATABASE_URL si se quiere apuntar a otra) y los mismos modelos. Es sólo para lecturas: cada
+conexión se abre con `PRAGMA query_only`, así un error de programación en el
+modo async no puede escribir.
+
+ASYNC_POOL_SIZE (8 por defecto) limita las conexiones abiertas por proceso;
+los requests que no consiguen una esperan en el event loop, sin ocupar un
+hilo cada uno.
+
+Dependencias opcionales: `pip install "sqlalchemy[asyncio]" aiosqlite`.
+"""
+import os
+
+try:
+    import aiosqlite  # noqa: F401  (driver de sqlite+aiosqlite)
+    import greenlet  # noqa: F401  (lo requiere sqlalchemy.ext.asyncio)
+    from sqlalchemy import event
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+    ASYNC_AVAILABLE = True
+except ImportError:
+    ASYNC_AVAILABLE = False
+
+from backend.database import READ_DATABASE_URL
+
+ASYNC_POOL_SIZE = int(os.getenv('ASYNC_POOL_SIZE', '8'))
+
+
+def url_async(url: str) -> str:
+    """sqlite:///ruta.db -> sqlite+aiosqlite:///ruta.db (las demás URLs se dejan igual)"""
+    if url.startswith('sqlite:'):
+        return 'sqlite+aiosqlite:' + url[len('sqlite:'):]
+    return url
+
+
+async_engine = None
+SesionAsync = None
+
+if ASYNC_AVAILABLE:
+    async_engine = create_async_engine(
+        url_async(os.getenv('ASYNC_DATABASE_URL', READ_DATABASE_URL)),
+        echo=False,
+        connect_args={'timeout': 30},
+        pool_size=ASYNC_POOL_SIZE,
+        max_overflow=0,
+        pool_timeout=30,
+    )
+
+    @event.listens_for(async_engine.sync_engine, 'connect')
+    def _set_sqlite_pragma(dbapi_connection, connection_record):
+        try:
+            cursor = dbapi_connection.cursor()
+            cursor.execute('PRAGMA busy_timeout = 30000;')
+            cursor.execute('PRAGMA query_only = ON;')
+            cursor.close()
+        except Exception:
+            # Igual que en database.py: si no es sqlite se ignora
+            pass
+
+    SesionAsync = async_sessionmaker(async_engine, expire_on_commit=False, autoflush=False)
@@ -1,9 +1,9 @@
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 from datetime import datetime
+import logging
 import os
 
+logger = logging.getLogger(__name__)
+
 # Configuración de email
 SMTP_SERVER = os.getenv('SMTP_SERVER', 'smtp.gmail.com')
 SMTP_PORT = int(os.getenv('SMTP_PORT', '465'))
@@ -25,9 +25,15 @@ def send_reservation_reminder(cliente_email, cliente_nombre, reserva_info, confi
         cancel_url: URL para cancelar la reserva
     """
     if not SMTP_USER or not SMTP_PASSWORD:
-        print("⚠️ Email no configurado. Para habilitar emails, configura SMTP_USER y SMTP_PASSWORD")
+        logger.warning('Email no configurado. Para habilitar emails, configura SMTP_USER y SMTP_PASSWORD')
         return False
-    
+
+    # smtplib/email se importan recién al enviar: el scheduler corre cada hora
+    # y la mayoría de las veces no tiene nada que mandar
+    import smtplib
+    from email.mime.text import MIMEText
+    from email.mime.multipart import MIMEMultipart
+
     try:
         # Crear mensaje
         msg = MIMEMultipart('alternative')
@@ -145,9 +151,9 @@ def send_reservation_reminder(cliente_email, cliente_nombre, reserva_info, confi
                 server.login(SMTP_USER, SMTP_PASSWORD)
                 server.send_message(msg)
         
-        print(f"✅ Email de recordatorio enviado a {cliente_email}")
+        logger.info('Email de recordatorio enviado a %s', cliente_email)
         return True
         
     except Exception as e:
-        print(f"❌ Error enviando email: {e}")
+        logger.exception('Error enviando email: %s', e)
         return False
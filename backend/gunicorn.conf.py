@@ -0,0 +1,64 @@
+"""
+Configuración de gunicorn para producción (desde backend/):
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Modelo de workers con SQLite: varios procesos pre-forkeados, cada uno con
+hilos (gthread). En modo WAL las lecturas corren en paralelo entre procesos,
+pero las escrituras se serializan en el lock de la base (BEGIN IMMEDIATE +
+busy_timeout), así que por defecto se usa un worker por núcleo en lugar del
+clásico 2n+1: más procesos sólo agregan espera por el lock.
+
+Cada worker abre sus propias conexiones después del fork (nunca se comparte
+una conexión SQLite entre procesos) y arranca con el pool abierto y las
+cachés de catálogo cargadas (wsgi.preparar_worker).
+
+Variables de entorno:
+
+    GUNICORN_BIND       dirección (0.0.0.0:5000)
+    WEB_CONCURRENCY     cantidad de workers (núcleos disponibles)
+    GUNICORN_THREADS    hilos por worker (4); también es el tamaño del pool
+                        de conexiones de cada worker (DB_POOL_SIZE)
+    GUNICORN_PRELOAD    1 para cargar la app en el master antes del fork
+                        (menos memoria; `kill -HUP` ya no recarga el código)
+    GUNICORN_TIMEOUT    segundos antes de reiniciar un worker colgado (60)
+    GUNICORN_MAX_REQUESTS  reciclar cada worker tras N requests (0 = nunca)
+
+Recarga sin cortar conexiones: `kill -HUP <pid del master>` levanta workers
+nuevos con el código actual y deja terminar a los viejos (hasta
+graceful_timeout). Con GUNICORN_PRELOAD=1 usar `kill -USR2` + `kill -QUIT`
+al master viejo.
+"""
+import multiprocessing
+import os
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.getenv('WEB_CONCURRENCY', str(multiprocessing.cpu_count())))
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', '4'))
+preload_app = os.getenv('GUNICORN_PRELOAD', '0') == '1'
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '60'))
+graceful_timeout = 30
+keepalive = 5
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '0'))
+max_requests_jitter = max_requests // 10
+
+# Los logs de la app van por logging_config (cola + stderr); gunicorn sólo
+# escribe los suyos y el access log si se pide con --access-logfile
+accesslog = os.getenv('GUNICORN_ACCESS_LOG') or None
+
+# Un pool por worker del tamaño de sus hilos. Se define antes de que
+# cualquier worker importe backend/database.py.
+os.environ.setdefault('DB_POOL_SIZE', str(threads))
+
+
+def post_worker_init(worker):
+    from wsgi import preparar_worker
+    preparar_worker()
+
+
+def worker_exit(server, worker):
+    # Vaciar la cola de logs antes de que el proceso termine
+    from logging_config import detener_logging
+    detener_logging()
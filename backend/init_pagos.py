@@ -1,6 +1,7 @@
 """
 Script para inicializar estados de pago y métodos de pago en la base de datos
 """
+import logging
 import sys
 from pathlib import Path
 
@@ -14,14 +15,16 @@ if str(BACKEND) not in sys.path:
 
 # Ahora importar
 from services.pago_service import inicializar_estados_y_metodos
+from logging_config import configurar_logging
+
+logger = logging.getLogger(__name__)
 
 if __name__ == '__main__':
-    print("Inicializando estados y métodos de pago...")
+    configurar_logging()
+    logger.info('Inicializando estados y métodos de pago...')
     try:
         resultado = inicializar_estados_y_metodos()
-        print(resultado)
-        print("\n✅ Inicialización completada!")
+        logger.info('%s', resultado)
+        logger.info('Inicialización completada')
     except Exception as e:
-        print(f"\n❌ Error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception('Error inicializando estados y métodos de pago: %s', e)
@@ -0,0 +1,169 @@
+"""
+Instrumentación de consultas SQL por request
+
+Con los eventos before/after_cursor_execute de SQLAlchemy se registra, para
+cada request de Flask (en `g.sql`):
+
+- cantidad de consultas y tiempo total en la base
+- huella (fingerprint) de cada sentencia normalizada, para detectar N+1:
+  la misma sentencia repetida muchas veces en un mismo request
+- línea de tiempo (inicio relativo, duración, sentencia) de cada consulta
+
+Cada respuesta agrega `X-Query-Count` y `Server-Timing: db;dur=..`. Si un
+request supera SQL_QUERY_BUDGET consultas, o repite una sentencia al menos
+SQL_REPETICIONES_N1 veces, se registra una advertencia en el log.
+
+Fuera de un request (scripts, scheduler, tests) se puede medir con:
+
+    with medir_consultas() as stats:
+        ...
+    stats.cantidad, stats.tiempo_ms, stats.repetidas()
+"""
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from flask import g, has_app_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Consultas por request a partir de las cuales se advierte (0 = sin límite)
+SQL_QUERY_BUDGET = int(os.environ.get('SQL_QUERY_BUDGET', '50'))
+# Repeticiones de una misma sentencia que se consideran un patrón N+1
+SQL_REPETICIONES_N1 = int(os.environ.get('SQL_REPETICIONES_N1', '10'))
+# Máximo de consultas guardadas en la línea de tiempo de un request
+MAX_LINEA_TIEMPO = 2000
+
+_RE_IN = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_RE_NUMERO = re.compile(r'\b\d+(?:\.\d+)?\b')
+_RE_CADENA = re.compile(r"'(?:[^']|'')*'")
+_RE_ESPACIOS = re.compile(r'\s+')
+
+_local = threading.local()
+_instalado = False
+
+
+def huella(sentencia: str) -> str:
+    """Normaliza una sentencia: literales a ?, listas IN colapsadas y espacios simples"""
+    s = _RE_CADENA.sub('?', sentencia)
+    s = _RE_NUMERO.sub('?', s)
+    s = _RE_IN.sub('(?)', s)
+    return _RE_ESPACIOS.sub(' ', s).strip()
+
+
+class EstadisticasSQL:
+    """Acumulador de consultas de un request (o de un bloque medir_consultas)"""
+
+    __slots__ = ('cantidad', 'tiempo_ms', 'huellas', 'linea_tiempo', 'inicio')
+
+    def __init__(self):
+        self.cantidad = 0
+        self.tiempo_ms = 0.0
+        self.huellas = Counter()
+        self.linea_tiempo = []
+        self.inicio = time.perf_counter()
+
+    def registrar(self, sentencia, inicio, duracion_ms):
+        self.cantidad += 1
+        self.tiempo_ms += duracion_ms
+        h = huella(sentencia)
+        self.huellas[h] += 1
+        if len(self.linea_tiempo) < MAX_LINEA_TIEMPO:
+            self.linea_tiempo.append({
+                'inicioMs': round((inicio - self.inicio) * 1000, 3),
+                'duracionMs': round(duracion_ms, 3),
+                'sql': h,
+            })
+
+    def repetidas(self, minimo: int = None):
+        """[(huella, veces)] de las sentencias repetidas al menos `minimo` veces"""
+        minimo = SQL_REPETICIONES_N1 if minimo is None else minimo
+        return [(h, n) for h, n in self.huellas.most_common() if n >= minimo]
+
+    def resumen(self) -> dict:
+        return {
+            'cantidad': self.cantidad,
+            'tiempoMs': round(self.tiempo_ms, 3),
+            'repetidas': [{'sql': h, 'veces': n} for h, n in self.repetidas(2)],
+        }
+
+
+def _colectores():
+    colectores = list(getattr(_local, 'pila', ()))
+    if has_app_context():
+        stats = g.get('sql')
+        if stats is not None:
+            colectores.append(stats)
+    return colectores
+
+
+def _antes(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('_inicios_consulta', []).append(time.perf_counter())
+
+
+def _despues(conn, cursor, statement, parameters, context, executemany):
+    inicios = conn.info.get('_inicios_consulta')
+    if not inicios:
+        return
+    inicio = inicios.pop()
+    duracion_ms = (time.perf_counter() - inicio) * 1000
+    for stats in _colectores():
+        stats.registrar(statement, inicio, duracion_ms)
+
+
+def instalar_eventos():
+    """Engancha los eventos de cursor en todos los Engine (una sola vez)"""
+    global _instalado
+    if _instalado:
+        return
+    event.listen(Engine, 'before_cursor_execute', _antes)
+    event.listen(Engine, 'after_cursor_execute', _despues)
+    _instalado = True
+
+
+@contextmanager
+def medir_consultas():
+    """Mide las consultas ejecutadas en el bloque (en este hilo)"""
+    instalar_eventos()
+    stats = EstadisticasSQL()
+    pila = getattr(_local, 'pila', None)
+    if pila is None:
+        pila = _local.pila = []
+    pila.append(stats)
+    try:
+        yield stats
+    finally:
+        pila.remove(stats)
+
+
+def init_instrumentacion_sql(app):
+    """Registra la medición por request y los headers de respuesta"""
+    from compresion import agregar_server_timing
+
+    instalar_eventos()
+
+    @app.before_request
+    def _iniciar_medicion_sql():
+        g.sql = EstadisticasSQL()
+
+    @app.after_request
+    def _reportar_consultas(response):
+        stats = g.get('sql')
+        if stats is None:
+            return response
+        response.headers['X-Query-Count'] = str(stats.cantidad)
+        agregar_server_timing(response, f'db;dur={stats.tiempo_ms:.2f};desc="{stats.cantidad} consultas"')
+
+        ruta = f'{request.method} {request.path}'
+        if SQL_QUERY_BUDGET and stats.cantidad > SQL_QUERY_BUDGET:
+            logger.warning('%s ejecutó %d consultas (presupuesto %d, %.1f ms en la base)',
+                           ruta, stats.cantidad, SQL_QUERY_BUDGET, stats.tiempo_ms)
+        for sentencia, veces in stats.repetidas():
+            logger.warning('Posible N+1 en %s: %d veces %s', ruta, veces, sentencia[:300])
+        return response
@@ -0,0 +1,120 @@
+"""
+Proveedor JSON rápido para Flask
+
+Usa orjson si está instalado (codifica directo a bytes, varias veces más
+rápido que json en listados grandes) y si no cae al json estándar con el
+mismo formato de salida:
+
+- datetime -> 'YYYY-MM-DD HH:MM:SS' y date -> 'YYYY-MM-DD' (igual que _to_dict)
+- Decimal -> string (igual que el proveedor por defecto de Flask)
+- claves ordenadas, y con indentación sólo en modo debug
+
+El tiempo de codificación de cada respuesta queda en `g.json_encode_ms`
+(lo usa compresion.py para Server-Timing y las estadísticas por endpoint).
+"""
+import dataclasses
+import datetime as _datetime
+import decimal
+import json
+import time
+import uuid
+
+from flask import g, has_request_context
+from flask.json.provider import DefaultJSONProvider
+
+from serializers import valor_json
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except Exception:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+
+def _default(o):
+    """Tipos que ni orjson ni json resuelven solos"""
+    if isinstance(o, (decimal.Decimal, uuid.UUID)):
+        return str(o)
+    v = valor_json(o)
+    if v is not o:
+        return v
+    if isinstance(o, _datetime.time):
+        return o.isoformat()
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if hasattr(o, '__html__'):
+        return str(o.__html__())
+    raise TypeError(f'Object of type {type(o).__name__} is not JSON serializable')
+
+
+if ORJSON_AVAILABLE:
+    _OPCIONES = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+
+def dumps_bytes(obj) -> bytes:
+    """JSON compacto con claves ordenadas, en bytes (para respuestas en streaming)"""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(obj, default=_default, option=_OPCIONES)
+        except TypeError:
+            pass
+    return json.dumps(obj, default=_default, sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+
+class JSONProviderRapido(DefaultJSONProvider):
+    """DefaultJSONProvider con orjson (si está) y medición del tiempo de codificación"""
+
+    default = staticmethod(_default)
+
+    def _indentar(self):
+        return (self.compact is None and self._app.debug) or self.compact is False
+
+    def dumps(self, obj, **kwargs):
+        if ORJSON_AVAILABLE and not kwargs.get('cls'):
+            opciones = _OPCIONES
+            if kwargs.get('indent'):
+                opciones |= orjson.OPT_INDENT_2
+            if not kwargs.get('sort_keys', self.sort_keys):
+                opciones &= ~orjson.OPT_SORT_KEYS
+            try:
+                return orjson.dumps(obj, default=_default, option=opciones).decode('utf-8')
+            except TypeError:
+                # p. ej. enteros fuera de 64 bits: json estándar sí los admite
+                pass
+        return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if ORJSON_AVAILABLE and not kwargs:
+            try:
+                return orjson.loads(s)
+            except orjson.JSONDecodeError:
+                # Repetir con json para conservar el mensaje/errores habituales
+                pass
+        return super().loads(s, **kwargs)
+
+    def _codificar(self, obj) -> bytes:
+        indentar = self._indentar()
+        if ORJSON_AVAILABLE:
+            opciones = _OPCIONES
+            if indentar:
+                opciones |= orjson.OPT_INDENT_2
+            if not self.sort_keys:
+                opciones &= ~orjson.OPT_SORT_KEYS
+            try:
+                return orjson.dumps(obj, default=_default, option=opciones | orjson.OPT_APPEND_NEWLINE)
+            except TypeError:
+                pass
+        if indentar:
+            texto = json.dumps(obj, default=_default, sort_keys=self.sort_keys, ensure_ascii=self.ensure_ascii, indent=2)
+        else:
+            texto = json.dumps(obj, default=_default, sort_keys=self.sort_keys, ensure_ascii=self.ensure_ascii, separators=(',', ':'))
+        return (texto + '\n').encode('utf-8')
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        t0 = time.perf_counter()
+        cuerpo = self._codificar(obj)
+        if has_request_context():
+            g.json_encode_ms = getattr(g, 'json_encode_ms', 0.0) + (time.perf_counter() - t0) * 1000
+        return self._app.response_class(cuerpo, mimetype=self.mimetype)
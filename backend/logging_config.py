@@ -0,0 +1,175 @@
+"""
+Configuración de logging de la aplicación
+
+- Los módulos usan `logger = logging.getLogger(__name__)`; nada de print().
+- El root logger sólo tiene un QueueHandler: el request encola el registro y
+  un QueueListener en un hilo aparte hace el I/O (stderr y, con LOG_FILE,
+  un archivo rotativo), así escribir logs no demora la respuesta.
+- Cada registro lleva el id del request (`X-Request-ID` entrante o uno
+  generado), el método y la ruta; la respuesta devuelve el mismo X-Request-ID.
+
+Variables de entorno:
+
+    LOG_LEVEL   nivel general (INFO por defecto)
+    LOG_LEVELS  niveles por módulo: "Usuario=DEBUG,sqlalchemy.engine=INFO"
+    LOG_FORMAT  "texto" (por defecto) o "json" (una línea JSON por registro)
+    LOG_FILE    archivo adicional, rotado a los LOG_FILE_BYTES (10 MB)
+"""
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import sys
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+_listener = None
+
+# Atributos estándar de LogRecord; el resto (extra=...) se agrega al JSON
+_ATRIBUTOS_RECORD = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'request_id', 'ruta'}
+
+
+class FiltroRequest(logging.Filter):
+    """Agrega request_id y ruta al registro (corre en el hilo que loguea)"""
+
+    def filter(self, record):
+        record.request_id = '-'
+        record.ruta = '-'
+        try:
+            from flask import g, has_request_context, request
+            if has_request_context():
+                record.request_id = g.get('request_id', '-')
+                record.ruta = f'{request.method} {request.path}'
+        except Exception:
+            pass
+        return True
+
+
+class FormateadorJSON(logging.Formatter):
+    """Una línea JSON por registro, con los campos extra del llamador"""
+
+    def format(self, record):
+        datos = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'nivel': record.levelname,
+            'logger': record.name,
+            'mensaje': record.getMessage(),
+            'requestId': getattr(record, 'request_id', '-'),
+            'ruta': getattr(record, 'ruta', '-'),
+        }
+        for clave, valor in vars(record).items():
+            if clave not in _ATRIBUTOS_RECORD and not clave.startswith('_'):
+                datos[clave] = valor
+        if record.exc_text:
+            datos['excepcion'] = record.exc_text
+        return json.dumps(datos, ensure_ascii=False, default=str)
+
+
+class _QueueHandlerSeparado(QueueHandler):
+    """
+    QueueHandler que deja el mensaje resuelto pero sin formatear: el formato
+    lo aplica el hilo del listener y la excepción viaja aparte en exc_text
+    (el QueueHandler estándar la pega al mensaje).
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _formateador():
+    if os.environ.get('LOG_FORMAT', 'texto').lower() == 'json':
+        return FormateadorJSON()
+    return logging.Formatter('%(asctime)s %(levelname)s [%(name)s] [%(request_id)s] %(message)s')
+
+
+def _niveles_por_modulo(texto: str) -> dict:
+    niveles = {}
+    for par in (texto or '').split(','):
+        if '=' not in par:
+            continue
+        modulo, nivel = (p.strip() for p in par.split('=', 1))
+        if modulo and nivel:
+            niveles[modulo] = nivel.upper()
+    return niveles
+
+
+def configurar_logging(nivel: str = None):
+    """Configura el root logger con una cola no bloqueante (idempotente)"""
+    global _listener
+    if _listener is not None:
+        return
+
+    formateador = _formateador()
+    destinos = []
+    consola = logging.StreamHandler(sys.stderr)
+    consola.setFormatter(formateador)
+    destinos.append(consola)
+    if os.environ.get('LOG_FILE'):
+        archivo = RotatingFileHandler(
+            os.environ['LOG_FILE'],
+            maxBytes=int(os.environ.get('LOG_FILE_BYTES', str(10 * 1024 * 1024))),
+            backupCount=int(os.environ.get('LOG_FILE_BACKUPS', '5')),
+            encoding='utf-8',
+        )
+        archivo.setFormatter(formateador)
+        destinos.append(archivo)
+
+    cola = queue.SimpleQueue()
+    encolador = _QueueHandlerSeparado(cola)
+    encolador.addFilter(FiltroRequest())
+
+    raiz = logging.getLogger()
+    for h in list(raiz.handlers):
+        raiz.removeHandler(h)
+    raiz.addHandler(encolador)
+    raiz.setLevel((nivel or os.environ.get('LOG_LEVEL', 'INFO')).upper())
+    for modulo, nivel_modulo in _niveles_por_modulo(os.environ.get('LOG_LEVELS')).items():
+        logging.getLogger(modulo).setLevel(nivel_modulo)
+
+    _listener = QueueListener(cola, *destinos, respect_handler_level=True)
+    _listener.start()
+    atexit.register(detener_logging)
+    if hasattr(os, 'register_at_fork'):
+        os.register_at_fork(after_in_child=_reiniciar_tras_fork)
+
+
+def _reiniciar_tras_fork():
+    """El hilo del listener no sobrevive a fork(): cada worker arranca el suyo"""
+    global _listener
+    if _listener is not None:
+        _listener = QueueListener(_listener.queue, *_listener.handlers, respect_handler_level=True)
+        _listener.start()
+
+
+def detener_logging():
+    """Vacía la cola y detiene el hilo de escritura"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def init_request_id(app):
+    """Asigna un id a cada request y lo devuelve en X-Request-ID"""
+    from flask import g, request
+
+    @app.before_request
+    def _asignar_request_id():
+        entrante = request.headers.get('X-Request-ID', '')
+        g.request_id = entrante[:64] if entrante else uuid.uuid4().hex
+
+    @app.after_request
+    def _devolver_request_id(response):
+        request_id = g.get('request_id')
+        if request_id:
+            response.headers['X-Request-ID'] = request_id
+        return response
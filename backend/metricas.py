@@ -0,0 +1,223 @@
+"""
+Métricas de la aplicación en formato de exposición de texto (Prometheus)
+
+- latencia por ruta (histograma), requests por ruta/método/estado y en curso
+- conexiones de la base (abiertas, en uso) y errores "database is locked"
+- reintentos por bloqueo de SQLite y aciertos/fallos de las cachés
+
+Para que registrar no cueste un lock por evento, cada hilo escribe en su
+propio fragmento de contadores; `/metrics` suma todos los fragmentos al
+momento del scrape. Los fragmentos de hilos terminados se consolidan en uno
+solo para que la lista no crezca con servidores que crean un hilo por request.
+"""
+import bisect
+import threading
+import time
+
+from flask import Response, g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool
+
+# Límites (en segundos) de los buckets de latencia
+BUCKETS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# nombre -> (tipo, ayuda)
+_METRICAS = {
+    'http_requests_total': ('counter', 'Requests atendidos por ruta, método y estado'),
+    'http_request_duration_seconds': ('histogram', 'Latencia de requests por ruta y método'),
+    'http_requests_in_flight': ('gauge', 'Requests en curso'),
+    'db_connections_opened_total': ('counter', 'Conexiones DBAPI abiertas'),
+    'db_connections_checked_out': ('gauge', 'Conexiones de la base en uso'),
+    'db_errors_total': ('counter', 'Errores de la base por tipo'),
+    'sqlite_busy_retries_total': ('counter', 'Reintentos por "database is locked"'),
+    'cache_requests_total': ('counter', 'Consultas a cachés internas por resultado (hit/miss)'),
+}
+
+
+class _Fragmento:
+    __slots__ = ('hilo', 'contadores', 'histogramas')
+
+    def __init__(self, hilo):
+        self.hilo = hilo
+        self.contadores = {}
+        self.histogramas = {}
+
+
+_local = threading.local()
+_fragmentos = []
+_retirado = _Fragmento(None)
+_lock = threading.Lock()
+_instalado = False
+
+
+def _fragmento() -> _Fragmento:
+    f = getattr(_local, 'fragmento', None)
+    if f is None:
+        f = _local.fragmento = _Fragmento(threading.current_thread())
+        with _lock:
+            _fragmentos.append(f)
+    return f
+
+
+def _clave(nombre, labels):
+    return (nombre, tuple(sorted(labels.items())) if labels else ())
+
+
+def contar(nombre: str, valor: float = 1, **labels):
+    """Suma `valor` a un contador (o gauge) con esas etiquetas"""
+    c = _fragmento().contadores
+    k = _clave(nombre, labels)
+    c[k] = c.get(k, 0) + valor
+
+
+def observar(nombre: str, valor: float, **labels):
+    """Registra una observación en un histograma"""
+    h = _fragmento().histogramas
+    k = _clave(nombre, labels)
+    datos = h.get(k)
+    if datos is None:
+        datos = h[k] = [[0] * (len(BUCKETS_LATENCIA) + 1), 0.0, 0]
+    datos[0][bisect.bisect_left(BUCKETS_LATENCIA, valor)] += 1
+    datos[1] += valor
+    datos[2] += 1
+
+
+def contar_cache(cache: str, acierto: bool):
+    contar('cache_requests_total', cache=cache, resultado='hit' if acierto else 'miss')
+
+
+def _fusionar(destino: _Fragmento, origen: _Fragmento):
+    for k, v in list(origen.contadores.items()):
+        destino.contadores[k] = destino.contadores.get(k, 0) + v
+    for k, (cubetas, suma, cantidad) in list(origen.histogramas.items()):
+        d = destino.histogramas.get(k)
+        if d is None:
+            d = destino.histogramas[k] = [[0] * len(cubetas), 0.0, 0]
+        for i, n in enumerate(cubetas):
+            d[0][i] += n
+        d[1] += suma
+        d[2] += cantidad
+
+
+def _agregar() -> _Fragmento:
+    """Suma todos los fragmentos; los de hilos muertos se consolidan en _retirado"""
+    total = _Fragmento(None)
+    with _lock:
+        vivos = []
+        for f in _fragmentos:
+            if f.hilo.is_alive():
+                vivos.append(f)
+            else:
+                _fusionar(_retirado, f)
+        _fragmentos[:] = vivos
+        _fusionar(total, _retirado)
+        for f in vivos:
+            _fusionar(total, f)
+    return total
+
+
+def _etiquetas(labels, extra=None) -> str:
+    pares = list(labels) + (list(extra) if extra else [])
+    if not pares:
+        return ''
+    texto = ','.join(
+        '{}="{}"'.format(k, str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for k, v in pares
+    )
+    return '{' + texto + '}'
+
+
+def _numero(v) -> str:
+    if isinstance(v, float):
+        return repr(v) if v != int(v) else str(int(v))
+    return str(v)
+
+
+def exposicion() -> str:
+    """Texto en formato de exposición de Prometheus con todas las métricas"""
+    total = _agregar()
+    por_nombre = {}
+    for (nombre, labels), v in total.contadores.items():
+        por_nombre.setdefault(nombre, []).append(('c', labels, v))
+    for (nombre, labels), v in total.histogramas.items():
+        por_nombre.setdefault(nombre, []).append(('h', labels, v))
+
+    lineas = []
+    for nombre in sorted(por_nombre):
+        tipo, ayuda = _METRICAS.get(nombre, ('untyped', ''))
+        if ayuda:
+            lineas.append(f'# HELP {nombre} {ayuda}')
+        lineas.append(f'# TYPE {nombre} {tipo}')
+        for clase, labels, v in sorted(por_nombre[nombre], key=lambda x: x[1]):
+            if clase == 'c':
+                lineas.append(f'{nombre}{_etiquetas(labels)} {_numero(v)}')
+                continue
+            cubetas, suma, cantidad = v
+            acumulado = 0
+            for limite, n in zip(BUCKETS_LATENCIA, cubetas):
+                acumulado += n
+                lineas.append(f'{nombre}_bucket{_etiquetas(labels, [("le", limite)])} {acumulado}')
+            lineas.append(f'{nombre}_bucket{_etiquetas(labels, [("le", "+Inf")])} {cantidad}')
+            lineas.append(f'{nombre}_sum{_etiquetas(labels)} {suma:.6f}')
+            lineas.append(f'{nombre}_count{_etiquetas(labels)} {cantidad}')
+    return '\n'.join(lineas) + '\n'
+
+
+def _instalar_eventos_db():
+    global _instalado
+    if _instalado:
+        return
+
+    @event.listens_for(Pool, 'connect')
+    def _conexion_abierta(dbapi_connection, connection_record):
+        contar('db_connections_opened_total')
+
+    @event.listens_for(Pool, 'checkout')
+    def _conexion_tomada(dbapi_connection, connection_record, connection_proxy):
+        contar('db_connections_checked_out')
+
+    @event.listens_for(Pool, 'checkin')
+    def _conexion_devuelta(dbapi_connection, connection_record):
+        contar('db_connections_checked_out', -1)
+
+    @event.listens_for(Engine, 'handle_error')
+    def _error_db(contexto):
+        mensaje = str(contexto.original_exception).lower()
+        if 'locked' in mensaje or 'busy' in mensaje:
+            tipo = 'locked'
+        else:
+            tipo = type(contexto.original_exception).__name__
+        contar('db_errors_total', tipo=tipo)
+
+    _instalado = True
+
+
+def init_metricas(app):
+    """Registra la medición por request y la ruta /metrics"""
+    _instalar_eventos_db()
+
+    @app.before_request
+    def _inicio_metricas():
+        g.metricas_inicio = time.perf_counter()
+        contar('http_requests_in_flight')
+
+    @app.after_request
+    def _estado_metricas(response):
+        g.metricas_estado = response.status_code
+        return response
+
+    @app.teardown_request
+    def _fin_metricas(exc):
+        inicio = g.pop('metricas_inicio', None)
+        if inicio is None:
+            return
+        contar('http_requests_in_flight', -1)
+        ruta = request.url_rule.rule if request.url_rule is not None else 'sin_ruta'
+        estado = g.pop('metricas_estado', 500 if exc is not None else 200)
+        observar('http_request_duration_seconds', time.perf_counter() - inicio, ruta=ruta, metodo=request.method)
+        contar('http_requests_total', ruta=ruta, metodo=request.method, estado=estado)
+
+    @app.route('/metrics')
+    def metrics():
+        return Response(exposicion(), mimetype='text/plain; version=0.0.4')
@@ -43,6 +43,12 @@ class EstadoTorneo(Base):
         return f"<EstadoTorneo(idEstadoTorneo={self.idEstadoTorneo}, nombre='{self.nombre}')>"
 
 
+# Valores de los catálogos de pago: los siembra la migración 5 y
+# pago_service.inicializar_estados_y_metodos (única copia de las listas)
+ESTADOS_PAGO = ('Pendiente', 'Pagado', 'Cancelado', 'Reembolsado')
+METODOS_PAGO = ('Efectivo', 'Tarjeta de Débito', 'Tarjeta de Crédito', 'Transferencia Bancaria', 'MercadoPago')
+
+
 class EstadoPago(Base):
     __tablename__ = "EstadoPago"
     idEstado = Column('idEstadoPago', Integer, primary_key=True, autoincrement=True)
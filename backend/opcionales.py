@@ -0,0 +1,28 @@
+"""
+Dependencias opcionales y pesadas importadas en el primer uso
+
+Pillow sólo se usa al servir imágenes; importarlo al arrancar suma tiempo a
+cada worker (y al scheduler) aunque nunca se pida una foto. Los módulos piden
+la librería con estas funciones dentro del handler y reciben None si no está
+instalada, igual que antes con los flags PIL_AVAILABLE.
+"""
+import importlib
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def modulo_opcional(nombre):
+    """Importa `nombre` la primera vez que se pide; None si no está instalado"""
+    try:
+        return importlib.import_module(nombre)
+    except ImportError:
+        return None
+
+
+def pil_image():
+    """PIL.Image, o None si Pillow no está instalado"""
+    return modulo_opcional('PIL.Image')
+
+
+def pil_disponible():
+    return pil_image() is not None
@@ -0,0 +1,177 @@
+"""
+Perfilado a demanda de requests
+
+Un request se perfila cuando:
+
+- trae `X-Profile: 1` (muestreo) o `X-Profile: cprofile` (determinista) junto
+  con el token de administrador (ver Admin.token_admin_valido), o
+- sale sorteado según PROFILE_SAMPLE_RATE (0 por defecto = nunca; 0.01 = 1%)
+
+El modo muestreo toma la pila del hilo del request cada PROFILE_INTERVAL_MS
+(por defecto 1 ms) desde un hilo aparte y la acumula en formato "folded"
+(`a;b;c <cantidad>`), el que usan flamegraph.pl y speedscope. El modo cprofile
+usa cProfile y guarda las funciones con más tiempo acumulado.
+
+Cada perfil se guarda con la línea de tiempo SQL del request (g.sql) en un
+buffer circular (PROFILE_BUFFER, por defecto 20) y la respuesta lleva el
+header `X-Profile-Id` para consultarlo en /api/admin/perfiles/<id>.
+
+Sin header ni muestreo, el costo por request es una lectura de header.
+"""
+import io
+import itertools
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+
+from flask import g, request
+
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', '0'))
+PROFILE_INTERVAL_MS = float(os.environ.get('PROFILE_INTERVAL_MS', '1'))
+# Corta el muestreo de requests que se cuelgan
+PROFILE_MAX_SEGUNDOS = float(os.environ.get('PROFILE_MAX_SEGUNDOS', '30'))
+MAX_PROFUNDIDAD = 200
+
+_perfiles = deque(maxlen=int(os.environ.get('PROFILE_BUFFER', '20')))
+_lock = threading.Lock()
+_ids = itertools.count(1)
+
+
+def _etiqueta(code) -> str:
+    return f'{os.path.basename(code.co_filename)}:{code.co_name}'
+
+
+class Muestreador:
+    """Toma muestras de la pila de un hilo desde un hilo auxiliar"""
+
+    def __init__(self, ident: int, intervalo_ms: float = PROFILE_INTERVAL_MS):
+        self.ident = ident
+        self.intervalo = max(intervalo_ms, 0.1) / 1000
+        self.pilas = Counter()
+        self.muestras = 0
+        self._fin = threading.Event()
+        self._hilo = threading.Thread(target=self._muestrear, name='perfilado', daemon=True)
+
+    def iniciar(self):
+        self._hilo.start()
+
+    def detener(self):
+        self._fin.set()
+        self._hilo.join()
+
+    def _muestrear(self):
+        limite = time.perf_counter() + PROFILE_MAX_SEGUNDOS
+        while not self._fin.wait(self.intervalo):
+            frame = sys._current_frames().get(self.ident)
+            if frame is None or time.perf_counter() > limite:
+                break
+            pila = []
+            while frame is not None and len(pila) < MAX_PROFUNDIDAD:
+                pila.append(_etiqueta(frame.f_code))
+                frame = frame.f_back
+            self.pilas[';'.join(reversed(pila))] += 1
+            self.muestras += 1
+
+    def folded(self) -> str:
+        return ''.join(f'{pila} {n}\n' for pila, n in self.pilas.most_common())
+
+
+def _modo_solicitado():
+    """'muestreo', 'cprofile' o None; el header sólo cuenta con token de admin"""
+    pedido = request.headers.get('X-Profile')
+    if pedido:
+        from Admin import token_admin_valido
+        if token_admin_valido():
+            return 'cprofile' if pedido.lower() == 'cprofile' else 'muestreo'
+    if PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE:
+        return 'muestreo'
+    return None
+
+
+def _iniciar(modo):
+    if modo == 'cprofile':
+        import cProfile
+        perfilador = cProfile.Profile()
+        perfilador.enable()
+    else:
+        perfilador = Muestreador(threading.get_ident())
+        perfilador.iniciar()
+    g.perfil = (modo, perfilador, time.perf_counter())
+
+
+def _finalizar(estado):
+    modo, perfilador, inicio = g.pop('perfil')
+    duracion_ms = (time.perf_counter() - inicio) * 1000
+    entrada = {
+        'id': next(_ids),
+        'fecha': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'metodo': request.method,
+        'ruta': request.full_path.rstrip('?'),
+        'regla': request.url_rule.rule if request.url_rule is not None else None,
+        'estado': estado,
+        'duracionMs': round(duracion_ms, 2),
+        'modo': modo,
+    }
+    if modo == 'cprofile':
+        perfilador.disable()
+        import pstats
+        salida = io.StringIO()
+        pstats.Stats(perfilador, stream=salida).sort_stats('cumulative').print_stats(60)
+        entrada['estadisticas'] = salida.getvalue()
+    else:
+        perfilador.detener()
+        entrada['muestras'] = perfilador.muestras
+        entrada['intervaloMs'] = PROFILE_INTERVAL_MS
+        entrada['folded'] = perfilador.folded()
+
+    stats = g.get('sql')
+    if stats is not None:
+        entrada['sql'] = stats.resumen()
+        entrada['sqlLineaTiempo'] = list(stats.linea_tiempo)
+    with _lock:
+        _perfiles.append(entrada)
+    return entrada['id']
+
+
+def perfiles() -> list:
+    """Resumen de los perfiles guardados, del más reciente al más antiguo"""
+    with _lock:
+        copia = list(reversed(_perfiles))
+    return [
+        {k: v for k, v in p.items() if k not in ('folded', 'estadisticas', 'sqlLineaTiempo')}
+        for p in copia
+    ]
+
+
+def obtener_perfil(id_perfil: int):
+    with _lock:
+        for p in _perfiles:
+            if p['id'] == id_perfil:
+                return p
+    return None
+
+
+def init_perfilado(app):
+    """Registra los hooks de perfilado (registrar después de init_instrumentacion_sql)"""
+
+    @app.before_request
+    def _iniciar_perfil():
+        modo = _modo_solicitado()
+        if modo is not None:
+            _iniciar(modo)
+
+    @app.after_request
+    def _cerrar_perfil(response):
+        if 'perfil' in g:
+            response.headers['X-Profile-Id'] = str(_finalizar(response.status_code))
+        return response
+
+    @app.teardown_request
+    def _cerrar_perfil_con_error(exc):
+        # Si el request terminó en excepción el after_request no corre
+        if 'perfil' in g:
+            _finalizar(500)
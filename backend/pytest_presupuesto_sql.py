@@ -0,0 +1,47 @@
+"""
+Plugin de pytest: presupuesto de consultas SQL
+
+Lo registra backend/conftest.py (`pytest_plugins`), que también define los
+fixtures `app` y `client` sobre una base temporal. Fuera de esos tests se
+activa con `pytest -p pytest_presupuesto_sql`.
+
+Uso:
+
+    def test_listado_canchas(client, presupuesto_sql):
+        with presupuesto_sql(3):
+            client.get('/api/canchas')
+
+    def test_sin_n_mas_1(client, presupuesto_sql):
+        with presupuesto_sql(20, repeticiones=5):
+            client.get('/api/reservas/calendar')
+
+El test falla si el bloque ejecuta más de `maximo` consultas o, con
+`repeticiones`, si alguna sentencia se repite esa cantidad de veces o más.
+"""
+from contextlib import contextmanager
+
+import pytest
+
+from instrumentacion_sql import medir_consultas
+
+
+@pytest.fixture
+def presupuesto_sql():
+    @contextmanager
+    def _presupuesto(maximo: int, repeticiones: int = None):
+        with medir_consultas() as stats:
+            yield stats
+        if stats.cantidad > maximo:
+            detalle = '\n'.join(f'  {n}x {h}' for h, n in stats.huellas.most_common(5))
+            pytest.fail(
+                f'Se ejecutaron {stats.cantidad} consultas SQL (presupuesto {maximo}, '
+                f'{stats.tiempo_ms:.1f} ms):\n{detalle}',
+                pytrace=False,
+            )
+        if repeticiones is not None:
+            repetidas = stats.repetidas(repeticiones)
+            if repetidas:
+                detalle = '\n'.join(f'  {n}x {h}' for h, n in repetidas)
+                pytest.fail(f'Sentencias repetidas (posible N+1):\n{detalle}', pytrace=False)
+
+    return _presupuesto
@@ -1,3 +1,5 @@
+import logging
+
 from flask import Blueprint, request, jsonify
 from basicas import (
     list_reservas_por_cliente_en_periodo,
@@ -9,6 +11,7 @@ from validators import parse_iso_date, json_error
 
 # Blueprint en español: 'informes'
 bp = Blueprint('informes', __name__)
+logger = logging.getLogger(__name__)
 
 
 @bp.route('/informes/reservas-por-cliente', methods=['GET'])
@@ -74,47 +77,174 @@ def informe_utilizacion_mensual():
         return json_error(str(e), 500)
 
 
+def _fechas(params: dict):
+    """(fechaDesde, fechaHasta) a partir de start/end en ISO; ValueError si no se entienden"""
+    inicio = params.get('start')
+    fin = params.get('end')
+    return (parse_iso_date(inicio) if inicio else None, parse_iso_date(fin) if fin else None)
+
+
+def datos_reporte_reservas_cliente(params: dict) -> dict:
+    """Reporte imprimible de reservas por cliente (start, end, idCliente opcionales)."""
+    fechaDesde, fechaHasta = _fechas(params)
+    idCliente = params.get('idCliente')
+    if idCliente:
+        resultado = list_reservas_por_cliente_en_periodo(
+            fechaDesde=fechaDesde,
+            fechaHasta=fechaHasta,
+            idCliente=int(idCliente)
+        )
+    else:
+        resultado = list_reservas_por_cliente_en_periodo(
+            fechaDesde=fechaDesde,
+            fechaHasta=fechaHasta
+        )
+
+    # Enriquecer con información adicional para el reporte
+    for item in resultado:
+        total_monto = sum(r.get('monto', 0) for r in item.get('reservas', []))
+        item['total_monto'] = total_monto
+        item['cantidad_reservas'] = len(item.get('reservas', []))
+
+    return {
+        'data': resultado,
+        'fechaDesde': params.get('start'),
+        'fechaHasta': params.get('end'),
+        'tipo': 'reservas-por-cliente'
+    }
+
+
+def datos_reporte_reservas_cancha(params: dict) -> dict:
+    """Reporte imprimible de reservas de una cancha; LookupError si la cancha no existe."""
+    fechaDesde, fechaHasta = _fechas(params)
+    idCancha = params.get('idCancha')
+    if not idCancha:
+        raise ValueError('idCancha es requerido')
+
+    from basicas import get_cancha, list_deportes, get_cliente, list_tipos_documento
+
+    cancha = get_cancha(int(idCancha))
+    if not cancha:
+        raise LookupError('Cancha no encontrada')
+
+    reservas = list_reservas_por_cancha(
+        idCancha=int(idCancha),
+        fechaDesde=fechaDesde,
+        fechaHasta=fechaHasta
+    )
+
+    # Obtener deportes para el nombre
+    deportes = list_deportes()
+    deporte_map = {d['idDeporte']: d['nombre'] for d in deportes}
+
+    # Obtener tipos de documento
+    tipos_doc = list_tipos_documento()
+    tipo_doc_map = {t['idTipoDoc']: t['nombre'] for t in tipos_doc}
+
+    # Obtener nombre del deporte de la cancha
+    deporte_nombre = 'N/A'
+    if cancha and cancha.get('deporte'):
+        # Convertir a int en caso de que venga como string
+        deporte_id = int(cancha.get('deporte'))
+        deporte_nombre = deporte_map.get(deporte_id, 'N/A')
+
+    # Enriquecer cada reserva con información del cliente
+    for reserva in reservas:
+        cliente = get_cliente(reserva.get('idCliente'))
+        if cliente:
+            reserva['cliente'] = {
+                'nombre': cliente.get('nombre'),
+                'apellido': cliente.get('apellido'),
+                'tipoDocumento': tipo_doc_map.get(cliente.get('idTipoDoc'), 'DNI'),
+                'numeroDoc': cliente.get('numeroDoc')
+            }
+
+    total_monto = sum(r.get('monto', 0) for r in reservas)
+
+    return {
+        'cancha': cancha,
+        'deporte': deporte_nombre,
+        'reservas': reservas,
+        'cantidad_reservas': len(reservas),
+        'total_monto': total_monto,
+        'fechaDesde': params.get('start'),
+        'fechaHasta': params.get('end'),
+        'tipo': 'reservas-por-cancha'
+    }
+
+
+def datos_reporte_canchas_mas_usadas(params: dict) -> dict:
+    """Reporte imprimible de canchas ordenadas por cantidad de reservas en el periodo."""
+    fechaDesde, fechaHasta = _fechas(params)
+
+    from basicas import list_canchas, list_deportes
+    from database.mapeoCanchas import SessionLocal, CanchaxServicio
+    from services.archivo_service import tablas_reservas
+
+    # Caliente + archivo si el periodo llega a reservas archivadas
+    Reserva, DetalleReserva, _ = tablas_reservas(fechaDesde)
+    session = SessionLocal()
+    try:
+        # Obtener todas las canchas
+        canchas = list_canchas()
+        deportes = list_deportes()
+        deporte_map = {d['idDeporte']: d['nombre'] for d in deportes}
+
+        # Calcular reservas por cancha en el período
+        resultado = []
+        for cancha in canchas:
+            q = session.query(Reserva).join(
+                DetalleReserva,
+                Reserva.idReserva == DetalleReserva.idReserva
+            ).join(
+                CanchaxServicio,
+                DetalleReserva.idCxS == CanchaxServicio.idCxS
+            ).filter(
+                CanchaxServicio.idCancha == cancha['idCancha']
+            )
+
+            if fechaDesde:
+                q = q.filter(Reserva.fechaReservada >= fechaDesde)
+            if fechaHasta:
+                q = q.filter(Reserva.fechaReservada <= fechaHasta)
+
+            count = q.distinct().count()
+
+            # Convertir deporte a int para buscar en el mapa
+            deporte_id = int(cancha['deporte']) if cancha.get('deporte') else None
+            deporte_nombre = deporte_map.get(deporte_id) if deporte_id else 'N/A'
+
+            resultado.append({
+                'idCancha': cancha['idCancha'],
+                'nombre': cancha['nombre'],
+                'deporte': deporte_nombre,
+                'conteo_reservas': count,
+                'precioHora': cancha.get('precioHora', 0)
+            })
+
+        # Ordenar por conteo descendente
+        resultado.sort(key=lambda x: x['conteo_reservas'], reverse=True)
+
+        return {
+            'data': resultado,
+            'fechaDesde': params.get('start'),
+            'fechaHasta': params.get('end'),
+            'tipo': 'canchas-mas-usadas'
+        }
+    finally:
+        session.close()
+
+
 @bp.route('/informes/reporte-reservas-cliente', methods=['GET'])
 def reporte_reservas_cliente():
     """Genera reporte imprimible de reservas por cliente con filtro de fechas."""
-    inicio = request.args.get('start')
-    fin = request.args.get('end')
-    idCliente = request.args.get('idCliente')
-    
+    params = request.args.to_dict()
     try:
-        fechaDesde = parse_iso_date(inicio) if inicio else None
-        fechaHasta = parse_iso_date(fin) if fin else None
+        _fechas(params)
     except ValueError as e:
         return json_error(str(e), 400)
-    
     try:
-        from basicas import list_clientes
-        
-        if idCliente:
-            resultado = list_reservas_por_cliente_en_periodo(
-                fechaDesde=fechaDesde, 
-                fechaHasta=fechaHasta, 
-                idCliente=int(idCliente)
-            )
-        else:
-            resultado = list_reservas_por_cliente_en_periodo(
-                fechaDesde=fechaDesde, 
-                fechaHasta=fechaHasta
-            )
-        
-        # Enriquecer con información adicional para el reporte
-        for item in resultado:
-            cliente = item.get('cliente', {})
-            total_monto = sum(r.get('monto', 0) for r in item.get('reservas', []))
-            item['total_monto'] = total_monto
-            item['cantidad_reservas'] = len(item.get('reservas', []))
-        
-        return jsonify({
-            'data': resultado,
-            'fechaDesde': inicio,
-            'fechaHasta': fin,
-            'tipo': 'reservas-por-cliente'
-        })
+        return jsonify(datos_reporte_reservas_cliente(params))
     except Exception as e:
         return json_error(str(e), 500)
 
@@ -122,70 +252,17 @@ def reporte_reservas_cliente():
 @bp.route('/informes/reporte-reservas-cancha', methods=['GET'])
 def reporte_reservas_cancha():
     """Genera reporte imprimible de reservas por cancha con filtro de fechas."""
-    inicio = request.args.get('start')
-    fin = request.args.get('end')
-    idCancha = request.args.get('idCancha')
-    
+    params = request.args.to_dict()
     try:
-        fechaDesde = parse_iso_date(inicio) if inicio else None
-        fechaHasta = parse_iso_date(fin) if fin else None
+        _fechas(params)
     except ValueError as e:
         return json_error(str(e), 400)
-    
-    if not idCancha:
+    if not params.get('idCancha'):
         return json_error('idCancha es requerido', 400)
-    
     try:
-        from basicas import get_cancha, list_deportes, get_cliente, list_tipos_documento
-        
-        cancha = get_cancha(int(idCancha))
-        if not cancha:
-            return json_error('Cancha no encontrada', 404)
-        
-        reservas = list_reservas_por_cancha(
-            idCancha=int(idCancha),
-            fechaDesde=fechaDesde,
-            fechaHasta=fechaHasta
-        )
-        
-        # Obtener deportes para el nombre
-        deportes = list_deportes()
-        deporte_map = {d['idDeporte']: d['nombre'] for d in deportes}
-        
-        # Obtener tipos de documento
-        tipos_doc = list_tipos_documento()
-        tipo_doc_map = {t['idTipoDoc']: t['nombre'] for t in tipos_doc}
-        
-        # Obtener nombre del deporte de la cancha
-        deporte_nombre = 'N/A'
-        if cancha and cancha.get('deporte'):
-            # Convertir a int en caso de que venga como string
-            deporte_id = int(cancha.get('deporte'))
-            deporte_nombre = deporte_map.get(deporte_id, 'N/A')
-        
-        # Enriquecer cada reserva con información del cliente
-        for reserva in reservas:
-            cliente = get_cliente(reserva.get('idCliente'))
-            if cliente:
-                reserva['cliente'] = {
-                    'nombre': cliente.get('nombre'),
-                    'apellido': cliente.get('apellido'),
-                    'tipoDocumento': tipo_doc_map.get(cliente.get('idTipoDoc'), 'DNI'),
-                    'numeroDoc': cliente.get('numeroDoc')
-                }
-        
-        total_monto = sum(r.get('monto', 0) for r in reservas)
-        
-        return jsonify({
-            'cancha': cancha,
-            'deporte': deporte_nombre,
-            'reservas': reservas,
-            'cantidad_reservas': len(reservas),
-            'total_monto': total_monto,
-            'fechaDesde': inicio,
-            'fechaHasta': fin,
-            'tipo': 'reservas-por-cancha'
-        })
+        return jsonify(datos_reporte_reservas_cancha(params))
+    except LookupError as e:
+        return json_error(str(e), 404)
     except Exception as e:
         return json_error(str(e), 500)
 
@@ -193,78 +270,162 @@ def reporte_reservas_cancha():
 @bp.route('/informes/reporte-canchas-mas-usadas', methods=['GET'])
 def reporte_canchas_mas_usadas():
     """Genera reporte imprimible de canchas más utilizadas."""
-    inicio = request.args.get('start')
-    fin = request.args.get('end')
-    
+    params = request.args.to_dict()
     try:
-        fechaDesde = parse_iso_date(inicio) if inicio else None
-        fechaHasta = parse_iso_date(fin) if fin else None
+        _fechas(params)
     except ValueError as e:
         return json_error(str(e), 400)
-    
     try:
-        from basicas import list_canchas, list_deportes, _to_dict
-        import sys
-        from pathlib import Path
-        
-        # Asegurar que podemos importar desde database
-        ROOT = Path(__file__).resolve().parent.parent
-        if str(ROOT) not in sys.path:
-            sys.path.insert(0, str(ROOT))
-        
-        from database.mapeoCanchas import SessionLocal, Reserva, DetalleReserva, CanchaxServicio
-        
-        session = SessionLocal()
-        try:
-            # Obtener todas las canchas
-            canchas = list_canchas()
-            deportes = list_deportes()
-            deporte_map = {d['idDeporte']: d['nombre'] for d in deportes}
-            
-            # Calcular reservas por cancha en el período
-            resultado = []
-            for cancha in canchas:
-                q = session.query(Reserva).join(
-                    DetalleReserva, 
-                    Reserva.idReserva == DetalleReserva.idReserva
-                ).join(
-                    CanchaxServicio,
-                    DetalleReserva.idCxS == CanchaxServicio.idCxS
-                ).filter(
-                    CanchaxServicio.idCancha == cancha['idCancha']
-                )
-                
-                if fechaDesde:
-                    q = q.filter(Reserva.fechaReservada >= fechaDesde)
-                if fechaHasta:
-                    q = q.filter(Reserva.fechaReservada <= fechaHasta)
-                
-                count = q.distinct().count()
-                
-                # Convertir deporte a int para buscar en el mapa
-                deporte_id = int(cancha['deporte']) if cancha.get('deporte') else None
-                deporte_nombre = deporte_map.get(deporte_id) if deporte_id else 'N/A'
-                
-                resultado.append({
-                    'idCancha': cancha['idCancha'],
-                    'nombre': cancha['nombre'],
-                    'deporte': deporte_nombre,
-                    'conteo_reservas': count,
-                    'precioHora': cancha.get('precioHora', 0)
-                })
-            
-            # Ordenar por conteo descendente
-            resultado.sort(key=lambda x: x['conteo_reservas'], reverse=True)
-            
-            return jsonify({
-                'data': resultado,
-                'fechaDesde': inicio,
-                'fechaHasta': fin,
-                'tipo': 'canchas-mas-usadas'
-            })
-        finally:
-            session.close()
+        return jsonify(datos_reporte_canchas_mas_usadas(params))
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception('Error en reporte_canchas_mas_usadas')
         return json_error(str(e), 500)
+
+
+# ---------------- Informes en segundo plano ----------------
+
+def _datos_reservas_por_cliente(params: dict):
+    fechaDesde, fechaHasta = _fechas(params)
+    idCliente = params.get('idCliente')
+    return list_reservas_por_cliente_en_periodo(
+        fechaDesde=fechaDesde, fechaHasta=fechaHasta, idCliente=int(idCliente) if idCliente else None
+    )
+
+
+def _datos_reservas_por_cancha(params: dict):
+    fechaDesde, fechaHasta = _fechas(params)
+    if not params.get('idCancha'):
+        raise ValueError('idCancha es requerido')
+    return list_reservas_por_cancha(idCancha=int(params['idCancha']), fechaDesde=fechaDesde, fechaHasta=fechaHasta)
+
+
+def _datos_utilizacion_mensual(params: dict):
+    idCancha = params.get('idCancha')
+    return utilizacion_mensual(year=params.get('year'), idCancha=int(idCancha) if idCancha else None)
+
+
+# Informes que se pueden pedir como job: nombre -> función(params) -> resultado JSON
+INFORMES_JOBS = {
+    'reservas-por-cliente': _datos_reservas_por_cliente,
+    'reservas-por-cancha': _datos_reservas_por_cancha,
+    'cancha-mas-usada': lambda params: cancha_mas_usada(),
+    'utilizacion-mensual': _datos_utilizacion_mensual,
+    'reporte-reservas-cliente': datos_reporte_reservas_cliente,
+    'reporte-reservas-cancha': datos_reporte_reservas_cancha,
+    'reporte-canchas-mas-usadas': datos_reporte_canchas_mas_usadas,
+}
+
+
+def _respuesta_job(job: dict, status: int):
+    # clave, host, pid, inicio y latido son internos del servicio
+    job = {k: v for k, v in job.items() if k not in ('clave', 'host', 'pid', 'inicio', 'latido')}
+    job['url'] = f"{request.script_root}/api/informes/jobs/{job['id']}"
+    return jsonify(job), status
+
+
+@bp.route('/informes/jobs', methods=['POST'])
+def encolar_informe():
+    """
+    Encola un informe para calcularlo fuera del request.
+    Body: {"informe": "<nombre>", "start": "YYYY-MM-DD", "end": ..., "idCliente": ..., "idCancha": ..., "year": ...}
+    """
+    from services import informes_jobs_service
+
+    data = request.get_json(silent=True) or {}
+    informe = data.get('informe')
+    if informe not in INFORMES_JOBS:
+        return json_error(f"informe debe ser uno de: {', '.join(sorted(INFORMES_JOBS))}", 400)
+
+    params = {}
+    for clave in ('start', 'end'):
+        if data.get(clave):
+            params[clave] = str(data[clave])
+    try:
+        _fechas(params)
+    except ValueError as e:
+        return json_error(str(e), 400)
+    try:
+        for clave in ('idCliente', 'idCancha', 'year'):
+            if data.get(clave) not in (None, ''):
+                params[clave] = int(data[clave])
+    except (TypeError, ValueError):
+        return json_error('idCliente, idCancha y year deben ser enteros', 400)
+    if informe in ('reservas-por-cancha', 'reporte-reservas-cancha') and 'idCancha' not in params:
+        return json_error('idCancha es requerido', 400)
+
+    job = informes_jobs_service.encolar(informe, params, INFORMES_JOBS[informe])
+    # 200 si ya estaba calculado para esta versión de los datos, 202 si quedó encolado
+    if job['estado'] == informes_jobs_service.TERMINADO:
+        return _respuesta_job(informes_jobs_service.obtener_estado(job['id']), 200)
+    return _respuesta_job(job, 202)
+
+
+@bp.route('/informes/jobs/<string:job_id>', methods=['GET'])
+def estado_informe(job_id: str):
+    """Estado del job; cuando terminó incluye el resultado en 'resultado'."""
+    from services import informes_jobs_service
+
+    job = informes_jobs_service.obtener_estado(job_id)
+    if job is None:
+        return json_error('Job no encontrado', 404)
+    return _respuesta_job(job, 200)
+
+
+@bp.route('/informes/<string:nombre>.csv', methods=['GET'])
+def exportar_informe_csv(nombre: str):
+    """Exporta el informe indicado como CSV en streaming (acepta gzip)."""
+    return _exportar_informe(nombre, 'csv')
+
+
+@bp.route('/informes/<string:nombre>.xlsx', methods=['GET'])
+def exportar_informe_xlsx(nombre: str):
+    """Exporta el informe indicado como XLSX en streaming."""
+    return _exportar_informe(nombre, 'xlsx')
+
+
+def _exportar_informe(nombre: str, formato: str):
+    from flask import Response, stream_with_context
+    from services.export_service import (
+        obtener_informe, iterar_filas, generar_csv, generar_xlsx, comprimir_gzip
+    )
+
+    inicio = request.args.get('start')
+    fin = request.args.get('end')
+    try:
+        params = {
+            'fechaDesde': parse_iso_date(inicio) if inicio else None,
+            'fechaHasta': parse_iso_date(fin) if fin else None,
+        }
+    except ValueError as e:
+        return json_error(str(e), 400)
+    try:
+        for clave in ('idCliente', 'idCancha', 'year'):
+            valor = request.args.get(clave)
+            params[clave] = int(valor) if valor else None
+    except ValueError:
+        return json_error('idCliente, idCancha y year deben ser enteros', 400)
+
+    try:
+        builder = obtener_informe(nombre)
+    except KeyError:
+        return json_error(f'Informe desconocido: {nombre}', 404)
+    # Un KeyError dentro del builder es un error del informe, no un informe desconocido
+    try:
+        columnas, fuente = builder(params)
+    except ValueError as e:
+        return json_error(str(e), 400)
+
+    filas = iterar_filas(fuente)
+    headers = {'Content-Disposition': f'attachment; filename="{nombre}.{formato}"'}
+    if formato == 'xlsx':
+        cuerpo = generar_xlsx(columnas, filas, hoja=nombre)
+        mimetype = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    else:
+        cuerpo = generar_csv(columnas, filas)
+        mimetype = 'text/csv'
+        # El XLSX ya viaja comprimido (zip); al CSV le aplicamos gzip si el cliente lo acepta
+        headers['Vary'] = 'Accept-Encoding'
+        if request.accept_encodings['gzip']:
+            cuerpo = comprimir_gzip(cuerpo)
+            headers['Content-Encoding'] = 'gzip'
+    return Response(stream_with_context(cuerpo), mimetype=mimetype, headers=headers)
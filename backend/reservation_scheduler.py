@@ -2,6 +2,7 @@
 Script para enviar recordatorios de reservas al comenzar el día.
 Debe ejecutarse periódicamente (cada hora) mediante cron/task scheduler.
 """
+import logging
 import sys
 import os
 
@@ -11,6 +12,9 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 from datetime import datetime, timedelta
 from database.mapeoCanchas import SessionLocal, Reserva, Cliente, DetalleReserva, Cancha, Horario, Deporte, Servicio, CanchaxServicio
 from backend.email_service import send_reservation_reminder
+from backend.logging_config import configurar_logging
+
+logger = logging.getLogger(__name__)
 
 # URL base de la aplicación (configurar según el entorno)
 BASE_URL = os.getenv('BASE_URL', 'http://localhost:5000')
@@ -29,10 +33,10 @@ def check_and_send_reminders():
         # MODO PRUEBA: Comentar esto para probar en cualquier hora
         # Solo enviar recordatorios si estamos entre 00:00 y 01:00
         # if now.hour > 0:
-        #     print(f"\n⏰ Fuera del horario de envío (solo 00:00-01:00). Hora actual: {now.hour}:{now.minute:02d}")
+        #     logger.info('Fuera del horario de envío (solo 00:00-01:00). Hora actual: %d:%02d', now.hour, now.minute)
         #     return
         
-        print(f"\n🔍 Buscando reservas para hoy {today}")
+        logger.info('Buscando reservas para hoy %s', today)
         
         # Buscar reservas pendientes o confirmadas para el día de hoy
         reservas = db.query(Reserva).filter(
@@ -71,7 +75,7 @@ def check_and_send_reminders():
                 # Obtener información del cliente
                 cliente = db.get(Cliente, reserva.idCliente)
                 if not cliente or not cliente.mail:
-                    print(f"⚠️ Reserva {reserva.idReserva}: Cliente sin email")
+                    logger.warning('Reserva %s: cliente sin email', reserva.idReserva)
                     continue
                 
                 # Obtener deporte
@@ -118,24 +122,21 @@ def check_and_send_reminders():
                     cancel_url
                 ):
                     emails_sent += 1
-                    print(f"✅ Recordatorio enviado para reserva {reserva.idReserva}")
+                    logger.info('Recordatorio enviado para reserva %s', reserva.idReserva)
                 
             except Exception as e:
-                print(f"❌ Error procesando reserva {reserva.idReserva}: {e}")
+                logger.exception('Error procesando reserva %s: %s', reserva.idReserva, e)
                 continue
         
-        print(f"\n📧 Total de emails enviados: {emails_sent}")
+        logger.info('Total de emails enviados: %d', emails_sent)
         
     except Exception as e:
-        print(f"❌ Error en check_and_send_reminders: {e}")
+        logger.exception('Error en check_and_send_reminders: %s', e)
     finally:
         db.close()
 
 if __name__ == '__main__':
-    print("="*60)
-    print("🔔 Iniciando verificación de recordatorios de reservas")
-    print("="*60)
+    configurar_logging()
+    logger.info('Iniciando verificación de recordatorios de reservas')
     check_and_send_reminders()
-    print("="*60)
-    print("✅ Proceso completado")
-    print("="*60)
+    logger.info('Proceso completado')
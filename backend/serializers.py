@@ -0,0 +1,182 @@
+"""
+Serializadores precompilados de filas a diccionarios
+
+`basicas._to_dict` recorría el mapper, hacía un getattr por columna y una
+cadena de isinstance por valor en cada llamada. Acá, para cada clase mapeada
+y cada conjunto de campos, se genera una única vez una función que arma el
+dict con las claves ya fijadas y sólo convierte las columnas de fecha.
+
+También se pueden serializar filas de Core (resultado de `session.execute`
+sobre un `select`) sin hidratar objetos ORM.
+
+El formato de salida es el mismo de `_to_dict`: datetime -> 'YYYY-MM-DD HH:MM:SS'
+y date -> 'YYYY-MM-DD'; el resto de los valores se devuelve tal cual.
+"""
+import threading
+from datetime import date, datetime
+
+FORMATO_FECHA_HORA = '%Y-%m-%d %H:%M:%S'
+FORMATO_FECHA = '%Y-%m-%d'
+
+# Tipos que se devuelven sin conversión
+_TIPOS_DIRECTOS = (int, float, str, bool, bytes)
+
+_cache = {}
+_lock = threading.Lock()
+
+
+def valor_json(v):
+    """Convierte date/datetime al formato de la API; el resto queda igual"""
+    t = type(v)
+    if t is datetime:
+        if v.tzinfo is None and v.year >= 1000:
+            return v.isoformat(' ', 'seconds')
+        return v.strftime(FORMATO_FECHA_HORA)
+    if t is date:
+        if v.year >= 1000:
+            return v.isoformat()
+        return v.strftime(FORMATO_FECHA)
+    if isinstance(v, datetime):
+        return v.strftime(FORMATO_FECHA_HORA)
+    if isinstance(v, date):
+        return v.strftime(FORMATO_FECHA)
+    return v
+
+
+def _necesita_conversion(tipo_columna) -> bool:
+    """False sólo si el tipo de la columna garantiza valores sin fechas"""
+    try:
+        return not issubclass(tipo_columna.python_type, _TIPOS_DIRECTOS)
+    except Exception:
+        return True
+
+
+def _compilar(nombre, claves, accesos, convertir):
+    """
+    Genera el código de una función `f(fuente) -> dict`
+
+    claves: nombres de salida; accesos: expresión de lectura de cada valor
+    sobre `o`; convertir: si a ese valor se le aplica valor_json.
+    """
+    partes = []
+    for clave, acceso, conv in zip(claves, accesos, convertir):
+        expr = f'_v({acceso})' if conv else acceso
+        partes.append(f'{clave!r}: {expr}')
+    fuente = f'def {nombre}(o):\n    return {{{", ".join(partes)}}}\n'
+    espacio = {'_v': valor_json}
+    exec(fuente, espacio)
+    return espacio[nombre]
+
+
+def _compilar_objeto(cls, campos):
+    mapper = cls.__mapper__
+    columnas = {attr.key: attr for attr in mapper.column_attrs}
+    if campos is None:
+        campos = tuple(columnas)
+    else:
+        desconocidos = [c for c in campos if c not in columnas]
+        if desconocidos:
+            raise ValueError(f'Campos desconocidos para {cls.__name__}: {", ".join(desconocidos)}')
+
+    accesos = [f'o.{c}' if c.isidentifier() else f'getattr(o, {c!r})' for c in campos]
+    convertir = [_necesita_conversion(columnas[c].columns[0].type) for c in campos]
+    lector = _compilar('_serializar_' + cls.__name__, campos, accesos, convertir)
+
+    claves = frozenset(campos)
+
+    def serializar(obj):
+        # Atributos expirados/diferidos se cargan con el getattr del lector;
+        # si están todos en __dict__ se leen directo sin pasar por el descriptor
+        d = obj.__dict__
+        if claves <= d.keys():
+            return lector_dict(d)
+        return lector(obj)
+
+    accesos_dict = [f'o[{c!r}]' for c in campos]
+    lector_dict = _compilar('_serializar_dict_' + cls.__name__, campos, accesos_dict, convertir)
+    return serializar
+
+
+def serializador(cls, campos=None):
+    """
+    Devuelve la función precompilada obj -> dict para una clase mapeada
+
+    Args:
+        cls: clase ORM (por ejemplo Reserva)
+        campos: iterable de nombres de atributo a incluir (None = todas las columnas)
+
+    Raises:
+        ValueError: si algún campo no es una columna de la clase
+    """
+    clave = (cls, tuple(campos) if campos is not None else None)
+    fn = _cache.get(clave)
+    if fn is None:
+        fn = _compilar_objeto(cls, clave[1])
+        with _lock:
+            _cache[clave] = fn
+    return fn
+
+
+def serializar(obj, campos=None) -> dict:
+    """Serializa un objeto ORM (o {} si es None) con el serializador de su clase"""
+    if obj is None:
+        return {}
+    return serializador(type(obj), campos)(obj)
+
+
+def serializar_lista(objs, campos=None) -> list:
+    """Serializa una secuencia homogénea u heterogénea de objetos ORM"""
+    salida = []
+    fn = None
+    cls = None
+    for obj in objs:
+        if type(obj) is not cls:
+            cls = type(obj)
+            fn = serializador(cls, campos)
+        salida.append(fn(obj))
+    return salida
+
+
+def serializador_filas(claves, tipos=None):
+    """
+    Devuelve la función precompilada fila -> dict para filas de Core
+
+    Args:
+        claves: nombres de las columnas del resultado, en orden
+        tipos: tipos SQLAlchemy de cada columna (opcional); sin tipos se
+            aplica la conversión de fechas a todas
+    """
+    claves = tuple(claves)
+    tipos_clave = tuple(type(t) for t in tipos) if tipos is not None else None
+    clave = ('filas', claves, tipos_clave)
+    fn = _cache.get(clave)
+    if fn is None:
+        accesos = [f'o[{i}]' for i in range(len(claves))]
+        if tipos is None:
+            convertir = [True] * len(claves)
+        else:
+            convertir = [_necesita_conversion(t) for t in tipos]
+        fn = _compilar('_serializar_fila', claves, accesos, convertir)
+        with _lock:
+            _cache[clave] = fn
+    return fn
+
+
+def serializador_select(stmt):
+    """Serializador de filas para un `select`, usando los tipos de sus columnas"""
+    columnas = list(stmt.selected_columns)
+    return serializador_filas([c.key for c in columnas], [c.type for c in columnas])
+
+
+def serializar_resultado(resultado, stmt=None) -> list:
+    """
+    Serializa un Result de Core (o de session.execute) a lista de dicts
+
+    Si se pasa el `select` que lo generó, las columnas no temporales se copian
+    sin conversión.
+    """
+    if stmt is not None:
+        fn = serializador_select(stmt)
+    else:
+        fn = serializador_filas(resultado.keys())
+    return [fn(fila) for fila in resultado]
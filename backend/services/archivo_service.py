@@ -0,0 +1,241 @@
+"""
+Servicio de Archivo de reservas históricas (particionado caliente/frío)
+
+Las reservas con fechaReservada anterior al horizonte (ARCHIVO_HORIZONTE_DIAS)
+se mueven, junto con sus detalles y pagos, a las tablas ReservaArchivo,
+DetalleReservaArchivo y PagoArchivo (migración 9). Así las tablas que tocan
+las reservas nuevas, el calendario y la disponibilidad quedan chicas, y los
+índices que recorren las consultas de todos los días no crecen con los años.
+
+El archivo está en la misma base (no en un archivo adjunto con ATTACH): en
+modo WAL una transacción que escribe en dos archivos no es atómica entre
+ellos, y acá cada lote tiene que copiar y borrar en un solo commit.
+
+`archivar()` trabaja por lotes de ARCHIVO_LOTE reservas, cada uno en su
+propia transacción (BEGIN IMMEDIATE) con una pausa entre lotes para que las
+reservas que llegan mientras tanto no esperen el lock. Se corre con cron
+(ver archivar_reservas.py).
+
+Los informes piden sus entidades con `tablas_reservas(fechaDesde)`: si el
+periodo llega a fechas archivadas, Reserva/DetalleReserva/Pago son alias
+sobre "tabla caliente UNION ALL tabla de archivo" y la consulta no cambia;
+si no, son los modelos de siempre y no se paga nada extra.
+
+Variables de entorno:
+    ARCHIVO_HORIZONTE_DIAS   antigüedad (días) a partir de la cual se archiva (730)
+    ARCHIVO_LOTE             reservas por transacción (500)
+    ARCHIVO_PAUSA_MS         pausa entre lotes (50)
+"""
+import logging
+import os
+import time
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import Column, MetaData, Table, bindparam, select, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import aliased
+
+from database.mapeoCanchas import ReadSessionLocal, Reserva, DetalleReserva, Pago
+from backend.database import engine
+
+logger = logging.getLogger(__name__)
+
+HORIZONTE_DIAS = int(os.getenv('ARCHIVO_HORIZONTE_DIAS', '730'))
+LOTE = int(os.getenv('ARCHIVO_LOTE', '500'))
+PAUSA_SEGUNDOS = int(os.getenv('ARCHIVO_PAUSA_MS', '50')) / 1000
+
+# Orden de copia; el borrado va al revés (primero lo que apunta a Reserva)
+MODELOS = (Reserva, DetalleReserva, Pago)
+# Columna que identifica a qué reserva pertenece cada fila
+_COLUMNA_RESERVA = 'idReserva'
+
+TablasReservas = namedtuple('TablasReservas', 'Reserva DetalleReserva Pago')
+
+_tabla_existe = None
+
+
+def _nombre_archivo(modelo) -> str:
+    return f'{modelo.__tablename__}Archivo'
+
+
+def _tabla_archivo(modelo, metadata) -> Table:
+    """Tabla de archivo con las mismas columnas (y claves de atributo) que el modelo"""
+    return Table(
+        _nombre_archivo(modelo), metadata,
+        *(Column(c.name, c.type, key=c.key, primary_key=c.primary_key) for c in modelo.__table__.columns),
+    )
+
+
+def _alias_union(modelo, metadata):
+    tabla = modelo.__table__
+    union = select(*tabla.c).union_all(select(*_tabla_archivo(modelo, metadata).c))
+    return aliased(modelo, union.subquery(f'{tabla.name}_todas'), name=f'{tabla.name}_todas')
+
+
+_metadata_archivo = MetaData()
+_TABLAS_CALIENTES = TablasReservas(Reserva, DetalleReserva, Pago)
+_TABLAS_CON_ARCHIVO = TablasReservas(*(_alias_union(m, _metadata_archivo) for m in MODELOS))
+
+
+# ---------------- Lectura (informes) ----------------
+
+def _hay_archivo(session) -> bool:
+    global _tabla_existe
+    if not _tabla_existe:
+        try:
+            _tabla_existe = bool(session.connection().exec_driver_sql(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'ReservaArchivo'"
+            ).first())
+        except Exception:
+            _tabla_existe = False
+    return _tabla_existe
+
+
+def limite_archivo():
+    """
+    Fecha (ISO) hasta la que puede haber reservas archivadas, o None si no hay
+    archivo. Es la mayor entre la última fecha archivada y el corte del
+    horizonte: lo que un lote en curso pueda mover nunca queda fuera.
+    """
+    session = ReadSessionLocal()
+    try:
+        if not _hay_archivo(session):
+            return None
+        ultima = session.execute(text('SELECT MAX("fechaReservada") FROM "ReservaArchivo"')).scalar()
+    except OperationalError:
+        return None
+    finally:
+        session.close()
+    corte = fecha_corte(HORIZONTE_DIAS).isoformat()
+    return max(str(ultima)[:10], corte) if ultima else corte
+
+
+def tablas_reservas(fechaDesde=None) -> TablasReservas:
+    """
+    (Reserva, DetalleReserva, Pago) para consultar reservas desde `fechaDesde`
+    (None = todo el historial): alias sobre caliente + archivo si el periodo
+    llega a fechas archivadas, o los modelos directamente si no.
+    """
+    limite = limite_archivo()
+    if limite is None:
+        return _TABLAS_CALIENTES
+    if fechaDesde is not None:
+        if isinstance(fechaDesde, datetime):
+            fechaDesde = fechaDesde.date()
+        if fechaDesde.isoformat() > limite:
+            return _TABLAS_CALIENTES
+    return _TABLAS_CON_ARCHIVO
+
+
+# ---------------- Archivado ----------------
+
+def fecha_corte(horizonte_dias: int) -> date:
+    """Se archivan las reservas con fechaReservada anterior a esta fecha"""
+    return date.today() - timedelta(days=horizonte_dias)
+
+
+def _columnas_fisicas(conn, tabla) -> list:
+    return [f[1] for f in conn.exec_driver_sql(f'PRAGMA table_info("{tabla}")').fetchall()]
+
+
+def _columnas_comunes(conn) -> dict:
+    """
+    Columnas a copiar por tabla (las que existen en origen y archivo). Si una
+    migración futura agrega una columna a Reserva, DetalleReserva o Pago, debe
+    agregarla también a su tabla de archivo para que se conserve.
+    """
+    comunes = {}
+    for modelo in MODELOS:
+        destino = set(_columnas_fisicas(conn, _nombre_archivo(modelo)))
+        if not destino:
+            raise RuntimeError(f'Falta la tabla {_nombre_archivo(modelo)}: aplicar las migraciones')
+        comunes[modelo.__tablename__] = [c for c in _columnas_fisicas(conn, modelo.__tablename__) if c in destino]
+    return comunes
+
+
+def _reservas_protegidas(conn) -> set:
+    """
+    Reservas dueñas del id más alto de Reserva, DetalleReserva o Pago. Sin
+    AUTOINCREMENT, SQLite reutiliza el id más alto si esa fila se borra; se
+    dejan en la tabla caliente para que un id archivado no se repita.
+    """
+    filas = conn.exec_driver_sql(
+        'SELECT MAX("idReserva") FROM "Reserva" '
+        'UNION ALL SELECT "idReserva" FROM "DetalleReserva" '
+        'WHERE "idDetalle" = (SELECT MAX("idDetalle") FROM "DetalleReserva") '
+        'UNION ALL SELECT "idReserva" FROM "Pago" WHERE "idPago" = (SELECT MAX("idPago") FROM "Pago")'
+    ).fetchall()
+    return {f[0] for f in filas if f[0] is not None}
+
+
+def _archivar_lote(conn, columnas: dict, corte: date, lote: int) -> dict:
+    """Mueve hasta `lote` reservas anteriores a `corte`; devuelve filas movidas por tabla"""
+    protegidas = _reservas_protegidas(conn)
+    candidatas = conn.execute(
+        text('SELECT "idReserva" FROM "Reserva" WHERE "fechaReservada" < :corte '
+             'ORDER BY "fechaReservada", "idReserva" LIMIT :lote'),
+        {'corte': corte.isoformat(), 'lote': lote + len(protegidas)},
+    ).scalars().all()
+    ids = [i for i in candidatas if i not in protegidas][:lote]
+    movidas = {m.__tablename__: 0 for m in MODELOS}
+    if not ids:
+        return movidas
+
+    for modelo in MODELOS:
+        tabla = modelo.__tablename__
+        lista = ', '.join(f'"{c}"' for c in columnas[tabla])
+        conn.execute(
+            text(f'INSERT INTO "{tabla}Archivo" ({lista}) SELECT {lista} FROM "{tabla}" '
+                 f'WHERE "{_COLUMNA_RESERVA}" IN :ids').bindparams(bindparam('ids', expanding=True)),
+            {'ids': ids},
+        )
+    for modelo in reversed(MODELOS):
+        tabla = modelo.__tablename__
+        resultado = conn.execute(
+            text(f'DELETE FROM "{tabla}" WHERE "{_COLUMNA_RESERVA}" IN :ids')
+            .bindparams(bindparam('ids', expanding=True)),
+            {'ids': ids},
+        )
+        movidas[tabla] = resultado.rowcount
+    return movidas
+
+
+def archivar(horizonte_dias: int = None, lote: int = None, pausa: float = None, max_lotes: int = None) -> dict:
+    """
+    Archiva las reservas anteriores al horizonte, lote por lote, hasta que no
+    quede ninguna (o hasta `max_lotes`). Devuelve
+    {'corte': 'YYYY-MM-DD', 'lotes': n, 'Reserva': n, 'DetalleReserva': n, 'Pago': n}.
+    """
+    horizonte_dias = HORIZONTE_DIAS if horizonte_dias is None else horizonte_dias
+    lote = lote or LOTE
+    pausa = PAUSA_SEGUNDOS if pausa is None else pausa
+    corte = fecha_corte(horizonte_dias)
+
+    totales = {'corte': corte.isoformat(), 'lotes': 0}
+    totales.update({m.__tablename__: 0 for m in MODELOS})
+    inicio = time.perf_counter()
+    with engine.connect() as conn:
+        columnas = _columnas_comunes(conn)
+        conn.commit()
+        while max_lotes is None or totales['lotes'] < max_lotes:
+            # Lock de escritura por lote: una reserva nueva espera como mucho un lote
+            conn.exec_driver_sql('BEGIN IMMEDIATE')
+            try:
+                movidas = _archivar_lote(conn, columnas, corte, lote)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            if not movidas['Reserva']:
+                break
+            totales['lotes'] += 1
+            for tabla, cantidad in movidas.items():
+                totales[tabla] += cantidad
+            logger.debug('Lote %d archivado: %s', totales['lotes'], movidas)
+            time.sleep(pausa)
+
+    logger.info('Archivo de reservas anteriores a %s: %d reservas, %d detalles, %d pagos en %d lotes (%.1f s)',
+                totales['corte'], totales['Reserva'], totales['DetalleReserva'], totales['Pago'],
+                totales['lotes'], time.perf_counter() - inicio)
+    return totales
@@ -0,0 +1,103 @@
+"""
+Servicio de Búsqueda de clientes
+
+Busca por nombre, apellido, mail, documento, teléfono y nombre de usuario
+sobre el índice FTS5 "ClienteFTS" (migración 8, sincronizado por triggers).
+Cada palabra escrita se busca como prefijo y todas deben aparecer, así
+"per jua" encuentra a "Juan Pérez" (sin distinguir mayúsculas ni acentos)
+mientras se va tipeando. El índice guarda prefijos de 2 y 3 caracteres, por
+lo que la consulta no recorre la tabla aunque haya cientos de miles de
+clientes.
+
+Si el índice no existe (SQLite sin FTS5 u otro motor) se cae a un LIKE sobre
+las mismas columnas, con el mismo formato de respuesta.
+"""
+import re
+
+from sqlalchemy import select, or_, cast, String, text
+from sqlalchemy.exc import OperationalError
+
+from database.mapeoCanchas import ReadSessionLocal, Cliente, Usuario
+
+# Palabras de la consulta que se tienen en cuenta
+MAX_TERMINOS = 8
+
+_COLUMNAS = (
+    Cliente.idCliente, Cliente.idTipoDoc, Cliente.numeroDoc, Cliente.nombre, Cliente.apellido,
+    Cliente.mail, Cliente.telefono, Cliente.idUsuario, Usuario.usuario,
+)
+_CLAVES = ('idCliente', 'idTipoDoc', 'numeroDoc', 'nombre', 'apellido', 'mail', 'telefono', 'idUsuario', 'usuario')
+
+
+def terminos(q: str) -> list:
+    """Palabras de la consulta (letras y dígitos), en minúsculas"""
+    return re.findall(r'\w+', (q or '').lower())[:MAX_TERMINOS]
+
+
+def expresion_fts(q: str):
+    """'jua per' -> '"jua"* "per"*' (cada término entre comillas: no se interpreta sintaxis FTS)"""
+    partes = terminos(q)
+    if not partes:
+        return None
+    return ' '.join(f'"{t}"*' for t in partes)
+
+
+def _consulta_fts(expresion):
+    # Orden por rowid (= idCliente): es el orden natural del índice, así el
+    # LIMIT corta apenas junta una página. Ordenar por relevancia (rank) obliga
+    # a puntuar todas las coincidencias, y un prefijo corto como "ju" coincide
+    # con decenas de miles de clientes.
+    coincidencias = (
+        text('SELECT rowid AS "idCliente" FROM "ClienteFTS" WHERE "ClienteFTS" MATCH :q')
+        .bindparams(q=expresion)
+        .columns(idCliente=Cliente.idCliente.type)
+        .subquery('coincidencias')
+    )
+    return (
+        select(*_COLUMNAS)
+        .select_from(coincidencias)
+        .join(Cliente, Cliente.idCliente == coincidencias.c.idCliente)
+        .outerjoin(Usuario, Usuario.idUsuario == Cliente.idUsuario)
+        .order_by(coincidencias.c.idCliente)
+    )
+
+
+def _consulta_like(q):
+    stmt = select(*_COLUMNAS).outerjoin(Usuario, Usuario.idUsuario == Cliente.idUsuario)
+    for termino in terminos(q):
+        patron = f'%{termino}%'
+        stmt = stmt.where(or_(
+            Cliente.nombre.ilike(patron), Cliente.apellido.ilike(patron), Cliente.mail.ilike(patron),
+            cast(Cliente.numeroDoc, String).like(patron), cast(Cliente.telefono, String).like(patron),
+            Usuario.usuario.ilike(patron),
+        ))
+    return stmt.order_by(Cliente.idCliente)
+
+
+def buscar_clientes(q: str, limit: int = 20, offset: int = 0) -> dict:
+    """
+    Página de clientes que coinciden con `q`, en orden de alta.
+    Devuelve {'resultados': [...], 'limit', 'offset', 'hayMas'}.
+    """
+    expresion = expresion_fts(q)
+    if expresion is None:
+        return {'resultados': [], 'limit': limit, 'offset': offset, 'hayMas': False}
+
+    session = ReadSessionLocal()
+    try:
+        try:
+            # Se pide una fila de más para saber si hay otra página sin contar todo
+            filas = session.execute(_consulta_fts(expresion).limit(limit + 1).offset(offset)).all()
+        except OperationalError:
+            # Sin índice FTS5 (no such table / no such module)
+            session.rollback()
+            filas = session.execute(_consulta_like(q).limit(limit + 1).offset(offset)).all()
+        hay_mas = len(filas) > limit
+        return {
+            'resultados': [dict(zip(_CLAVES, fila)) for fila in filas[:limit]],
+            'limit': limit,
+            'offset': offset,
+            'hayMas': hay_mas,
+        }
+    finally:
+        session.close()
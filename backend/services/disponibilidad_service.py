@@ -0,0 +1,202 @@
+"""
+Servicio de Disponibilidad - Consultas de lectura de turnos y calendario
+
+Cada consulta se arma como una sentencia `select()` y su resultado se
+convierte a JSON con una función aparte, así la misma lógica la usan los
+endpoints Flask (sesión síncrona) y el modo async de asgi.py (AsyncSession
+sobre aiosqlite) sin duplicar reglas ni cambiar los contratos.
+
+    stmt = consulta_calendario(start, end)
+    filas = session.execute(stmt).all()              # Flask
+    filas = (await session.execute(stmt)).all()      # ASGI
+    return armar_calendario(filas)
+"""
+from datetime import datetime
+
+from sqlalchemy import select, exists
+
+from database.mapeoCanchas import (
+    ReadSessionLocal, Reserva, DetalleReserva, Horario, CanchaxServicio, Cancha, Deporte, Cliente
+)
+
+
+def fecha_param(valor):
+    """Fecha de un query param ISO ('2025-05-01' o con hora); None si falta o no se entiende"""
+    if not valor:
+        return None
+    try:
+        return datetime.fromisoformat(valor).date()
+    except Exception:
+        return None
+
+
+def _texto_hora(valor):
+    return valor.isoformat() if hasattr(valor, 'isoformat') else str(valor)
+
+
+# ---------------- Eventos ocupados de una cancha ----------------
+
+def consulta_reservas_cancha(idCancha: int, start=None, end=None, idCancha_q=None):
+    stmt = (
+        select(DetalleReserva.idDetalle, DetalleReserva.idHorario, DetalleReserva.idCxS,
+               Reserva.idReserva, Reserva.fechaReservada)
+        .join(Reserva, DetalleReserva.idReserva == Reserva.idReserva)
+        .join(CanchaxServicio, DetalleReserva.idCxS == CanchaxServicio.idCxS)
+        .where(CanchaxServicio.idCancha == idCancha)
+    )
+    desde, hasta = fecha_param(start), fecha_param(end)
+    if desde is not None:
+        stmt = stmt.where(Reserva.fechaReservada >= desde)
+    if hasta is not None:
+        stmt = stmt.where(Reserva.fechaReservada <= hasta)
+    if idCancha_q:
+        # Compatibilidad: el endpoint siempre aceptó ?idCancha= y sólo
+        # devolvía filas si esa cancha existe
+        try:
+            stmt = stmt.where(exists().where(Cancha.idCancha == int(idCancha_q)))
+        except (TypeError, ValueError):
+            pass
+    return stmt
+
+
+def armar_reservas_cancha(filas) -> list:
+    return [
+        {
+            'idDetalle': id_detalle,
+            'idReserva': id_reserva,
+            'idHorario': id_horario,
+            'fechaReservada': fecha.isoformat(),
+            'idCxS': id_cxs,
+        }
+        for id_detalle, id_horario, id_cxs, id_reserva, fecha in filas
+    ]
+
+
+# ---------------- Horarios ----------------
+
+def consulta_horarios():
+    return select(Horario.idHorario, Horario.horaInicio, Horario.horaFin).order_by(Horario.horaInicio)
+
+
+def armar_horarios(filas) -> list:
+    return [
+        {'idHorario': id_horario, 'horaInicio': _texto_hora(inicio), 'horaFin': _texto_hora(fin)}
+        for id_horario, inicio, fin in filas
+    ]
+
+
+def consulta_horarios_libres(idCancha: int, fechaReservada):
+    """Horarios sin reserva para la cancha y fecha (un NOT EXISTS en lugar de dos consultas)"""
+    ocupado = (
+        select(DetalleReserva.idDetalle)
+        .join(Reserva, Reserva.idReserva == DetalleReserva.idReserva)
+        .join(CanchaxServicio, CanchaxServicio.idCxS == DetalleReserva.idCxS)
+        .where(
+            DetalleReserva.idHorario == Horario.idHorario,
+            CanchaxServicio.idCancha == idCancha,
+            Reserva.fechaReservada == fechaReservada,
+        )
+    )
+    return (
+        select(Horario.idHorario, Horario.horaInicio, Horario.horaFin)
+        .where(~ocupado.exists())
+        .order_by(Horario.horaInicio)
+    )
+
+
+# ---------------- Calendario de gerencia ----------------
+
+def consulta_calendario(start=None, end=None):
+    """
+    Una sola consulta para todo el rango: reserva + detalles con horario,
+    cancha, deporte y cliente (antes eran 1 + 2 consultas por reserva)
+    """
+    stmt = (
+        select(
+            Reserva.idReserva, Reserva.fechaReservada, Reserva.idCliente,
+            Horario.horaInicio, Horario.horaFin,
+            Cancha.idCancha, Cancha.nombre, Cancha.deporte, Deporte.nombre,
+            Cliente.idCliente, Cliente.nombre, Cliente.apellido,
+        )
+        .select_from(Reserva)
+        .join(DetalleReserva, DetalleReserva.idReserva == Reserva.idReserva)
+        .join(CanchaxServicio, DetalleReserva.idCxS == CanchaxServicio.idCxS)
+        .join(Cancha, CanchaxServicio.idCancha == Cancha.idCancha)
+        .outerjoin(Horario, DetalleReserva.idHorario == Horario.idHorario)
+        .outerjoin(Deporte, Deporte.idDeporte == Cancha.deporte)
+        .outerjoin(Cliente, Cliente.idCliente == Reserva.idCliente)
+        .order_by(Reserva.idReserva, DetalleReserva.idDetalle)
+    )
+    desde, hasta = fecha_param(start), fecha_param(end)
+    if desde is not None:
+        stmt = stmt.where(Reserva.fechaReservada >= desde)
+    if hasta is not None:
+        stmt = stmt.where(Reserva.fechaReservada <= hasta)
+    return stmt
+
+
+def armar_calendario(filas) -> list:
+    """Agrupa las filas por reserva; la cancha y el deporte son los del primer detalle"""
+    out = []
+    actual = None
+    inicios, fines = [], []
+
+    def _cerrar():
+        actual['horaInicio'] = min(inicios) if inicios else None
+        actual['horaFin'] = max(fines) if fines else None
+
+    for (id_reserva, fecha, id_cliente, hora_inicio, hora_fin, id_cancha, nombre_cancha,
+         id_deporte, nombre_deporte, cliente_id, cliente_nombre, cliente_apellido) in filas:
+        if actual is None or actual['idReserva'] != id_reserva:
+            if actual is not None:
+                _cerrar()
+            inicios, fines = [], []
+            actual = {
+                'idReserva': id_reserva,
+                'fechaReservada': _texto_hora(fecha),
+                'idCancha': id_cancha,
+                'nombreCancha': nombre_cancha,
+                'idDeporte': id_deporte,
+                'nombreDeporte': nombre_deporte,
+                'horaInicio': None,
+                'horaFin': None,
+                'cantidadDetalles': 0,
+                'idCliente': id_cliente,
+                'clienteNombre': f"{cliente_nombre} {cliente_apellido}".strip() if cliente_id is not None else None,
+            }
+            out.append(actual)
+        actual['cantidadDetalles'] += 1
+        if hora_inicio:
+            inicios.append(hora_inicio)
+        if hora_fin:
+            fines.append(hora_fin)
+    if actual is not None:
+        _cerrar()
+    return out
+
+
+# ---------------- Versiones síncronas (Flask) ----------------
+
+def _ejecutar(stmt, armar):
+    # Lecturas puras: pool de sólo lectura (nunca esperan al lock de una reserva)
+    session = ReadSessionLocal()
+    try:
+        return armar(session.execute(stmt).all())
+    finally:
+        session.close()
+
+
+def reservas_de_cancha(idCancha: int, start=None, end=None, idCancha_q=None) -> list:
+    return _ejecutar(consulta_reservas_cancha(idCancha, start, end, idCancha_q), armar_reservas_cancha)
+
+
+def listar_horarios() -> list:
+    return _ejecutar(consulta_horarios(), armar_horarios)
+
+
+def horarios_libres(idCancha: int, fechaReservada) -> list:
+    return _ejecutar(consulta_horarios_libres(idCancha, fechaReservada), armar_horarios)
+
+
+def calendario(start=None, end=None) -> list:
+    return _ejecutar(consulta_calendario(start, end), armar_calendario)
@@ -0,0 +1,251 @@
+"""
+Servicio de Eventos de disponibilidad (pub/sub para el stream SSE)
+
+Cuando una reserva ocupa, libera o cancela turnos, el handler registra un
+evento compacto en la tabla EventoDisponibilidad (migración 7) dentro de la
+misma transacción: si la reserva no se confirma, el evento tampoco existe.
+
+    {"id": 812, "tipo": "ocupado", "idCancha": 3, "fecha": "2025-05-02", "horarios": [4, 5], "idReserva": 1290}
+
+Tipos:
+    ocupado     reserva nueva: los horarios quedan tomados
+    liberado    reserva borrada o movida: los horarios vuelven a estar libres
+    cancelado   la reserva pasó a Cancelada (sus turnos siguen contando como
+                ocupados para crear reservas, pero el calendario cambia)
+
+En cada proceso, `canal` mantiene los suscriptores (una cola por conexión
+SSE) y un solo hilo que lee los eventos nuevos cada SSE_INTERVALO_MS y los
+reparte. asgi.py sirve el mismo stream con un canal async (una tarea del
+event loop en lugar de un hilo por conexión) usando `consulta_eventos`,
+`fila_a_evento` y `mensaje_sse`. Así un evento registrado en cualquier worker de gunicorn llega a
+los clientes de todos, y el id del evento (autoincremental en la base) sirve
+como Last-Event-ID para retomar después de una reconexión.
+"""
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, text
+
+from database.mapeoCanchas import ReadSessionLocal, Reserva, DetalleReserva, CanchaxServicio
+from json_provider import dumps_bytes
+
+logger = logging.getLogger(__name__)
+
+OCUPADO = 'ocupado'
+LIBERADO = 'liberado'
+CANCELADO = 'cancelado'
+
+
+def _max_suscriptores() -> int:
+    """
+    Conexiones SSE que acepta el proceso. Cada una ocupa un hilo del worker
+    mientras dura, así que con gunicorn (GUNICORN_THREADS, o DB_POOL_SIZE que
+    gunicorn.conf.py iguala a los hilos) se limita a la mitad de los hilos y
+    siempre queda al menos uno libre para las reservas y el resto de la API.
+    Sin gunicorn (servidor de desarrollo, un hilo por request) el tope es 16.
+    """
+    hilos = int(os.getenv('GUNICORN_THREADS') or os.getenv('DB_POOL_SIZE') or 0)
+    pedido = os.getenv('SSE_MAX_CONEXIONES')
+    if hilos <= 0:
+        return int(pedido) if pedido else 16
+    tope = int(pedido) if pedido else hilos // 2
+    return max(0, min(tope, hilos - 1))
+
+
+INTERVALO_SEGUNDOS = int(os.getenv('SSE_INTERVALO_MS', '500')) / 1000
+MAX_SUSCRIPTORES = _max_suscriptores()
+# Días que se conservan los eventos (para retomar con Last-Event-ID)
+RETENCION_DIAS = int(os.getenv('SSE_RETENCION_DIAS', '2'))
+# Máximo de eventos pendientes que se reenvían al retomar
+MAX_PENDIENTES = 1000
+
+_tabla_existe = None
+
+
+def _hay_tabla(session) -> bool:
+    global _tabla_existe
+    if _tabla_existe is None:
+        try:
+            _tabla_existe = bool(session.connection().exec_driver_sql(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'EventoDisponibilidad'"
+            ).first())
+        except Exception:
+            _tabla_existe = False
+    return _tabla_existe
+
+
+# ---------------- Registro (dentro de la transacción de la reserva) ----------------
+
+def turnos_de_reserva(session, idReserva: int):
+    """(fecha, {idCancha: [idHorario, ...]}) de la reserva; (None, {}) si no existe"""
+    fecha = session.execute(select(Reserva.fechaReservada).where(Reserva.idReserva == idReserva)).scalar()
+    filas = session.execute(
+        select(CanchaxServicio.idCancha, DetalleReserva.idHorario)
+        .join(CanchaxServicio, DetalleReserva.idCxS == CanchaxServicio.idCxS)
+        .where(DetalleReserva.idReserva == idReserva)
+        .distinct()
+    ).all()
+    por_cancha = {}
+    for id_cancha, id_horario in filas:
+        if id_horario is not None:
+            por_cancha.setdefault(id_cancha, set()).add(id_horario)
+    return fecha, {c: sorted(h) for c, h in por_cancha.items()}
+
+
+def registrar(session, tipo: str, idReserva: int, turnos=None):
+    """
+    Agrega a la sesión el evento de la reserva (uno por cancha); lo confirma
+    el commit del handler. `turnos` se pasa cuando ya no se pueden leer de la
+    base (p. ej. antes de borrar los detalles); si no, se leen ahora.
+    """
+    if not _hay_tabla(session):
+        return
+    fecha, por_cancha = turnos if turnos is not None else turnos_de_reserva(session, idReserva)
+    if fecha is None:
+        return
+    ahora = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    filas = [
+        {'tipo': tipo, 'idCancha': id_cancha, 'fecha': fecha.isoformat(), 'idReserva': idReserva,
+         'horarios': json.dumps(horarios), 'creado': ahora}
+        for id_cancha, horarios in por_cancha.items()
+    ]
+    if not filas:
+        return
+    session.execute(
+        text('INSERT INTO "EventoDisponibilidad" (tipo, idCancha, fecha, idReserva, horarios, creado) '
+             'VALUES (:tipo, :idCancha, :fecha, :idReserva, :horarios, :creado)'),
+        filas,
+    )
+    # Poda ocasional de eventos viejos (aprovecha que ya tenemos el lock de escritura)
+    if idReserva % 200 == 0:
+        limite = (datetime.now() - timedelta(days=RETENCION_DIAS)).strftime('%Y-%m-%d %H:%M:%S')
+        session.execute(text('DELETE FROM "EventoDisponibilidad" WHERE creado < :limite'), {'limite': limite})
+
+
+# ---------------- Lectura ----------------
+
+def fila_a_evento(fila) -> dict:
+    id_evento, tipo, id_cancha, fecha, id_reserva, horarios = fila
+    return {
+        'id': id_evento,
+        'tipo': tipo,
+        'idCancha': id_cancha,
+        'fecha': fecha,
+        'idReserva': id_reserva,
+        'horarios': json.loads(horarios) if horarios else [],
+    }
+
+
+def consulta_eventos(ultimo_id: int, idCancha=None, limite: int = MAX_PENDIENTES):
+    """SELECT de los eventos con id mayor a `ultimo_id` (opcionalmente de una cancha), en orden"""
+    sql = ('SELECT idEvento, tipo, idCancha, fecha, idReserva, horarios FROM "EventoDisponibilidad" '
+           'WHERE idEvento > :ultimo')
+    params = {'ultimo': ultimo_id, 'limite': limite}
+    if idCancha is not None:
+        sql += ' AND idCancha = :idCancha'
+        params['idCancha'] = idCancha
+    sql += ' ORDER BY idEvento LIMIT :limite'
+    return text(sql).bindparams(**params)
+
+
+CONSULTA_ULTIMO_EVENTO = text('SELECT MAX(idEvento) FROM "EventoDisponibilidad"')
+
+
+def mensaje_sse(evento: dict) -> bytes:
+    """Evento en el formato de text/event-stream (el id sirve de Last-Event-ID)"""
+    return b'id: %d\nevent: %s\ndata: %s\n\n' % (evento['id'], evento['tipo'].encode(), dumps_bytes(evento))
+
+
+def eventos_desde(ultimo_id: int, idCancha=None, limite: int = MAX_PENDIENTES) -> list:
+    """Eventos con id mayor a `ultimo_id` (opcionalmente de una cancha), en orden"""
+    session = ReadSessionLocal()
+    try:
+        if not _hay_tabla(session):
+            return []
+        return [fila_a_evento(f) for f in session.execute(consulta_eventos(ultimo_id, idCancha, limite))]
+    finally:
+        session.close()
+
+
+def ultimo_evento() -> int:
+    session = ReadSessionLocal()
+    try:
+        if not _hay_tabla(session):
+            return 0
+        return session.execute(CONSULTA_ULTIMO_EVENTO).scalar() or 0
+    finally:
+        session.close()
+
+
+# ---------------- Pub/sub del proceso ----------------
+
+class CanalEventos:
+    """Suscriptores del proceso y el hilo que les reparte los eventos nuevos"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._suscriptores = {}
+        self._hilo = None
+        self._ultimo = 0
+
+    def suscribir(self, idCancha=None):
+        """Cola donde llegan los eventos (de la cancha, o todos); None si no hay lugar"""
+        with self._lock:
+            if len(self._suscriptores) >= MAX_SUSCRIPTORES:
+                return None
+            if self._hilo is None:
+                # Se fija el punto de partida antes de devolver la cola: lo que
+                # el cliente pida con Last-Event-ID llega por lo menos hasta acá
+                self._ultimo = ultimo_evento()
+                self._hilo = threading.Thread(target=self._seguir, name='eventos-disponibilidad', daemon=True)
+                self._hilo.start()
+            cola = queue.SimpleQueue()
+            self._suscriptores[cola] = idCancha
+            return cola
+
+    def desuscribir(self, cola):
+        with self._lock:
+            self._suscriptores.pop(cola, None)
+
+    def cantidad(self) -> int:
+        return len(self._suscriptores)
+
+    def _seguir(self):
+        while True:
+            time.sleep(INTERVALO_SEGUNDOS)
+            with self._lock:
+                if not self._suscriptores:
+                    # Sin clientes no se consulta nada; el próximo suscriptor lo reinicia
+                    self._hilo = None
+                    return
+            try:
+                nuevos = eventos_desde(self._ultimo)
+            except Exception:
+                logger.exception('Error leyendo eventos de disponibilidad')
+                continue
+            if not nuevos:
+                continue
+            self._ultimo = nuevos[-1]['id']
+            with self._lock:
+                suscriptores = list(self._suscriptores.items())
+            for evento in nuevos:
+                for cola, id_cancha in suscriptores:
+                    if id_cancha is None or id_cancha == evento['idCancha']:
+                        cola.put(evento)
+
+    def reiniciar(self):
+        # Tras un fork el hilo no existe en el hijo
+        self._lock = threading.Lock()
+        self._suscriptores = {}
+        self._hilo = None
+
+
+canal = CanalEventos()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=canal.reiniciar)
@@ -0,0 +1,335 @@
+"""
+Servicio de Exportación - Genera los informes en CSV/XLSX fila por fila
+
+Cada informe se define como una consulta (o un iterable pequeño) y se recorre
+con un cursor del lado del servidor (`yield_per`), de modo que la memoria usada
+no depende de la cantidad de filas exportadas. Si el periodo llega a reservas
+archivadas, las consultas leen caliente + archivo (services/archivo_service.py).
+"""
+import csv
+import zipfile
+import zlib
+from datetime import date, datetime
+
+from sqlalchemy import select, func
+
+from database.mapeoCanchas import (
+    ReadSessionLocal, CanchaxServicio, Cancha,
+    Horario, Servicio, Cliente, TipoDocumento, Deporte
+)
+from services.archivo_service import tablas_reservas
+
+# Cantidad de filas que se traen del cursor en cada lote
+FILAS_POR_LOTE = 1000
+# Tamaño aproximado (bytes) de cada bloque enviado al cliente
+TAMANO_BLOQUE = 64 * 1024
+
+
+def escape(texto):
+    # Lo mismo que xml.sax.saxutils.escape; importar saxutils arrastra urllib.request al arranque
+    return texto.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+
+# ---------------- Definición de informes ----------------
+
+def _validar_periodo(fechaDesde, fechaHasta):
+    if fechaDesde is not None and fechaHasta is not None and fechaDesde > fechaHasta:
+        raise ValueError("fechaDesde no puede ser posterior a fechaHasta")
+
+
+def _filtrar_periodo(stmt, Reserva, fechaDesde, fechaHasta):
+    if fechaDesde is not None:
+        stmt = stmt.where(Reserva.fechaReservada >= fechaDesde)
+    if fechaHasta is not None:
+        stmt = stmt.where(Reserva.fechaReservada <= fechaHasta)
+    return stmt
+
+
+def _informe_reservas_por_cliente(params):
+    _validar_periodo(params.get('fechaDesde'), params.get('fechaHasta'))
+    Reserva = tablas_reservas(params.get('fechaDesde')).Reserva
+    columnas = ['idCliente', 'nombre', 'apellido', 'mail', 'idReserva',
+                'fechaReservada', 'estado', 'monto', 'fechaCreacion']
+    stmt = (
+        select(
+            Reserva.idCliente, Cliente.nombre, Cliente.apellido, Cliente.mail,
+            Reserva.idReserva, Reserva.fechaReservada, Reserva.estado,
+            Reserva.monto, Reserva.fechaCreacion,
+        )
+        .outerjoin(Cliente, Cliente.idCliente == Reserva.idCliente)
+        .order_by(Reserva.idCliente, Reserva.fechaReservada, Reserva.fechaCreacion)
+    )
+    if params.get('idCliente') is not None:
+        stmt = stmt.where(Reserva.idCliente == params['idCliente'])
+    stmt = _filtrar_periodo(stmt, Reserva, params.get('fechaDesde'), params.get('fechaHasta'))
+    return columnas, stmt
+
+
+def _stmt_detalles(Reserva, DetalleReserva):
+    """Una fila por DetalleReserva con los datos de reserva, cliente, cancha, horario y servicio."""
+    return (
+        select(
+            Reserva.idReserva, Reserva.fechaReservada, Reserva.estado, Reserva.monto,
+            Reserva.idCliente, Cliente.nombre, Cliente.apellido,
+            TipoDocumento.nombre, Cliente.numeroDoc,
+            Cancha.idCancha, Cancha.nombre,
+            DetalleReserva.idDetalle, DetalleReserva.idHorario,
+            Horario.horaInicio, Horario.horaFin,
+            DetalleReserva.idCxS, Servicio.descripcion, CanchaxServicio.precioAdicional,
+        )
+        .select_from(DetalleReserva)
+        .join(Reserva, Reserva.idReserva == DetalleReserva.idReserva)
+        .join(CanchaxServicio, CanchaxServicio.idCxS == DetalleReserva.idCxS)
+        .join(Cancha, Cancha.idCancha == CanchaxServicio.idCancha)
+        .outerjoin(Horario, Horario.idHorario == DetalleReserva.idHorario)
+        .outerjoin(Servicio, Servicio.idServicio == CanchaxServicio.idServicio)
+        .outerjoin(Cliente, Cliente.idCliente == Reserva.idCliente)
+        .outerjoin(TipoDocumento, TipoDocumento.idTipoDoc == Cliente.idTipoDoc)
+        .order_by(Reserva.fechaReservada, Reserva.idReserva, DetalleReserva.idDetalle)
+    )
+
+
+COLUMNAS_DETALLES = [
+    'idReserva', 'fechaReservada', 'estado', 'monto',
+    'idCliente', 'clienteNombre', 'clienteApellido', 'tipoDocumento', 'numeroDoc',
+    'idCancha', 'nombreCancha', 'idDetalle', 'idHorario', 'horaInicio', 'horaFin',
+    'idCxS', 'servicio', 'precioAdicional',
+]
+
+
+def _informe_reservas_por_cancha(params):
+    if params.get('idCancha') is None:
+        raise ValueError('idCancha es requerido')
+    _validar_periodo(params.get('fechaDesde'), params.get('fechaHasta'))
+    Reserva, DetalleReserva, _ = tablas_reservas(params.get('fechaDesde'))
+    stmt = _stmt_detalles(Reserva, DetalleReserva).where(CanchaxServicio.idCancha == params['idCancha'])
+    stmt = _filtrar_periodo(stmt, Reserva, params.get('fechaDesde'), params.get('fechaHasta'))
+    return COLUMNAS_DETALLES, stmt
+
+
+def _informe_detalle_reservas(params):
+    _validar_periodo(params.get('fechaDesde'), params.get('fechaHasta'))
+    Reserva, DetalleReserva, _ = tablas_reservas(params.get('fechaDesde'))
+    stmt = _stmt_detalles(Reserva, DetalleReserva)
+    if params.get('idCliente') is not None:
+        stmt = stmt.where(Reserva.idCliente == params['idCliente'])
+    stmt = _filtrar_periodo(stmt, Reserva, params.get('fechaDesde'), params.get('fechaHasta'))
+    return COLUMNAS_DETALLES, stmt
+
+
+def _informe_canchas_mas_usadas(params):
+    _validar_periodo(params.get('fechaDesde'), params.get('fechaHasta'))
+    Reserva, DetalleReserva, _ = tablas_reservas(params.get('fechaDesde'))
+    # Conteo de reservas distintas por cancha dentro del periodo (join en la condición
+    # para conservar las canchas sin reservas)
+    condicion = Reserva.idReserva == DetalleReserva.idReserva
+    if params.get('fechaDesde') is not None:
+        condicion = condicion & (Reserva.fechaReservada >= params['fechaDesde'])
+    if params.get('fechaHasta') is not None:
+        condicion = condicion & (Reserva.fechaReservada <= params['fechaHasta'])
+    conteo = func.count(func.distinct(Reserva.idReserva))
+    columnas = ['idCancha', 'nombre', 'deporte', 'conteo_reservas', 'precioHora']
+    stmt = (
+        select(Cancha.idCancha, Cancha.nombre, Deporte.nombre, conteo, Cancha.precioHora)
+        .outerjoin(Deporte, Deporte.idDeporte == Cancha.deporte)
+        .outerjoin(CanchaxServicio, CanchaxServicio.idCancha == Cancha.idCancha)
+        .outerjoin(DetalleReserva, DetalleReserva.idCxS == CanchaxServicio.idCxS)
+        .outerjoin(Reserva, condicion)
+        .group_by(Cancha.idCancha)
+        .order_by(conteo.desc(), Cancha.idCancha)
+    )
+    return columnas, stmt
+
+
+def _informe_cancha_mas_usada(params):
+    from basicas import cancha_mas_usada
+    top = cancha_mas_usada()
+    filas = [(top.get('idCancha'), top.get('nombre'), top.get('conteo_reservas'))] if top else []
+    return ['idCancha', 'nombre', 'conteo_reservas'], filas
+
+
+def _informe_utilizacion_mensual(params):
+    from basicas import utilizacion_mensual
+    meses = utilizacion_mensual(year=params.get('year'), idCancha=params.get('idCancha'))
+    return ['month', 'count'], [(m['month'], m['count']) for m in meses]
+
+
+INFORMES = {
+    'reservas-por-cliente': _informe_reservas_por_cliente,
+    'reporte-reservas-cliente': _informe_reservas_por_cliente,
+    'reservas-por-cancha': _informe_reservas_por_cancha,
+    'reporte-reservas-cancha': _informe_reservas_por_cancha,
+    'detalle-reservas': _informe_detalle_reservas,
+    'canchas-mas-usadas': _informe_canchas_mas_usadas,
+    'reporte-canchas-mas-usadas': _informe_canchas_mas_usadas,
+    'cancha-mas-usada': _informe_cancha_mas_usada,
+    'utilizacion-mensual': _informe_utilizacion_mensual,
+}
+
+
+def obtener_informe(nombre: str):
+    """Devuelve el builder del informe; lanza KeyError si el informe no existe.
+
+    `builder(params)` devuelve (columnas, fuente) donde `fuente` es un Select
+    (se recorre con cursor) o un iterable ya calculado, y lanza ValueError si
+    los parámetros son inválidos.
+    """
+    return INFORMES[nombre]
+
+
+def iterar_filas(fuente, filas_por_lote: int = FILAS_POR_LOTE):
+    """Recorre la fuente fila por fila. Si es una consulta, abre su propia sesión
+    y la mantiene viva mientras dure el generador (se cierra en el `finally`,
+    también cuando el cliente corta la descarga)."""
+    if not hasattr(fuente, 'execution_options'):
+        for fila in fuente:
+            yield tuple(fila)
+        return
+    session = ReadSessionLocal()
+    try:
+        result = session.execute(fuente.execution_options(yield_per=filas_por_lote))
+        for fila in result:
+            yield tuple(fila)
+    finally:
+        session.close()
+
+
+# ---------------- Formatos ----------------
+
+def _texto(valor):
+    if valor is None:
+        return ''
+    if isinstance(valor, datetime):
+        return valor.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(valor, date):
+        return valor.strftime('%Y-%m-%d')
+    return valor
+
+
+class _Linea:
+    """Destino mínimo para csv.writer: guarda la última línea escrita."""
+
+    def __init__(self):
+        self.valor = ''
+
+    def write(self, texto):
+        self.valor = texto
+
+
+def generar_csv(columnas, filas):
+    """Genera el CSV en bloques de ~TAMANO_BLOQUE bytes (UTF-8 con BOM para Excel)."""
+    linea = _Linea()
+    writer = csv.writer(linea)
+    writer.writerow(columnas)
+    bloque = ['\ufeff' + linea.valor]
+    tamano = len(bloque[0])
+    for fila in filas:
+        writer.writerow([_texto(v) for v in fila])
+        bloque.append(linea.valor)
+        tamano += len(linea.valor)
+        if tamano >= TAMANO_BLOQUE:
+            yield ''.join(bloque).encode('utf-8')
+            bloque = []
+            tamano = 0
+    if bloque:
+        yield ''.join(bloque).encode('utf-8')
+
+
+class _Buffer:
+    """Archivo sólo-escritura sin `tell`/`seek`: zipfile escribe en modo streaming
+    (con data descriptors) y nosotros vaciamos lo acumulado después de cada bloque."""
+
+    def __init__(self):
+        self.partes = []
+
+    def write(self, data):
+        self.partes.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def vaciar(self) -> bytes:
+        data = b''.join(self.partes)
+        self.partes = []
+        return data
+
+
+_XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+_XLSX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+_XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{hoja}" sheetId="1" r:id="rId1"/></sheets></workbook>'
+)
+_XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+
+
+def _celda_xlsx(valor) -> str:
+    valor = _texto(valor)
+    if valor == '':
+        return '<c/>'
+    if isinstance(valor, bool):
+        return f'<c t="b"><v>{int(valor)}</v></c>'
+    if isinstance(valor, (int, float)):
+        return f'<c><v>{valor}</v></c>'
+    return f'<c t="inlineStr"><is><t>{escape(str(valor))}</t></is></c>'
+
+
+def generar_xlsx(columnas, filas, hoja: str = 'Informe'):
+    """Genera un XLSX mínimo (una hoja, strings inline) escribiendo el zip en streaming."""
+    buf = _Buffer()
+    with zipfile.ZipFile(buf, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr('[Content_Types].xml', _XLSX_CONTENT_TYPES)
+        zf.writestr('_rels/.rels', _XLSX_RELS)
+        zf.writestr('xl/workbook.xml', _XLSX_WORKBOOK.format(hoja=escape(hoja[:31])))
+        zf.writestr('xl/_rels/workbook.xml.rels', _XLSX_WORKBOOK_RELS)
+        with zf.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+            sheet.write(('<row>' + ''.join(_celda_xlsx(c) for c in columnas) + '</row>').encode('utf-8'))
+            pendiente = 0
+            for fila in filas:
+                xml = ('<row>' + ''.join(_celda_xlsx(v) for v in fila) + '</row>').encode('utf-8')
+                sheet.write(xml)
+                pendiente += len(xml)
+                if pendiente >= TAMANO_BLOQUE:
+                    pendiente = 0
+                    data = buf.vaciar()
+                    if data:
+                        yield data
+            sheet.write(b'</sheetData></worksheet>')
+    data = buf.vaciar()
+    if data:
+        yield data
+
+
+def comprimir_gzip(bloques):
+    """Comprime un generador de bytes con gzip sin acumularlo en memoria."""
+    compresor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for bloque in bloques:
+        data = compresor.compress(bloque)
+        if data:
+            yield data
+    yield compresor.flush()
@@ -0,0 +1,337 @@
+"""
+Servicio de Informes en segundo plano
+
+Los informes grandes (varios años de reservas) tardan más que el timeout del
+proxy si se calculan dentro del request. Con este servicio el request sólo
+encola el informe y devuelve un id; un pool de hilos del proceso lo calcula
+(con las sesiones en el pool de sólo lectura) y el cliente consulta el estado
+hasta que el resultado está listo:
+
+    POST /api/informes/jobs         {"informe": "reporte-reservas-cliente", "start": "2023-01-01"}
+    GET  /api/informes/jobs/<id>    {"estado": "terminado", "resultado": {...}}
+
+Estado y resultados se guardan como archivos JSON en INFORMES_JOBS_DIR, así
+cualquier worker de gunicorn responde por un job encolado en otro. Cada
+resultado se guarda con una clave (informe + parámetros + versión de datos):
+mientras la tabla VersionDatos (migración 6, la incrementan triggers al
+cambiar reservas, pagos, clientes, canchas o tipos de documento) no cambie, pedir el mismo
+informe devuelve el resultado guardado sin recalcular.
+
+Cada job guarda el proceso dueño (host y pid), cuándo empezó a calcularse
+(`inicio`) y un `latido` que un hilo del proceso renueva cada
+INFORMES_JOBS_LATIDO_SEG mientras el job está pendiente o en curso. Si ese
+worker termina antes de guardar el resultado (reciclado por
+GUNICORN_MAX_REQUESTS, recarga con HUP, timeout o caída), al consultar el
+estado el job pasa a `error` y el cliente puede volver a encolarlo. En la
+misma máquina se mira si el pid sigue vivo (un job de un proceso vivo nunca
+se da por perdido, tarde lo que tarde); desde otra máquina, si el latido
+tiene más de INFORMES_JOBS_TIMEOUT_MIN.
+
+Variables de entorno:
+    INFORMES_JOBS_DIR         carpeta de estados y resultados (backend/informes_jobs)
+    INFORMES_JOBS_WORKERS     hilos por proceso que calculan informes (2)
+    INFORMES_JOBS_TTL_HORAS   horas que se conservan jobs y resultados (24)
+    INFORMES_JOBS_LATIDO_SEG  cada cuántos segundos se renueva el latido de los jobs propios (30)
+    INFORMES_JOBS_TIMEOUT_MIN minutos sin latido tras los que otra máquina da el job por perdido (5)
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+from database.mapeoCanchas import ReadSessionLocal
+from backend.database import sesiones_de_lectura
+from json_provider import dumps_bytes
+
+logger = logging.getLogger(__name__)
+
+JOBS_DIR = Path(os.getenv('INFORMES_JOBS_DIR', Path(__file__).resolve().parent.parent / 'informes_jobs'))
+JOBS_WORKERS = int(os.getenv('INFORMES_JOBS_WORKERS', '2'))
+JOBS_TTL_SEGUNDOS = float(os.getenv('INFORMES_JOBS_TTL_HORAS', '24')) * 3600
+JOBS_LATIDO_SEGUNDOS = float(os.getenv('INFORMES_JOBS_LATIDO_SEG', '30'))
+JOBS_TIMEOUT_SEGUNDOS = float(os.getenv('INFORMES_JOBS_TIMEOUT_MIN', '5')) * 60
+
+PENDIENTE = 'pendiente'
+EN_CURSO = 'en_curso'
+TERMINADO = 'terminado'
+ERROR = 'error'
+
+_ID_VALIDO = re.compile(r'^[0-9a-f]{32}$')
+_HOST = socket.gethostname()
+
+_lock = threading.Lock()
+_executor = None
+# clave de resultado -> id del job que la está calculando en este proceso
+_en_curso = {}
+# id -> job (pendiente o en curso) de este proceso, al que se le renueva el latido
+_propios = {}
+_hilo_latidos = None
+_ultima_limpieza = 0.0
+
+
+def _reiniciar_tras_fork():
+    # Los hilos del pool no sobreviven al fork: cada worker crea el suyo
+    global _executor, _lock, _hilo_latidos
+    _executor = None
+    _lock = threading.Lock()
+    _hilo_latidos = None
+    _en_curso.clear()
+    _propios.clear()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reiniciar_tras_fork)
+
+
+def _pool():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=JOBS_WORKERS, thread_name_prefix='informes')
+        return _executor
+
+
+# ---------------- Archivos ----------------
+
+def _ruta_job(job_id):
+    return JOBS_DIR / 'jobs' / f'{job_id}.json'
+
+
+def _ruta_resultado(clave):
+    return JOBS_DIR / 'resultados' / f'{clave}.json'
+
+
+def _escribir(ruta: Path, contenido: bytes):
+    """Escritura atómica: quien lee ve el archivo anterior o el nuevo, nunca uno a medias"""
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    temporal = ruta.with_name(f'.{ruta.name}.{uuid.uuid4().hex}')
+    temporal.write_bytes(contenido)
+    os.replace(temporal, ruta)
+
+
+def _guardar_job(job: dict):
+    _escribir(_ruta_job(job['id']), dumps_bytes(job))
+
+
+def _leer_json(ruta: Path):
+    try:
+        return json.loads(ruta.read_bytes())
+    except FileNotFoundError:
+        return None
+
+
+def _limpiar_vencidos():
+    """Borra jobs y resultados más viejos que el TTL (como mucho una vez cada 10 minutos)"""
+    global _ultima_limpieza
+    ahora = time.time()
+    if ahora - _ultima_limpieza < 600:
+        return
+    _ultima_limpieza = ahora
+    for carpeta in ('jobs', 'resultados'):
+        for ruta in (JOBS_DIR / carpeta).glob('*.json'):
+            try:
+                if ahora - ruta.stat().st_mtime > JOBS_TTL_SEGUNDOS:
+                    ruta.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def _proceso_vivo(pid) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        # Existe pero es de otro usuario (o no se puede saber): se asume vivo
+        return True
+    return True
+
+
+def _motivo_abandonado(job: dict):
+    """Por qué un job sin terminar ya no va a terminar, o None si sigue en curso"""
+    # El pid sólo se puede verificar desde la misma máquina (INFORMES_JOBS_DIR compartido)
+    if job.get('host') == _HOST and job.get('pid'):
+        if _proceso_vivo(job['pid']):
+            return None
+        return 'El proceso que calculaba el informe terminó; volver a encolarlo'
+    if time.time() - job.get('latido', 0) > JOBS_TIMEOUT_SEGUNDOS:
+        return 'El proceso que calculaba el informe dejó de responder; volver a encolarlo'
+    return None
+
+
+# ---------------- Latidos ----------------
+
+def _guardar_propio(job: dict) -> bool:
+    """
+    Guarda un job de este proceso (con el lock tomado). Si otra máquina ya lo
+    dio por perdido no se pisa ese estado: devuelve False.
+    """
+    guardado = _leer_json(_ruta_job(job['id']))
+    if guardado is not None and guardado['estado'] == ERROR and job['estado'] != ERROR:
+        return False
+    _guardar_job(job)
+    return True
+
+
+def _latidos():
+    """Renueva el latido de los jobs pendientes o en curso de este proceso"""
+    global _hilo_latidos
+    while True:
+        time.sleep(JOBS_LATIDO_SEGUNDOS)
+        with _lock:
+            if not _propios:
+                _hilo_latidos = None
+                return
+            for job in list(_propios.values()):
+                job['latido'] = time.time()
+                try:
+                    if not _guardar_propio(job):
+                        _propios.pop(job['id'], None)
+                except OSError:
+                    logger.exception('No se pudo renovar el latido del job %s', job['id'])
+
+
+def _registrar_propio(job: dict):
+    global _hilo_latidos
+    with _lock:
+        _propios[job['id']] = job
+        if _hilo_latidos is None:
+            _hilo_latidos = threading.Thread(target=_latidos, name='informes-latidos', daemon=True)
+            _hilo_latidos.start()
+
+
+# ---------------- Versión de datos ----------------
+
+def version_datos():
+    """Contador de cambios de la base (migración 6); None si no está disponible"""
+    session = ReadSessionLocal()
+    try:
+        return session.connection().exec_driver_sql('SELECT version FROM "VersionDatos" WHERE id = 1').scalar()
+    except (OperationalError, ProgrammingError):
+        return None
+    finally:
+        session.close()
+
+
+def clave_resultado(informe: str, params: dict, version) -> str:
+    """Clave del resultado guardado; sin versión de datos cada job calcula el suyo"""
+    if version is None:
+        version = f'sin-version-{uuid.uuid4().hex}'
+    base = json.dumps({'informe': informe, 'params': params, 'version': version}, sort_keys=True, default=str)
+    return hashlib.sha256(base.encode('utf-8')).hexdigest()
+
+
+# ---------------- API del servicio ----------------
+
+def encolar(informe: str, params: dict, calcular) -> dict:
+    """
+    Encola `calcular(params)` y devuelve el estado del job.
+
+    Si el mismo informe con los mismos parámetros ya está calculado para la
+    versión de datos actual, el job nace terminado con ese resultado; si se
+    está calculando en este proceso, se devuelve el job en curso.
+    """
+    _limpiar_vencidos()
+    clave = clave_resultado(informe, params, version_datos())
+
+    with _lock:
+        job_id = _en_curso.get(clave)
+    if job_id is not None:
+        job = obtener_estado(job_id, incluir_resultado=False)
+        if job is not None and job['estado'] in (PENDIENTE, EN_CURSO):
+            return job
+
+    ahora = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    job = {
+        'id': uuid.uuid4().hex,
+        'informe': informe,
+        'params': params,
+        'estado': PENDIENTE,
+        'creado': ahora,
+        'terminado': None,
+        'desdeCache': False,
+        'clave': clave,
+        'error': None,
+        # Proceso dueño del job, inicio del cálculo y última señal de vida (epoch)
+        'host': _HOST,
+        'pid': os.getpid(),
+        'inicio': None,
+        'latido': time.time(),
+    }
+    if _ruta_resultado(clave).exists():
+        job.update(estado=TERMINADO, terminado=ahora, desdeCache=True)
+        _guardar_job(job)
+        return job
+
+    _guardar_job(job)
+    with _lock:
+        _en_curso[clave] = job['id']
+    # Copia: el hilo actualiza su job mientras el request serializa el suyo
+    propio = dict(job)
+    _registrar_propio(propio)
+    _pool().submit(_ejecutar, propio, calcular)
+    return job
+
+
+def _ejecutar(job: dict, calcular):
+    inicio = time.perf_counter()
+    # El hilo de latidos guarda este mismo dict: los cambios de estado van con el lock
+    with _lock:
+        job.update(estado=EN_CURSO, inicio=time.time(), latido=time.time())
+        _guardar_propio(job)
+    estado, error = TERMINADO, None
+    try:
+        with sesiones_de_lectura():
+            resultado = calcular(job['params'])
+        _escribir(_ruta_resultado(job['clave']), dumps_bytes(resultado))
+        logger.info('Informe %s (job %s) calculado en %.0f ms',
+                    job['informe'], job['id'], (time.perf_counter() - inicio) * 1000)
+    except (LookupError, ValueError) as e:
+        # Parámetros que no corresponden a datos (p. ej. cancha inexistente)
+        logger.warning('Informe %s (job %s) sin resultado: %s', job['informe'], job['id'], e)
+        estado, error = ERROR, str(e)
+    except Exception as e:
+        logger.exception('Error calculando el informe %s (job %s)', job['informe'], job['id'])
+        estado, error = ERROR, str(e)
+    finally:
+        with _lock:
+            _propios.pop(job['id'], None)
+            job.update(estado=estado, error=error, terminado=datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+            if not _guardar_propio(job):
+                # Ya figura como perdido: el resultado queda guardado para el próximo pedido
+                logger.warning('Informe %s (job %s) terminó después de darse por perdido',
+                               job['informe'], job['id'])
+            _en_curso.pop(job['clave'], None)
+
+
+def obtener_estado(job_id: str, incluir_resultado: bool = True):
+    """Estado del job (con el resultado si terminó); None si no existe"""
+    if not _ID_VALIDO.match(job_id or ''):
+        return None
+    job = _leer_json(_ruta_job(job_id))
+    if job is None:
+        return None
+    if job['estado'] in (PENDIENTE, EN_CURSO):
+        motivo = _motivo_abandonado(job)
+        if motivo is not None:
+            logger.warning('Informe %s (job %s) abandonado: %s', job['informe'], job['id'], motivo)
+            job.update(estado=ERROR, error=motivo, terminado=datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+            _guardar_job(job)
+    if incluir_resultado and job['estado'] == TERMINADO:
+        resultado = _leer_json(_ruta_resultado(job['clave']))
+        if resultado is None:
+            # El resultado venció antes que el job
+            job.update(estado=ERROR, error='El resultado ya no está disponible; volver a encolar el informe')
+        else:
+            job['resultado'] = resultado
+    return job
@@ -1,52 +1,59 @@
 """
 Servicio de Pagos - Lógica de negocio para el manejo de pagos
 """
-from datetime import datetime
+from datetime import datetime, time, timedelta
+from sqlalchemy import func
 from database.mapeoCanchas import (
     SessionLocal, Pago, Reserva, DetalleReserva, 
-    CanchaxServicio, EstadoPago, MetodoPago, Cliente, Empleado
+    CanchaxServicio, EstadoPago, MetodoPago, Cliente, Empleado,
+    ESTADOS_PAGO, METODOS_PAGO
 )
 from basicas import _to_dict
+from services import precios_service
+from metricas import contar_cache
 import json
 
 
 def calcular_monto_reserva(idReserva: int, session=None) -> float:
     """
     Calcula el monto total de una reserva basado en:
-    - Precio base de la cancha por hora
-    - Servicios adicionales contratados
-    
-    Retorna el monto total a pagar
+    - Precio base de la cancha por turno reservado
+    - Servicios adicionales contratados (por turno o una sola vez)
+
+    Usa la misma tabla de precios que al crear la reserva, por lo que el
+    resultado coincide con lo cobrado. Retorna el monto total a pagar
     """
     should_close = session is None
     if session is None:
         session = SessionLocal()
-    
+
     try:
         reserva = session.get(Reserva, idReserva)
         if not reserva:
             raise ValueError(f"Reserva {idReserva} no encontrada")
-        
-        # El monto ya está calculado en la reserva
-        # Pero lo recalculamos para validar
-        monto_total = 0.0
-        
-        for detalle in reserva.detalles:
-            # Obtener el CanchaxServicio
-            cxs = session.get(CanchaxServicio, detalle.idCxS)
-            if cxs:
-                # El precio base de la cancha está en precioHora
-                from database.mapeoCanchas import Cancha
-                cancha = session.get(Cancha, cxs.idCancha)
-                if cancha:
-                    # Asumimos 1 hora por defecto, o calculamos según horario
-                    monto_total += cancha.precioHora
-                
-                # Agregar precio adicional del servicio
-                monto_total += cxs.precioAdicional
-        
-        return round(monto_total, 2)
-    
+
+        filas = (
+            session.query(DetalleReserva.idCxS, DetalleReserva.idHorario, CanchaxServicio.idCancha)
+            .join(CanchaxServicio, CanchaxServicio.idCxS == DetalleReserva.idCxS)
+            .filter(DetalleReserva.idReserva == idReserva)
+            .all()
+        )
+        if not filas:
+            return 0.0
+
+        tabla = precios_service.obtener_tabla(filas[0].idCancha, session=session)
+        if tabla is None:
+            return 0.0
+
+        turnos = {f.idHorario for f in filas if f.idCxS == tabla.idCxSBase}
+        extras = []
+        for f in filas:
+            if f.idCxS != tabla.idCxSBase and f.idCxS not in extras:
+                extras.append(f.idCxS)
+        num_turnos = len(turnos) or len({f.idHorario for f in filas})
+
+        return round(precios_service.monto_por_detalles(tabla, num_turnos, extras), 2)
+
     finally:
         if should_close:
             session.close()
@@ -101,10 +108,9 @@ def crear_pago(idReserva: int, idMetodoPago: int, monto: float,
         session.add(pago)
         
         # Actualizar estado de la reserva a "Confirmada"
-        from database.mapeoCanchas import EstadoReserva
-        estado_confirmada = session.query(EstadoReserva).filter_by(nombre='Confirmada').first()
-        if estado_confirmada:
-            reserva.estado = estado_confirmada.idEstado
+        id_confirmada = _id_estado_reserva(session, 'Confirmada')
+        if id_confirmada is not None:
+            reserva.estado = id_confirmada
         
         session.commit()
         session.refresh(pago)
@@ -167,44 +173,70 @@ def obtener_pago_por_reserva(idReserva: int):
         session.close()
 
 
-def listar_pagos_pendientes():
+# Cache por proceso de nombre -> idEstado de EstadoReserva
+_ESTADOS_RESERVA_CACHE = {}
+
+
+def _id_estado_reserva(session, nombre: str):
+    """Devuelve el id de EstadoReserva con ese nombre, cacheado por proceso.
+
+    Los estados son datos de catálogo que no cambian en tiempo de ejecución;
+    sólo se cachean los nombres encontrados.
     """
-    Lista todas las reservas CONFIRMADAS que no tienen pago asociado
+    if nombre in _ESTADOS_RESERVA_CACHE:
+        contar_cache('estados_reserva', True)
+        return _ESTADOS_RESERVA_CACHE[nombre]
+    contar_cache('estados_reserva', False)
+    from database.mapeoCanchas import EstadoReserva
+    estado = session.query(EstadoReserva).filter_by(nombre=nombre).first()
+    if not estado:
+        return None
+    _ESTADOS_RESERVA_CACHE[nombre] = estado.idEstado
+    return estado.idEstado
+
+
+def listar_pagos_pendientes(fechaDesde=None, fechaHasta=None, limit: int = None, offset: int = 0):
+    """
+    Lista las reservas CONFIRMADAS que no tienen pago asociado
+
+    Usa un único LEFT JOIN contra Pago (anti-join) y Cliente, con filtros
+    opcionales por fechaReservada y paginación limit/offset.
     """
     session = SessionLocal()
     try:
-        from database.mapeoCanchas import EstadoReserva
-        
-        # Obtener el ID del estado "Confirmada"
-        estado_confirmada = session.query(EstadoReserva).filter_by(nombre='Confirmada').first()
-        
-        if not estado_confirmada:
+        id_confirmada = _id_estado_reserva(session, 'Confirmada')
+        if id_confirmada is None:
             return []
-        
-        # Obtener solo las reservas confirmadas
-        reservas_confirmadas = session.query(Reserva).filter_by(estado=estado_confirmada.idEstado).all()
-        
+
+        q = (
+            session.query(Reserva, Cliente.nombre, Cliente.apellido, Cliente.mail, Cliente.idCliente)
+            .outerjoin(Pago, Pago.idReserva == Reserva.idReserva)
+            .outerjoin(Cliente, Cliente.idCliente == Reserva.idCliente)
+            .filter(Reserva.estado == id_confirmada, Pago.idPago.is_(None))
+        )
+        if fechaDesde is not None:
+            q = q.filter(Reserva.fechaReservada >= fechaDesde)
+        if fechaHasta is not None:
+            q = q.filter(Reserva.fechaReservada <= fechaHasta)
+        q = q.order_by(Reserva.idReserva)
+        if limit is not None:
+            q = q.limit(limit)
+        if offset:
+            q = q.offset(offset)
+
         reservas_sin_pago = []
-        
-        for reserva in reservas_confirmadas:
-            # Verificar que no tenga pago registrado
-            pago = session.query(Pago).filter_by(idReserva=reserva.idReserva).first()
-            if not pago:
-                reserva_dict = _to_dict(reserva)
-                
-                # Agregar información del cliente
-                cliente = session.get(Cliente, reserva.idCliente)
-                if cliente:
-                    reserva_dict['cliente'] = {
-                        'nombre': cliente.nombre,
-                        'apellido': cliente.apellido,
-                        'mail': cliente.mail
-                    }
-                
-                reservas_sin_pago.append(reserva_dict)
-        
+        for reserva, nombre, apellido, mail, id_cliente in q.all():
+            reserva_dict = _to_dict(reserva)
+            if id_cliente is not None:
+                reserva_dict['cliente'] = {
+                    'nombre': nombre,
+                    'apellido': apellido,
+                    'mail': mail
+                }
+            reservas_sin_pago.append(reserva_dict)
+
         return reservas_sin_pago
-    
+
     finally:
         session.close()
 
@@ -239,42 +271,225 @@ def actualizar_estado_pago(idPago: int, nuevoEstado: str, idEmpleado: int = None
         session.close()
 
 
-def obtener_historial_pagos_cliente(idCliente: int):
+def _consulta_pagos(session):
+    """Pagos con método, estado, reserva y cliente resueltos en un único SELECT."""
+    return (
+        session.query(
+            Pago,
+            MetodoPago.descripcion,
+            EstadoPago.nombre,
+            Reserva.fechaReservada,
+            Cliente.idCliente,
+            Cliente.nombre,
+            Cliente.apellido,
+            Cliente.mail,
+        )
+        .outerjoin(MetodoPago, MetodoPago.idMetodoPago == Pago.metodoPago)
+        .outerjoin(EstadoPago, EstadoPago.idEstado == Pago.estado)
+        .outerjoin(Reserva, Reserva.idReserva == Pago.idReserva)
+        .outerjoin(Cliente, Cliente.idCliente == Reserva.idCliente)
+    )
+
+
+def _filtrar_pagos(q, fechaDesde=None, fechaHasta=None, idEstado=None,
+                   idMetodoPago=None, idCliente=None):
+    """Aplica los filtros comunes (fechaPago inclusiva por día, estado, método, cliente)."""
+    if fechaDesde is not None:
+        q = q.filter(Pago.fechaPago >= datetime.combine(fechaDesde, time.min))
+    if fechaHasta is not None:
+        q = q.filter(Pago.fechaPago < datetime.combine(fechaHasta + timedelta(days=1), time.min))
+    if idEstado is not None:
+        q = q.filter(Pago.estado == idEstado)
+    if idMetodoPago is not None:
+        q = q.filter(Pago.metodoPago == idMetodoPago)
+    if idCliente is not None:
+        q = q.filter(Reserva.idCliente == idCliente)
+    return q
+
+
+def _resumen_pagos(session, **filtros):
+    """Totales (cantidad y monto) general y por estado, calculados en SQL."""
+    base = session.query(
+        func.count(Pago.idPago), func.coalesce(func.sum(Pago.monto), 0.0)
+    ).outerjoin(Reserva, Reserva.idReserva == Pago.idReserva)
+    cantidad, monto_total = _filtrar_pagos(base, **filtros).one()
+
+    por_estado = (
+        session.query(
+            Pago.estado, EstadoPago.nombre,
+            func.count(Pago.idPago), func.coalesce(func.sum(Pago.monto), 0.0)
+        )
+        .outerjoin(EstadoPago, EstadoPago.idEstado == Pago.estado)
+        .outerjoin(Reserva, Reserva.idReserva == Pago.idReserva)
+    )
+    por_estado = _filtrar_pagos(por_estado, **filtros).group_by(Pago.estado, EstadoPago.nombre)
+
+    return {
+        'cantidad': int(cantidad),
+        'montoTotal': round(float(monto_total), 2),
+        'porEstado': [
+            {'estado': id_estado, 'estadoNombre': nombre, 'cantidad': int(cnt), 'montoTotal': round(float(total), 2)}
+            for id_estado, nombre, cnt, total in por_estado.all()
+        ],
+    }
+
+
+def _pago_enriquecido(row, incluir_cliente: bool = True) -> dict:
+    """Arma el dict de un pago a partir de una fila de _consulta_pagos."""
+    pago, metodo_desc, estado_nombre, fecha_reservada, id_cliente, nombre, apellido, mail = row
+    pago_dict = _to_dict(pago)
+    if metodo_desc is not None:
+        pago_dict['metodoPagoNombre'] = metodo_desc
+    if estado_nombre is not None:
+        pago_dict['estadoNombre'] = estado_nombre
+    pago_dict['fechaReservada'] = fecha_reservada.isoformat() if fecha_reservada else None
+    if incluir_cliente and id_cliente is not None:
+        pago_dict['cliente'] = {
+            'idCliente': id_cliente,
+            'nombre': nombre,
+            'apellido': apellido,
+            'mail': mail
+        }
+    return pago_dict
+
+
+def iterar_pagos(session, after: int = None, limit: int = None, incluir_cliente: bool = True,
+                 filas_por_lote: int = 1000, **filtros):
     """
-    Obtiene todos los pagos realizados por un cliente
+    Genera los pagos enriquecidos de a uno, leyendo el cursor por lotes (yield_per)
+
+    Acepta los mismos filtros que `listar_pagos`; la sesión la provee y la
+    cierra quien llama (ver streaming.respuesta_streaming).
+    """
+    q = _filtrar_pagos(_consulta_pagos(session), **filtros)
+    if after is not None:
+        q = q.filter(Pago.idPago > after)
+    q = q.order_by(Pago.idPago)
+    if limit is not None:
+        q = q.limit(limit)
+    for row in q.yield_per(filas_por_lote):
+        yield _pago_enriquecido(row, incluir_cliente)
+
+
+def listar_pagos(fechaDesde=None, fechaHasta=None, idEstado: int = None, idMetodoPago: int = None,
+                 idCliente: int = None, after: int = None, limit: int = None,
+                 resumen: bool = False, incluir_cliente: bool = True):
+    """
+    Lista pagos enriquecidos (método, estado, fechaReservada y cliente) con una sola consulta
+
+    La paginación es por keyset sobre idPago: se devuelven los pagos con
+    idPago > `after`, en orden ascendente, y `nextCursor` es el idPago a usar
+    como `after` en la siguiente página (None si no hay más).
+
+    Returns:
+        dict: {'data': [...], 'nextCursor': int|None, 'resumen': dict|None}
     """
+    filtros = {
+        'fechaDesde': fechaDesde, 'fechaHasta': fechaHasta, 'idEstado': idEstado,
+        'idMetodoPago': idMetodoPago, 'idCliente': idCliente,
+    }
     session = SessionLocal()
     try:
-        # Buscar reservas del cliente
-        reservas = session.query(Reserva).filter_by(idCliente=idCliente).all()
-        
-        pagos = []
-        for reserva in reservas:
-            pago = session.query(Pago).filter_by(idReserva=reserva.idReserva).first()
-            if pago:
-                pago_dict = _to_dict(pago)
-                
-                # Agregar información de la reserva
-                pago_dict['fechaReservada'] = reserva.fechaReservada.isoformat() if reserva.fechaReservada else None
-                
-                # Agregar método de pago
-                metodo = session.get(MetodoPago, pago.metodoPago)
-                if metodo:
-                    pago_dict['metodoPagoNombre'] = metodo.descripcion
-                
-                # Agregar estado
-                estado = session.get(EstadoPago, pago.estado)
-                if estado:
-                    pago_dict['estadoNombre'] = estado.nombre
-                
-                pagos.append(pago_dict)
-        
-        return pagos
-    
+        q = _filtrar_pagos(_consulta_pagos(session), **filtros)
+        if after is not None:
+            q = q.filter(Pago.idPago > after)
+        q = q.order_by(Pago.idPago)
+        if limit is not None:
+            # Se pide una fila extra para saber si existe una página siguiente
+            q = q.limit(limit + 1)
+        rows = q.all()
+
+        next_cursor = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = rows[-1][0].idPago if rows else None
+
+        data = [_pago_enriquecido(row, incluir_cliente) for row in rows]
+
+        return {
+            'data': data,
+            'nextCursor': next_cursor,
+            'resumen': _resumen_pagos(session, **filtros) if resumen else None,
+        }
+
     finally:
         session.close()
 
 
+def obtener_historial_pagos_cliente(idCliente: int, **kwargs):
+    """
+    Obtiene los pagos realizados por un cliente
+
+    Acepta los mismos filtros/paginación que `listar_pagos` y devuelve el
+    mismo formato {'data', 'nextCursor', 'resumen'}.
+    """
+    return listar_pagos(idCliente=idCliente, incluir_cliente=False, **kwargs)
+
+
+# Máximo de parámetros por IN (SQLite limita las variables por sentencia)
+_LOTE_IDS = 500
+
+
+def obtener_pagos_por_reservas(ids=None, desde: int = None, hasta: int = None, session=None) -> dict:
+    """
+    Obtiene el estado de pago de muchas reservas a la vez
+
+    Recibe una lista de idReserva (`ids`) o un rango inclusivo (`desde`/`hasta`)
+    y devuelve {idReserva: {idPago, monto, estado, estadoNombre, metodoPago,
+    metodoPagoNombre, fechaPago}} con un SELECT por lote de ids (o uno solo
+    para el rango). Las reservas sin pago no aparecen en el resultado.
+    """
+    should_close = session is None
+    if session is None:
+        session = SessionLocal()
+
+    try:
+        base = (
+            session.query(
+                Pago.idReserva, Pago.idPago, Pago.monto, Pago.estado, EstadoPago.nombre,
+                Pago.metodoPago, MetodoPago.descripcion, Pago.fechaPago,
+            )
+            .outerjoin(EstadoPago, EstadoPago.idEstado == Pago.estado)
+            .outerjoin(MetodoPago, MetodoPago.idMetodoPago == Pago.metodoPago)
+        )
+
+        if ids is not None:
+            ids = sorted({int(i) for i in ids})
+            consultas = [
+                base.filter(Pago.idReserva.in_(ids[i:i + _LOTE_IDS]))
+                for i in range(0, len(ids), _LOTE_IDS)
+            ]
+        else:
+            q = base
+            if desde is not None:
+                q = q.filter(Pago.idReserva >= desde)
+            if hasta is not None:
+                q = q.filter(Pago.idReserva <= hasta)
+            consultas = [q]
+
+        resultado = {}
+        for q in consultas:
+            for id_reserva, id_pago, monto, estado, estado_nombre, metodo, metodo_desc, fecha_pago in q.all():
+                # Un pago por reserva; si hubiera duplicados se conserva el primero
+                if id_reserva in resultado:
+                    continue
+                resultado[id_reserva] = {
+                    'idPago': id_pago,
+                    'idReserva': id_reserva,
+                    'monto': monto,
+                    'estado': estado,
+                    'estadoNombre': estado_nombre,
+                    'metodoPago': metodo,
+                    'metodoPagoNombre': metodo_desc,
+                    'fechaPago': fecha_pago.strftime('%Y-%m-%d %H:%M:%S') if fecha_pago else None,
+                }
+        return resultado
+
+    finally:
+        if should_close:
+            session.close()
+
+
 def verificar_reserva_pagada(idReserva: int) -> bool:
     """
     Verifica si una reserva tiene un pago confirmado
@@ -303,15 +518,13 @@ def inicializar_estados_y_metodos():
     session = SessionLocal()
     try:
         # Estados de pago
-        estados = ['Pendiente', 'Pagado', 'Cancelado', 'Reembolsado']
-        for nombre in estados:
+        for nombre in ESTADOS_PAGO:
             existe = session.query(EstadoPago).filter_by(nombre=nombre).first()
             if not existe:
                 session.add(EstadoPago(nombre=nombre))
         
         # Métodos de pago
-        metodos = ['Efectivo', 'Tarjeta de Débito', 'Tarjeta de Crédito', 'Transferencia Bancaria', 'MercadoPago']
-        for descripcion in metodos:
+        for descripcion in METODOS_PAGO:
             existe = session.query(MetodoPago).filter_by(descripcion=descripcion).first()
             if not existe:
                 session.add(MetodoPago(descripcion=descripcion))
@@ -0,0 +1,372 @@
+"""
+Motor de precios de reservas
+
+Concentra en un solo lugar las reglas que antes estaban repartidas entre
+ServicioReservas.crear_reserva_slot, pago_service.calcular_monto_reserva y
+basicas.get_precio_cancha_servicio:
+
+- elección del CanchaxServicio "base" de cada cancha
+- detección de canchas techadas por palabras clave
+- iluminación obligatoria en canchas techadas o turnos desde las 18:00
+- servicios que se cobran una sola vez por reserva (SINGLETON_SERVICIOS)
+
+Cada cancha se compila una vez en una TablaPrecios (precio por hora, filas
+CanchaxServicio y flags) que se guarda en caché por proceso. Cotizar muchas
+combinaciones cancha/fecha/horarios/servicios es entonces aritmética sobre
+tablas ya cargadas, sin consultas por fila.
+"""
+import threading
+import time
+from datetime import datetime
+
+from database.mapeoCanchas import (
+    SessionLocal, Cancha, CanchaxServicio, EstadoCancha, Horario, Servicio
+)
+from metricas import contar, contar_cache
+
+
+# Servicios que se cobran una sola vez por reserva (no por turno)
+SINGLETON_SERVICIOS = {6, 8}
+
+# Desde esta hora (inclusive) el turno requiere iluminación
+HORA_ILUMINACION = 18
+
+_PALABRAS_TECHADA = ('tech', 'techada', 'techa', 'cubiert', 'cerrad', 'cubierta')
+_PALABRAS_BASE = ('alquiler', 'cancha', 'renta', 'arriendo')
+
+# Segundos que una tabla cacheada se considera vigente. Acota cuánto puede
+# quedar desactualizado otro proceso que no vio la invalidación.
+TTL_TABLAS = 60.0
+
+_tablas = {}      # idCancha -> (TablaPrecios, instante de carga)
+_horas = {}       # idHorario -> hora de inicio (int) o None
+_lock = threading.Lock()
+
+
+class TablaPrecios:
+    """Precios compilados de una cancha"""
+
+    __slots__ = (
+        'idCancha', 'precioHora', 'techada', 'cxs', 'porServicio',
+        'idCxSBase', 'baseEsNinguno', 'idCxSIluminacion',
+    )
+
+    def __init__(self, idCancha, precioHora, techada, filas):
+        """
+        `filas` es una lista ordenada de (idCxS, idServicio, precioAdicional, descripcion)
+        """
+        self.idCancha = idCancha
+        self.precioHora = float(precioHora or 0.0)
+        self.techada = techada
+        self.cxs = {id_cxs: float(precio or 0.0) for id_cxs, _, precio, _ in filas}
+        self.porServicio = {}
+        for id_cxs, id_serv, precio, _ in filas:
+            self.porServicio.setdefault(id_serv, float(precio or 0.0))
+
+        self.idCxSBase = _elegir_base(filas)
+        base_desc = ''
+        for id_cxs, _, _, desc in filas:
+            if id_cxs == self.idCxSBase:
+                base_desc = (desc or '').strip().lower()
+        self.baseEsNinguno = base_desc == 'ninguno'
+
+        self.idCxSIluminacion = None
+        for id_cxs, _, _, desc in filas:
+            d = (desc or '').lower()
+            if 'ilumin' in d or 'luz' in d:
+                self.idCxSIluminacion = id_cxs
+                break
+
+
+def _elegir_base(filas):
+    """Elige el CanchaxServicio que representa el alquiler de la cancha"""
+    if not filas:
+        return None
+    for id_cxs, _, precio, desc in filas:
+        if not precio and 'ilumin' not in (desc or '').lower():
+            return id_cxs
+    for id_cxs, _, _, desc in filas:
+        if any(k in (desc or '').lower() for k in _PALABRAS_BASE):
+            return id_cxs
+    for id_cxs, _, precio, _ in filas:
+        if not precio:
+            return id_cxs
+    return filas[0][0]
+
+
+def _es_techada(descripcion, nombre, estado_nombre):
+    texto = (descripcion or '').lower()
+    if any(k in texto for k in _PALABRAS_TECHADA):
+        return True
+    clave = ((estado_nombre or '') + ' ' + (nombre or '')).lower()
+    return any(k in clave for k in _PALABRAS_TECHADA)
+
+
+def hora_de(hora_inicio):
+    """Convierte 'HH:MM' / time a la hora entera, o None si no se puede"""
+    if hora_inicio is None:
+        return None
+    try:
+        return int(str(hora_inicio).split(':')[0])
+    except Exception:
+        return None
+
+
+def compilar_tablas(session, ids_cancha) -> dict:
+    """
+    Compila las tablas de precios de varias canchas con dos consultas
+    (canchas + filas CanchaxServicio) sin pasar por la caché.
+    """
+    ids_cancha = sorted({int(i) for i in ids_cancha})
+    if not ids_cancha:
+        return {}
+
+    canchas = (
+        session.query(Cancha.idCancha, Cancha.precioHora, Cancha.descripcion, Cancha.nombre, EstadoCancha.nombre)
+        .outerjoin(EstadoCancha, EstadoCancha.idEstado == Cancha.estado)
+        .filter(Cancha.idCancha.in_(ids_cancha))
+        .all()
+    )
+    filas_por_cancha = {}
+    filas = (
+        session.query(CanchaxServicio.idCancha, CanchaxServicio.idCxS, CanchaxServicio.idServicio,
+                      CanchaxServicio.precioAdicional, Servicio.descripcion)
+        .outerjoin(Servicio, Servicio.idServicio == CanchaxServicio.idServicio)
+        .filter(CanchaxServicio.idCancha.in_(ids_cancha))
+        .order_by(CanchaxServicio.idCxS)
+        .all()
+    )
+    for id_cancha, id_cxs, id_serv, precio, desc in filas:
+        filas_por_cancha.setdefault(id_cancha, []).append((id_cxs, id_serv, precio, desc))
+
+    tablas = {}
+    for id_cancha, precio_hora, descripcion, nombre, estado_nombre in canchas:
+        tablas[id_cancha] = TablaPrecios(
+            id_cancha, precio_hora, _es_techada(descripcion, nombre, estado_nombre),
+            filas_por_cancha.get(id_cancha, []),
+        )
+    return tablas
+
+
+def obtener_tablas(ids_cancha, session=None) -> dict:
+    """Devuelve {idCancha: TablaPrecios}, cargando en un solo lote las que falten"""
+    ahora = time.monotonic()
+    ids_cancha = {int(i) for i in ids_cancha}
+    resultado = {}
+    with _lock:
+        for id_cancha in ids_cancha:
+            entrada = _tablas.get(id_cancha)
+            if entrada and ahora - entrada[1] < TTL_TABLAS:
+                resultado[id_cancha] = entrada[0]
+    faltantes = ids_cancha - resultado.keys()
+    if resultado:
+        contar('cache_requests_total', len(resultado), cache='precios', resultado='hit')
+    if faltantes:
+        contar('cache_requests_total', len(faltantes), cache='precios', resultado='miss')
+    if not faltantes:
+        return resultado
+
+    should_close = session is None
+    if session is None:
+        session = SessionLocal()
+    try:
+        nuevas = compilar_tablas(session, faltantes)
+    finally:
+        if should_close:
+            session.close()
+
+    with _lock:
+        for id_cancha, tabla in nuevas.items():
+            _tablas[id_cancha] = (tabla, ahora)
+    resultado.update(nuevas)
+    return resultado
+
+
+def compilar_tabla(session, idCancha: int):
+    """
+    Compila la tabla de una cancha con `session` (sin leer la caché) y la deja
+    cacheada en lugar de la anterior; None si la cancha no existe.
+    """
+    idCancha = int(idCancha)
+    ahora = time.monotonic()
+    tabla = compilar_tablas(session, [idCancha]).get(idCancha)
+    with _lock:
+        if tabla is None:
+            _tablas.pop(idCancha, None)
+        else:
+            _tablas[idCancha] = (tabla, ahora)
+    return tabla
+
+
+def obtener_tabla(idCancha: int, session=None):
+    """Tabla de precios de una cancha, o None si la cancha no existe"""
+    return obtener_tablas([idCancha], session=session).get(int(idCancha))
+
+
+def horas_de_inicio(ids_horario, session=None) -> dict:
+    """Devuelve {idHorario: hora de inicio entera} para los horarios existentes"""
+    ids_horario = {int(i) for i in ids_horario}
+    with _lock:
+        faltan = ids_horario - _horas.keys()
+    contar_cache('horarios', not faltan)
+    if faltan:
+        should_close = session is None
+        if session is None:
+            session = SessionLocal()
+        try:
+            # Los horarios son pocos: se cargan todos de una vez
+            filas = session.query(Horario.idHorario, Horario.horaInicio).all()
+        finally:
+            if should_close:
+                session.close()
+        with _lock:
+            for id_horario, hora_inicio in filas:
+                _horas[id_horario] = hora_de(hora_inicio)
+    with _lock:
+        return {i: _horas[i] for i in ids_horario if i in _horas}
+
+
+def invalidar_precios(idCancha: int = None):
+    """Descarta la caché de una cancha (o toda, incluidos los horarios)"""
+    with _lock:
+        if idCancha is None:
+            _tablas.clear()
+            _horas.clear()
+        else:
+            _tablas.pop(int(idCancha), None)
+
+
+def cotizar(tabla: TablaPrecios, horas: list, servicios: list, servicios_explicitos: bool = None) -> dict:
+    """
+    Calcula el monto de una reserva sobre una tabla ya compilada
+
+    Args:
+        tabla: TablaPrecios de la cancha
+        horas: hora de inicio (int o None) de cada turno a reservar
+        servicios: idCxS pedidos por el cliente (ya normalizados a int)
+        servicios_explicitos: si el cliente envió servicios (por defecto, bool(servicios))
+
+    Returns:
+        dict con monto, idCxSBase, servicios (idCxS extras cobrados en orden),
+        requiereIluminacion; o {'error': ...} si algún idCxS no es de la cancha
+    """
+    if servicios_explicitos is None:
+        servicios_explicitos = bool(servicios)
+
+    for id_cxs in servicios:
+        if id_cxs not in tabla.cxs:
+            return {'error': f'idCxS {id_cxs} no pertenece a la cancha seleccionada'}
+
+    seleccion = list(servicios)
+    requiere_iluminacion = tabla.techada or any(h is not None and h >= HORA_ILUMINACION for h in horas)
+    if requiere_iluminacion:
+        if tabla.baseEsNinguno:
+            # Con base 'ninguno' no se agrega iluminación; si el cliente no
+            # eligió servicios tampoco se guarda ninguno
+            if not servicios_explicitos:
+                seleccion = []
+        elif tabla.idCxSIluminacion and tabla.idCxSIluminacion not in seleccion:
+            seleccion.append(tabla.idCxSIluminacion)
+
+    num_turnos = len(horas)
+    monto = tabla.precioHora * num_turnos
+    extras = []
+    singletons = set()
+    for id_cxs in seleccion:
+        if id_cxs == tabla.idCxSBase:
+            continue
+        precio = tabla.cxs.get(id_cxs)
+        if precio is None:
+            continue
+        if id_cxs in SINGLETON_SERVICIOS:
+            if id_cxs not in singletons:
+                monto += precio
+                singletons.add(id_cxs)
+        else:
+            monto += precio * num_turnos
+        extras.append(id_cxs)
+
+    return {
+        'monto': monto,
+        'idCxSBase': tabla.idCxSBase,
+        'servicios': extras,
+        'requiereIluminacion': requiere_iluminacion,
+    }
+
+
+def monto_por_detalles(tabla: TablaPrecios, num_turnos: int, extras: list) -> float:
+    """Monto de una reserva ya registrada a partir de sus turnos y CxS extra"""
+    monto = tabla.precioHora * num_turnos
+    for id_cxs in extras:
+        precio = tabla.cxs.get(id_cxs, 0.0)
+        monto += precio if id_cxs in SINGLETON_SERVICIOS else precio * num_turnos
+    return monto
+
+
+def cotizar_lote(items: list) -> list:
+    """
+    Cotiza muchas combinaciones de una vez
+
+    Cada item: {idCancha, fecha?, horarios: [idHorario], servicios?: [idCxS]}.
+    Las tablas de todas las canchas y los horarios se cargan en un solo lote;
+    cada resultado repite idCancha/fecha/horarios y agrega monto o error.
+    """
+    ids_cancha = set()
+    ids_horario = set()
+    normalizados = []
+    for item in items:
+        item = item if isinstance(item, dict) else {}
+        salida = {'idCancha': item.get('idCancha'), 'fecha': item.get('fecha'), 'horarios': item.get('horarios')}
+        try:
+            id_cancha = int(item.get('idCancha'))
+            horarios = [int(h) for h in (item.get('horarios') or [])]
+        except (TypeError, ValueError):
+            salida['error'] = 'idCancha y horarios deben ser enteros'
+            normalizados.append((salida, None))
+            continue
+        # Igual que al reservar: los servicios no numéricos se ignoran
+        servicios_raw = item.get('servicios') if isinstance(item.get('servicios'), list) else []
+        servicios = []
+        for s in servicios_raw:
+            try:
+                servicios.append(int(s))
+            except (TypeError, ValueError):
+                continue
+        if item.get('fecha') is not None:
+            try:
+                datetime.fromisoformat(str(item['fecha'])).date()
+            except ValueError:
+                salida['error'] = 'fecha debe tener formato YYYY-MM-DD'
+                normalizados.append((salida, None))
+                continue
+        if not horarios:
+            salida['error'] = 'Se requiere al menos un idHorario'
+            normalizados.append((salida, None))
+            continue
+        ids_cancha.add(id_cancha)
+        ids_horario.update(horarios)
+        normalizados.append((salida, (id_cancha, horarios, servicios, bool(item.get('servicios')))))
+
+    session = SessionLocal()
+    try:
+        tablas = obtener_tablas(ids_cancha, session=session)
+        horas = horas_de_inicio(ids_horario, session=session)
+    finally:
+        session.close()
+
+    resultados = []
+    for salida, datos in normalizados:
+        if datos is not None:
+            id_cancha, horarios, servicios, explicitos = datos
+            tabla = tablas.get(id_cancha)
+            faltante = next((h for h in horarios if h not in horas), None)
+            if tabla is None:
+                salida['error'] = 'Cancha no encontrada'
+            elif tabla.idCxSBase is None:
+                salida['error'] = 'No existe asociación CanchaxServicio para la cancha seleccionada'
+            elif faltante is not None:
+                salida['error'] = f'Horario {faltante} no existe'
+            else:
+                salida.update(cotizar(tabla, [horas[h] for h in horarios], servicios, explicitos))
+        resultados.append(salida)
+    return resultados
@@ -7,12 +7,10 @@ from database.mapeoCanchas import (
     Reserva,
     DetalleReserva,
     Horario,
-    CanchaxServicio,
-    Cancha,
-    EstadoCancha,
     Cliente as ClienteModel,
     Usuario as UsuarioModel,
 )
+from services import precios_service, eventos_service
 
 
 class ServicioReservas:
@@ -54,7 +52,7 @@ class ServicioReservas:
                     return ({'error': 'Otro proceso está creando reservas. Reintente.'}, 409)
             else:
                 # Try to lock the CanchaxServicio rows for this cancha when possible
-                # We'll do a dummy SELECT FOR UPDATE later after cxs_list is obtained.
+                # We'll do a dummy SELECT FOR UPDATE later after the price table is compiled.
                 pass
 
             # Normalizar entrada
@@ -115,43 +113,14 @@ class ServicioReservas:
             if fecha < _dt.now().date():
                 return ({'error': 'fechaReservada no puede ser anterior a hoy'}, 400)
 
-            # Obtener filas CanchaxServicio para la cancha
-            cxs_list = session.query(CanchaxServicio).filter(CanchaxServicio.idCancha == idCancha).all()
-            if not cxs_list:
+            # Compilar la tabla de precios de la cancha dentro de esta transacción
+            # (fuente de verdad para el cobro); queda cacheada para las cotizaciones
+            tabla = precios_service.compilar_tabla(session, idCancha)
+            if tabla is None:
+                return ({'error': 'Cancha no encontrada'}, 400)
+            if tabla.idCxSBase is None:
                 return ({'error': 'No existe asociación CanchaxServicio para la cancha seleccionada'}, 400)
 
-            cvs_base = None
-            def _desc_of(c):
-                try:
-                    return (c.servicio.descripcion or '').lower()
-                except Exception:
-                    return ''
-
-            for c in cxs_list:
-                try:
-                    desc = _desc_of(c)
-                    if (not c.precioAdicional or float(c.precioAdicional) == 0.0) and 'ilumin' not in desc:
-                        cvs_base = c
-                        break
-                except Exception:
-                    continue
-            if cvs_base is None:
-                for c in cxs_list:
-                    desc = _desc_of(c)
-                    if any(k in desc for k in ('alquiler', 'cancha', 'renta', 'arriendo')):
-                        cvs_base = c
-                        break
-            if cvs_base is None:
-                for c in cxs_list:
-                    try:
-                        if not c.precioAdicional or float(c.precioAdicional) == 0.0:
-                            cvs_base = c
-                            break
-                    except Exception:
-                        continue
-            if cvs_base is None:
-                cvs_base = cxs_list[0]
-
             servicios_selected = data.get('servicios') or []
             if not isinstance(servicios_selected, list):
                 servicios_selected = []
@@ -165,9 +134,8 @@ class ServicioReservas:
                     continue
             servicios_selected = normalized_servicios
 
-            valid_cxs = {c.idCxS: c for c in cxs_list}
             for s_id in servicios_selected:
-                if int(s_id) not in valid_cxs:
+                if int(s_id) not in tabla.cxs:
                     return ({'error': f'idCxS {s_id} no pertenece a la cancha seleccionada'}, 400)
 
             # verificar que el cliente exista
@@ -193,7 +161,7 @@ class ServicioReservas:
             if dialect_name != 'sqlite':
                 try:
                     # Lock the base cvs row and any extras by selecting FOR UPDATE
-                    # Build list of ids to lock (if cvs_base yet unknown, lock by idCancha)
+                    # Build list of ids to lock (locked by idCancha)
                     # Note: SQLAlchemy will translate text('... FOR UPDATE') on supported DBs.
                     session.execute(text('SELECT 1 FROM CanchaxServicio WHERE idCancha = :id FOR UPDATE'), {'id': idCancha})
                 except Exception:
@@ -201,6 +169,7 @@ class ServicioReservas:
                     pass
 
             # verificar que los horarios existan y si hay conflictos
+            horas_inicio = []
             for hid in horarios_to_book:
                 try:
                     hid_int = int(hid)
@@ -209,132 +178,23 @@ class ServicioReservas:
                 hor = session.get(Horario, hid_int)
                 if not hor:
                     return ({'error': f'Horario {hid_int} no existe'}, 400)
+                horas_inicio.append(precios_service.hora_de(hor.horaInicio))
 
                 conflict = (
                     session.query(DetalleReserva)
                     .join(Reserva, DetalleReserva.idReserva == Reserva.idReserva)
-                    .filter(DetalleReserva.idCxS == cvs_base.idCxS, DetalleReserva.idHorario == hid_int, Reserva.fechaReservada == fecha)
+                    .filter(DetalleReserva.idCxS == tabla.idCxSBase, DetalleReserva.idHorario == hid_int, Reserva.fechaReservada == fecha)
                     .first()
                 )
                 if conflict:
                     return ({'error': f'Horario {hid_int} ya reservado'}, 409)
 
-            cancha = session.get(Cancha, idCancha)
-            if not cancha:
-                return ({'error': 'Cancha no encontrada'}, 400)
-
-            # detect techada heuristic
-            is_techada = False
-            try:
-                if cancha and getattr(cancha, 'descripcion', None):
-                    desc_text = (cancha.descripcion or '').lower()
-                    if any(k in desc_text for k in ('tech', 'techada', 'techa', 'cubiert', 'cerrad', 'cubierta')):
-                        is_techada = True
-                if not is_techada:
-                    estado_obj = None
-                    if cancha and getattr(cancha, 'estado', None) is not None:
-                        estado_obj = session.get(EstadoCancha, cancha.estado)
-                    estado_name = (estado_obj.nombre if estado_obj and getattr(estado_obj, 'nombre', None) else '') or ''
-                    cname = (cancha.nombre or '')
-                    key = (estado_name + ' ' + cname).lower()
-                    if any(k in key for k in ('tech', 'techada', 'techa', 'cubiert', 'cerrad', 'cubierta')):
-                        is_techada = True
-            except Exception:
-                is_techada = False
-
-            # Check if any horario is after 18:00 (requires iluminación)
-            requires_iluminacion_by_time = False
-            try:
-                for hid in horarios_to_book:
-                    hor = session.get(Horario, int(hid))
-                    if hor and hor.horaInicio:
-                        # Parse horaInicio (format: "HH:MM" or "HH:MM:SS")
-                        hora_str = str(hor.horaInicio).split(':')[0]
-                        try:
-                            hora_int = int(hora_str)
-                            if hora_int >= 18:  # 18:00 o posterior
-                                requires_iluminacion_by_time = True
-                                break
-                        except Exception:
-                            continue
-            except Exception:
-                pass
-
-            num_turnos = len(horarios_to_book)
-            monto_total = float(cancha.precioHora or 0.0) * num_turnos
-            # Services that should be charged only once per reservation (not per turno)
-            SINGLETON_SERVICIOS = {6, 8}
-
-            extras = []
-            try:
-                # Iluminación is required if:
-                # 1. Cancha is techada, OR
-                # 2. Any horario starts at or after 18:00
-                if is_techada or requires_iluminacion_by_time:
-                    # If the chosen base service is the special 'ninguno', do not
-                    # force-add iluminación even if the cancha is techada. Also
-                    # remove any iluminación ids submitted by the client in this
-                    # case to avoid frontend auto-selection causing it to be saved.
-                    base_desc = ''
-                    try:
-                        base_desc = (cvs_base.servicio.descripcion or '').strip().lower()
-                    except Exception:
-                        base_desc = ''
-
-                    if base_desc == 'ninguno':
-                        # Respect explicit selections from the client: if the
-                        # payload included a non-empty 'servicios' array, assume
-                        # the user intentionally selected those services and
-                        # don't strip them. If the client didn't provide
-                        # servicios (or provided an empty list), then we do not
-                        # force-add iluminación and leave servicios_selected as-is
-                        # (which will typically be empty).
-                        if data.get('servicios'):
-                            # client explicitly provided services: keep them
-                            pass
-                        else:
-                            # no client selection: ensure we don't auto-add
-                            # iluminación (leave servicios_selected empty)
-                            servicios_selected = []
-                    else:
-                        ilum_id = None
-                        for c in valid_cxs.values():
-                            try:
-                                desc = (c.servicio.descripcion or '').lower()
-                                if 'ilumin' in desc or 'luz' in desc:
-                                    ilum_id = c.idCxS
-                                    break
-                            except Exception:
-                                continue
-                        if ilum_id and int(ilum_id) not in [int(x) for x in servicios_selected]:
-                            servicios_selected.append(int(ilum_id))
-            except Exception:
-                pass
-
-            # Some services (e.g. iluminación vs. others) may be one-time fees per reserva
-            seen_singletons = set()
-            for s_id in servicios_selected:
-                s_id_int = int(s_id)
-                if s_id_int == cvs_base.idCxS:
-                    continue
-                cxs = valid_cxs.get(s_id_int)
-                if cxs:
-                    precio = float(cxs.precioAdicional or 0.0)
-                    if s_id_int in SINGLETON_SERVICIOS:
-                        # Charge only once per reservation
-                        if s_id_int not in seen_singletons:
-                            monto_total += precio
-                            seen_singletons.add(s_id_int)
-                    else:
-                        # Charge per turno
-                        monto_total += precio * num_turnos
-                    extras.append(cxs)
-
-            # Debug: mostrar qué servicios fueron finalmente seleccionados y los extras
-            try:
-                print(f"DEBUG crear_reserva_slot: servicios_selected={servicios_selected}, extras={[c.idCxS for c in extras]}, monto_total={monto_total}")
-            except Exception:
-                pass
+            # Reglas de precio (techada/iluminación, servicios de cobro único)
+            cotizacion = precios_service.cotizar(
+                tabla, horas_inicio, servicios_selected, servicios_explicitos=bool(data.get('servicios'))
+            )
+            monto_total = cotizacion['monto']
+            extras = cotizacion['servicios']
 
             # crear reserva y detalles
             r = Reserva(idCliente=idCliente, fechaReservada=fecha, estado=1, monto=monto_total, fechaCreacion=_dt.now())
@@ -342,14 +202,17 @@ class ServicioReservas:
             session.flush()
             created_detalles = []
             for hid in horarios_to_book:
-                d_base = DetalleReserva(idCxS=cvs_base.idCxS, idHorario=hid, idReserva=r.idReserva)
+                d_base = DetalleReserva(idCxS=tabla.idCxSBase, idHorario=hid, idReserva=r.idReserva)
                 session.add(d_base)
                 session.flush()
                 created_detalles.append(d_base.idDetalle)
-                for extra_cxs in extras:
-                    dd = DetalleReserva(idCxS=extra_cxs.idCxS, idHorario=hid, idReserva=r.idReserva)
+                for extra_id in extras:
+                    dd = DetalleReserva(idCxS=extra_id, idHorario=hid, idReserva=r.idReserva)
                     session.add(dd)
 
+            eventos_service.registrar(
+                session, eventos_service.OCUPADO, r.idReserva, turnos=(fecha, {idCancha: sorted(set(horarios_to_book))})
+            )
             session.commit()
 
             return ({'idReserva': r.idReserva, 'detalles': created_detalles, 'monto': monto_total}, 201)
@@ -0,0 +1,47 @@
+"""
+Requests de sólo lectura en el pool de lectura
+
+Los GET de los blueprints y endpoints listados abren todas sus sesiones de
+SessionLocal sobre `read_engine` (PRAGMA query_only, mmap para scans, o la
+réplica de READ_DATABASE_URL), sin tocar el código de cada handler. Si un
+handler de la lista intentara escribir, SQLite lo rechaza con "attempt to
+write a readonly database" en lugar de tomar el lock de las reservas.
+
+Fuera de un request, las funciones de informes de basicas.py ya están
+marcadas con `@de_solo_lectura` (database.py).
+"""
+from flask import g, request
+
+from backend.database import activar_solo_lectura, restaurar_solo_lectura
+
+# Blueprints cuyos GET son siempre lecturas
+BLUEPRINTS_LECTURA = {'informes'}
+
+# Endpoints puntuales de lectura en blueprints que también escriben
+ENDPOINTS_LECTURA = {
+    'reservas_api.reservas_por_cancha',
+    'reservas_api.horarios_libres_por_cancha',
+    'reservas_api.reservas_resumen_por_cancha',
+    'reservas_api.listar_horarios',
+    'reservas_api.reservas_calendar',
+    'clientes.buscar_clientes',
+}
+
+
+def es_de_lectura() -> bool:
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    return request.blueprint in BLUEPRINTS_LECTURA or request.endpoint in ENDPOINTS_LECTURA
+
+
+def init_solo_lectura(app):
+    @app.before_request
+    def _marcar_lectura():
+        if es_de_lectura():
+            g.token_solo_lectura = activar_solo_lectura()
+
+    @app.teardown_request
+    def _desmarcar_lectura(exc):
+        token = g.pop('token_solo_lectura', None)
+        if token is not None:
+            restaurar_solo_lectura(token)
@@ -0,0 +1,99 @@
+"""
+Respuestas JSON en streaming para listados sin límite
+
+Con `?stream=1` (o `?stream=json`) el listado se emite como un arreglo JSON
+que se va escribiendo a medida que se leen las filas; con `?stream=ndjson`
+(o `Accept: application/x-ndjson`) se emite un objeto por línea.
+
+Las filas se leen con `yield_per`, así que la memoria no crece con el tamaño
+de la tabla y el primer byte sale apenas llega el primer lote. La sesión la
+abre el propio generador y se cierra en su `finally`, también si el cliente
+corta la conexión a mitad de camino.
+"""
+from flask import Response, request, stream_with_context
+from sqlalchemy import select
+
+from database.mapeoCanchas import SessionLocal
+from json_provider import dumps_bytes
+from serializers import serializador_filas
+from services.export_service import comprimir_gzip
+
+# Filas por lote leídas del cursor
+FILAS_POR_LOTE = 1000
+
+# Tamaño aproximado de cada escritura hacia el cliente
+TAMANO_BLOQUE = 64 * 1024
+
+_MIMETYPES = {
+    'json': 'application/json',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def formato_streaming():
+    """'json', 'ndjson' o None (respuesta normal) según ?stream= y Accept"""
+    valor = (request.args.get('stream') or '').strip().lower()
+    if valor in ('1', 'true', 'json'):
+        return 'json'
+    if valor == 'ndjson':
+        return 'ndjson'
+    if 'application/x-ndjson' in request.headers.get('Accept', ''):
+        return 'ndjson'
+    return None
+
+
+def _bloques(generar, formato):
+    session = SessionLocal()
+    try:
+        buffer = bytearray(b'[' if formato == 'json' else b'')
+        primero = True
+        for item in generar(session):
+            if formato == 'json':
+                if not primero:
+                    buffer += b','
+                buffer += dumps_bytes(item)
+            else:
+                buffer += dumps_bytes(item)
+                buffer += b'\n'
+            primero = False
+            if len(buffer) >= TAMANO_BLOQUE:
+                yield bytes(buffer)
+                buffer.clear()
+        if formato == 'json':
+            buffer += b']\n'
+        if buffer:
+            yield bytes(buffer)
+    finally:
+        session.close()
+
+
+def respuesta_streaming(generar, formato: str = 'json'):
+    """
+    Arma la respuesta en streaming
+
+    Args:
+        generar: función generar(session) que produce los dicts a emitir;
+            recibe la sesión del generador y no debe cerrarla
+        formato: 'json' (arreglo) o 'ndjson' (un objeto por línea)
+    """
+    bloques = _bloques(generar, formato)
+    headers = {'X-Accel-Buffering': 'no'}
+    if request.accept_encodings['gzip']:
+        bloques = comprimir_gzip(bloques)
+        headers['Content-Encoding'] = 'gzip'
+        headers['Vary'] = 'Accept-Encoding'
+    return Response(stream_with_context(bloques), mimetype=_MIMETYPES[formato], headers=headers)
+
+
+def iterar_objetos(session, stmt, filas_por_lote: int = FILAS_POR_LOTE):
+    """Recorre un select ORM por lotes devolviendo cada entidad"""
+    return session.execute(stmt.execution_options(yield_per=filas_por_lote)).scalars()
+
+
+def iterar_proyeccion(session, cls, campos, filas_por_lote: int = FILAS_POR_LOTE):
+    """Como basicas._proyectar (sólo las columnas `campos` de cls), pero por lotes y como generador"""
+    atributos = cls.__mapper__.column_attrs
+    fn = serializador_filas(campos, [atributos[c].columns[0].type for c in campos])
+    stmt = select(*(getattr(cls, c) for c in campos))
+    for fila in session.execute(stmt.execution_options(yield_per=filas_por_lote)):
+        yield fn(fila)
@@ -0,0 +1,41 @@
+def test_listado_canchas_dentro_del_presupuesto(client, presupuesto_sql):
+    with presupuesto_sql(3, repeticiones=2) as stats:
+        respuesta = client.get('/api/canchas')
+    assert respuesta.status_code == 200
+    assert stats.cantidad >= 1
+
+
+def test_presupuesto_excedido_falla(pytester):
+    pytester.makepyfile(
+        """
+        from sqlalchemy import create_engine, text
+
+        def test_demasiadas_consultas(presupuesto_sql):
+            engine = create_engine('sqlite://')
+            with presupuesto_sql(2):
+                with engine.connect() as conn:
+                    for _ in range(3):
+                        conn.execute(text('SELECT 1'))
+        """
+    )
+    resultado = pytester.runpytest('-p', 'pytest_presupuesto_sql')
+    resultado.assert_outcomes(failed=1)
+    resultado.stdout.fnmatch_lines(['*Se ejecutaron 3 consultas SQL (presupuesto 2*'])
+
+
+def test_sentencia_repetida_falla(pytester):
+    pytester.makepyfile(
+        """
+        from sqlalchemy import create_engine, text
+
+        def test_n_mas_1(presupuesto_sql):
+            engine = create_engine('sqlite://')
+            with presupuesto_sql(10, repeticiones=3):
+                with engine.connect() as conn:
+                    for i in range(3):
+                        conn.execute(text('SELECT :i'), {'i': i})
+        """
+    )
+    resultado = pytester.runpytest('-p', 'pytest_presupuesto_sql')
+    resultado.assert_outcomes(failed=1)
+    resultado.stdout.fnmatch_lines(['*Sentencias repetidas (posible N+1)*'])
@@ -36,3 +36,22 @@ def is_future_or_today(d: date) -> bool:
 
 def json_error(message: str, code: int = 400):
     return {'error': message}, code
+
+
+def parse_fields(text: str, permitidos) -> list:
+    """Parsea `?fields=a,b,c` validando contra las columnas de una clase mapeada
+    (o una lista de nombres). Devuelve None si no se pidió proyección.
+    """
+    if text is None or not str(text).strip():
+        return None
+    if hasattr(permitidos, '__mapper__'):
+        permitidos = [attr.key for attr in permitidos.__mapper__.column_attrs]
+    campos = []
+    for c in str(text).split(','):
+        c = c.strip()
+        if c and c not in campos:
+            campos.append(c)
+    desconocidos = [c for c in campos if c not in permitidos]
+    if desconocidos:
+        raise ValueError(f'Campos desconocidos en fields: {", ".join(desconocidos)}')
+    return campos
@@ -0,0 +1,59 @@
+"""
+Punto de entrada WSGI para producción
+
+    cd backend
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+`python app.py` sigue siendo el servidor de desarrollo (un proceso, debug).
+La configuración de workers, hilos y recarga está en gunicorn.conf.py; este
+módulo sólo crea la app y expone lo que cada worker hace al arrancar.
+"""
+import logging
+import sys
+from pathlib import Path
+
+AQUI = Path(__file__).resolve().parent
+if str(AQUI) not in sys.path:
+    sys.path.insert(0, str(AQUI))
+
+from app import create_app
+
+logger = logging.getLogger(__name__)
+
+app = create_app()
+
+
+def preparar_worker():
+    """
+    Se llama en cada worker después del fork (hook post_worker_init).
+
+    - Descarta las conexiones que pudiera haber heredado del proceso padre
+      (con preload_app el padre ya usó el engine): una conexión SQLite nunca
+      debe usarse desde dos procesos.
+    - Abre las conexiones de los pools de escritura y de lectura
+      (DB_POOL_SIZE cada uno) para que el primer request no pague el
+      connect ni los PRAGMA.
+    - Precarga los catálogos cacheados por proceso: tablas de precios de
+      todas las canchas y horas de inicio de los horarios.
+    """
+    from backend.database import engine, read_engine, DB_POOL_SIZE
+    from database.mapeoCanchas import SessionLocal, Cancha, Horario
+    from services.precios_service import obtener_tablas, horas_de_inicio, invalidar_precios
+
+    for motor in (engine, read_engine):
+        motor.dispose(close=False)
+        conexiones = [motor.connect() for _ in range(DB_POOL_SIZE)]
+        for conexion in conexiones:
+            conexion.close()
+
+    # Lo heredado del padre puede estar viejo: se recompila en este worker
+    invalidar_precios()
+    session = SessionLocal()
+    try:
+        ids_cancha = [fila[0] for fila in session.query(Cancha.idCancha).all()]
+        tablas = obtener_tablas(ids_cancha, session=session)
+        horas = horas_de_inicio([fila[0] for fila in session.query(Horario.idHorario).all()], session=session)
+    finally:
+        session.close()
+    logger.info('Worker listo: %d conexiones en el pool, %d tablas de precios y %d horarios en caché',
+                DB_POOL_SIZE, len(tablas), len(horas))
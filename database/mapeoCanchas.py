@@ -1,3 +1,4 @@
+import logging
 import sys
 import os
 from datetime import date, datetime
@@ -5,130 +6,17 @@ from datetime import date, datetime
 # Añadir el directorio raíz del proyecto al sys.path para permitir importaciones absolutas
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from sqlalchemy import inspect, text
-from backend.database import Base, engine, SessionLocal, DATABASE_URL
+from sqlalchemy import inspect
+from backend.database import Base, engine, SessionLocal, ReadSessionLocal, de_solo_lectura, DATABASE_URL
 from backend.models import (
     TipoDocumento, Cliente, Deporte, Cancha, Horario, Servicio, CanchaxServicio,
     DetalleReserva, Reserva, MetodoPago, Pago, Equipo, Torneo,
     TorneoxCancha, Partido, EquipoxCliente, Permiso, Usuario, Empleado,
-    EstadoCancha, EstadoReserva, EstadoTorneo, EstadoPago
+    EstadoCancha, EstadoReserva, EstadoTorneo, EstadoPago,
+    ESTADOS_PAGO, METODOS_PAGO
 )
 
-
-def ensure_cancha_descripcion_column():
-    """Comprueba si la columna 'descripcion' existe en la tabla Cancha y la crea si falta.
-    Esto permite aplicar una migración sencilla en SQLite sin herramientas externas.
-    """
-    insp = inspect(engine)
-    if 'Cancha' in insp.get_table_names():
-        cols = [c['name'] for c in insp.get_columns('Cancha')]
-        if 'descripcion' not in cols:
-            try:
-                with engine.connect() as conn:
-                    trans = conn.begin()
-                    conn.execute(text('ALTER TABLE Cancha ADD COLUMN descripcion TEXT'))
-                    conn.execute(text("UPDATE Cancha SET descripcion = 'sin techar' WHERE descripcion IS NULL"))
-                    trans.commit()
-                    print("Columna 'descripcion' añadida a la tabla 'Cancha'.")
-                    return True
-            except Exception as e:
-                print(f"Error al añadir la columna 'descripcion': {e}")
-                trans.rollback()
-    return False
-
-
-def ensure_cancha_imagen_column():
-    """Comprueba si la columna 'imagen' existe en la tabla Cancha y la crea si falta.
-    Se usa para añadir una columna ligera sin requerir alembic.
-    """
-    insp = inspect(engine)
-    if 'Cancha' in insp.get_table_names():
-        cols = [c['name'] for c in insp.get_columns('Cancha')]
-        if 'imagen' not in cols:
-            try:
-                with engine.connect() as conn:
-                    trans = conn.begin()
-                    conn.execute(text('ALTER TABLE Cancha ADD COLUMN imagen TEXT'))
-                    # no se establece valor por defecto; dejar NULL cuando no haya imagen
-                    trans.commit()
-                    print("Columna 'imagen' añadida a la tabla 'Cancha'.")
-                    return True
-            except Exception as e:
-                print(f"Error al añadir la columna 'imagen': {e}")
-                try:
-                    trans.rollback()
-                except Exception:
-                    pass
-    return False
-
-
-def ensure_usuario_imagen_column():
-    """Comprueba si la columna 'imagen' existe en la tabla Usuario y la crea si falta.
-    Se usa para añadir una columna ligera sin requerir alembic.
-    """
-    insp = inspect(engine)
-    if 'Usuario' in insp.get_table_names():
-        cols = [c['name'] for c in insp.get_columns('Usuario')]
-        if 'imagen' not in cols:
-            try:
-                with engine.connect() as conn:
-                    trans = conn.begin()
-                    conn.execute(text('ALTER TABLE Usuario ADD COLUMN imagen TEXT'))
-                    # dejar NULL cuando no haya imagen
-                    trans.commit()
-                    print("Columna 'imagen' añadida a la tabla 'Usuario'.")
-                    return True
-            except Exception as e:
-                print(f"Error al añadir la columna 'imagen' a Usuario: {e}")
-                try:
-                    trans.rollback()
-                except Exception:
-                    pass
-    return False
-
-
-def ensure_torneo_imagen_column():
-    """Comprueba si la columna 'imagen' existe en la tabla Torneo y la crea si falta."""
-    insp = inspect(engine)
-    if 'Torneo' in insp.get_table_names():
-        cols = [c['name'] for c in insp.get_columns('Torneo')]
-        if 'imagen' not in cols:
-            try:
-                with engine.connect() as conn:
-                    trans = conn.begin()
-                    conn.execute(text('ALTER TABLE Torneo ADD COLUMN imagen TEXT'))
-                    trans.commit()
-                    print("Columna 'imagen' añadida a la tabla 'Torneo'.")
-                    return True
-            except Exception as e:
-                print(f"Error al añadir la columna 'imagen' a Torneo: {e}")
-                try:
-                    trans.rollback()
-                except Exception:
-                    pass
-    return False
-
-
-def ensure_torneo_max_integrantes_column():
-    """Comprueba si la columna 'maxIntegrantes' existe en la tabla Torneo y la crea si falta."""
-    insp = inspect(engine)
-    if 'Torneo' in insp.get_table_names():
-        cols = [c['name'] for c in insp.get_columns('Torneo')]
-        if 'maxIntegrantes' not in cols:
-            try:
-                with engine.connect() as conn:
-                    trans = conn.begin()
-                    conn.execute(text('ALTER TABLE Torneo ADD COLUMN maxIntegrantes INTEGER DEFAULT 5'))
-                    trans.commit()
-                    print("Columna 'maxIntegrantes' añadida a la tabla 'Torneo'.")
-                    return True
-            except Exception as e:
-                print(f"Error al añadir la columna 'maxIntegrantes' a Torneo: {e}")
-                try:
-                    trans.rollback()
-                except Exception:
-                    pass
-    return False
+logger = logging.getLogger(__name__)
 
 
 def seed_minimal_demo():
@@ -136,10 +24,10 @@ def seed_minimal_demo():
     session = SessionLocal()
     try:
         if session.query(TipoDocumento).first():
-            print("La base de datos ya contiene datos. Se omite el seed.")
+            logger.info('La base de datos ya contiene datos. Se omite el seed.')
             return
 
-        print("Insertando datos de demostración (seed)...")
+        logger.info('Insertando datos de demostración (seed)...')
         
         td = TipoDocumento(nombre="DNI")
         session.add(td)
@@ -149,17 +37,19 @@ def seed_minimal_demo():
         # Por brevedad, no se repite aquí, pero se asume que está presente.
 
         session.commit()
-        print("Seed demo insertado correctamente.")
+        logger.info('Seed demo insertado correctamente.')
 
     except Exception as e:
         session.rollback()
-        print(f"Error al insertar seed demo: {e}")
+        logger.error("Error al insertar seed demo: %s", e)
     finally:
         session.close()
 
 
 if __name__ == "__main__":
-    print("Inicializando la base de datos...")
+    from backend.logging_config import configurar_logging
+    configurar_logging()
+    logger.info('Inicializando la base de datos...')
     
     inspector = inspect(engine)
     existing_tables = inspector.get_table_names()
@@ -169,23 +59,24 @@ if __name__ == "__main__":
     missing_tables = set(all_model_tablenames) - set(existing_tables)
 
     if not missing_tables and existing_tables:
-        print("La base de datos ya parece estar inicializada. No se realizarán cambios en las tablas.")
+        logger.info('La base de datos ya parece estar inicializada. No se realizarán cambios en las tablas.')
     else:
         if missing_tables:
-            print(f"Tablas faltantes detectadas: {', '.join(missing_tables)}. Creando...")
+            logger.info('Tablas faltantes detectadas: %s. Creando...', ', '.join(missing_tables))
             missing_table_objects = [Base.metadata.tables[name] for name in missing_tables]
             Base.metadata.create_all(bind=engine, tables=missing_table_objects)
-            print("Tablas faltantes creadas correctamente.")
+            logger.info('Tablas faltantes creadas correctamente.')
         else:
-            print("No se encontraron tablas. Creando todo el esquema...")
+            logger.info('No se encontraron tablas. Creando todo el esquema...')
             Base.metadata.create_all(bind=engine)
-            print("Esquema creado exitosamente.")
+            logger.info('Esquema creado exitosamente.')
             # Ejecutar el seeder solo si la base de datos se creó desde cero
             seed_minimal_demo()
 
-    # Ejecutar migraciones simples si es necesario
-    ensure_cancha_descripcion_column()
-    ensure_cancha_imagen_column()
-    ensure_usuario_imagen_column()
+    # Columnas agregadas después del esquema original y catálogos por defecto
+    from database.migraciones import aplicar_migraciones
+    aplicadas = aplicar_migraciones()
+    if aplicadas:
+        logger.info('Migraciones aplicadas: %s', aplicadas)
 
-    print("Proceso de inicialización finalizado.")
\ No newline at end of file
+    logger.info('Proceso de inicialización finalizado.')
\ No newline at end of file
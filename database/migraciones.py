@@ -0,0 +1,330 @@
+"""
+Migraciones de esquema versionadas
+
+La tabla SchemaVersion guarda una fila por migración aplicada. Al arrancar,
+aplicar_migraciones() lee un solo entero (MAX(version)); si ya es la última
+no hace nada más. Si hay pasos pendientes, toma el lock de escritura de la
+base (BEGIN IMMEDIATE en SQLite), vuelve a leer la versión (otro worker pudo
+haberlas aplicado mientras esperaba) y aplica en orden los que falten, cada
+uno con su fila en SchemaVersion, todo en la misma transacción.
+
+Para agregar una migración: escribir una función `_nombre(conn)` idempotente
+y sumarla al final de MIGRACIONES con el número siguiente. Nunca renumerar
+ni modificar una migración ya publicada.
+
+Uso manual (desde la raíz del proyecto):
+    python database/migraciones.py            # aplica las pendientes
+    python database/migraciones.py --estado   # muestra versión actual y pendientes
+"""
+import argparse
+import logging
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError, OperationalError, ProgrammingError
+
+from backend.database import engine as engine_por_defecto
+
+logger = logging.getLogger(__name__)
+
+TABLA_VERSION = 'SchemaVersion'
+
+
+def _columnas(conn, tabla):
+    """Columnas de la tabla, o None si la tabla no existe"""
+    if conn.dialect.name == 'sqlite':
+        filas = conn.exec_driver_sql(f'PRAGMA table_info("{tabla}")').fetchall()
+        return {f[1] for f in filas} if filas else None
+    from sqlalchemy import inspect
+    insp = inspect(conn)
+    if not insp.has_table(tabla):
+        return None
+    return {c['name'] for c in insp.get_columns(tabla)}
+
+
+def _agregar_columna(conn, tabla, columna, definicion):
+    columnas = _columnas(conn, tabla)
+    if columnas is None or columna in columnas:
+        return False
+    conn.exec_driver_sql(f'ALTER TABLE "{tabla}" ADD COLUMN "{columna}" {definicion}')
+    logger.info("Columna '%s' añadida a la tabla '%s'", columna, tabla)
+    return True
+
+
+def _sembrar_catalogo(conn, tabla, columna, valores):
+    if _columnas(conn, tabla) is None:
+        return
+    existentes = {r[0] for r in conn.execute(text(f'SELECT "{columna}" FROM "{tabla}"'))}
+    faltantes = [{'valor': v} for v in valores if v not in existentes]
+    if faltantes:
+        conn.execute(text(f'INSERT INTO "{tabla}" ("{columna}") VALUES (:valor)'), faltantes)
+
+
+# --- Migraciones (en orden; cada una idempotente) ---
+
+def _columnas_cancha(conn):
+    if _agregar_columna(conn, 'Cancha', 'descripcion', 'TEXT'):
+        conn.exec_driver_sql("UPDATE \"Cancha\" SET descripcion = 'sin techar' WHERE descripcion IS NULL")
+    _agregar_columna(conn, 'Cancha', 'imagen', 'TEXT')
+
+
+def _columnas_usuario_torneo(conn):
+    _agregar_columna(conn, 'Usuario', 'imagen', 'TEXT')
+    _agregar_columna(conn, 'Torneo', 'imagen', 'TEXT')
+    _agregar_columna(conn, 'Torneo', 'maxIntegrantes', 'INTEGER DEFAULT 5')
+
+
+def _columnas_pago(conn):
+    # Antes en migrate_pago.py
+    _agregar_columna(conn, 'Pago', 'comprobante', 'TEXT')
+    _agregar_columna(conn, 'Pago', 'detalles', 'TEXT')
+    _agregar_columna(conn, 'Pago', 'idEmpleado', 'INTEGER')
+
+
+def _tipos_documento(conn):
+    # Antes en create_app: sólo si la tabla está vacía
+    if _columnas(conn, 'TipoDoc') is None:
+        return
+    if conn.exec_driver_sql('SELECT COUNT(*) FROM "TipoDoc"').scalar() == 0:
+        _sembrar_catalogo(conn, 'TipoDoc', 'nombre', ['DNI', 'LC', 'LE', 'PASAPORTE'])
+
+
+def _estados_y_metodos_pago(conn):
+    # Las listas se comparten con pago_service.inicializar_estados_y_metodos
+    from backend.models import ESTADOS_PAGO, METODOS_PAGO
+    _sembrar_catalogo(conn, 'EstadoPago', 'nombre', ESTADOS_PAGO)
+    _sembrar_catalogo(conn, 'MetodoPago', 'descripcion', METODOS_PAGO)
+
+
+def _triggers_version(conn, tablas):
+    """Triggers que incrementan VersionDatos ante cualquier cambio en `tablas`"""
+    for tabla in tablas:
+        if _columnas(conn, tabla) is None:
+            continue
+        for operacion in ('INSERT', 'UPDATE', 'DELETE'):
+            conn.exec_driver_sql(
+                f'CREATE TRIGGER IF NOT EXISTS "version_{tabla}_{operacion.lower()}" '
+                f'AFTER {operacion} ON "{tabla}" '
+                'BEGIN UPDATE "VersionDatos" SET version = version + 1 WHERE id = 1; END'
+            )
+
+
+def _version_datos(conn):
+    """
+    Contador global de cambios mantenido por triggers (sólo SQLite). Sus
+    cambios invalidan los informes guardados (services/informes_jobs_service.py).
+    """
+    if conn.dialect.name != 'sqlite':
+        return
+    conn.exec_driver_sql(
+        'CREATE TABLE IF NOT EXISTS "VersionDatos" (id INTEGER PRIMARY KEY CHECK (id = 1), version INTEGER NOT NULL)'
+    )
+    conn.exec_driver_sql('INSERT OR IGNORE INTO "VersionDatos" (id, version) VALUES (1, 0)')
+    _triggers_version(conn, ['Reserva', 'DetalleReserva', 'Pago', 'Cliente', 'Cancha', 'CanchaxServicio', 'Deporte'])
+
+
+def _eventos_disponibilidad(conn):
+    """Registro de turnos ocupados/liberados que lee el stream SSE (services/eventos_service.py)"""
+    if conn.dialect.name != 'sqlite':
+        return
+    conn.exec_driver_sql(
+        'CREATE TABLE IF NOT EXISTS "EventoDisponibilidad" ('
+        'idEvento INTEGER PRIMARY KEY AUTOINCREMENT, tipo VARCHAR(20) NOT NULL, idCancha INTEGER, '
+        'fecha VARCHAR(10), idReserva INTEGER, horarios VARCHAR(200), creado VARCHAR(19) NOT NULL)'
+    )
+
+
+def _busqueda_clientes(conn):
+    """
+    Índice FTS5 de clientes (services/busqueda_service.py): una fila por
+    cliente (rowid = idCliente) con sus datos y el nombre de usuario vinculado,
+    mantenido por triggers en Cliente y Usuario.
+    """
+    if conn.dialect.name != 'sqlite' or _columnas(conn, 'Cliente') is None:
+        return
+    try:
+        conn.exec_driver_sql(
+            'CREATE VIRTUAL TABLE IF NOT EXISTS "ClienteFTS" USING fts5('
+            "nombre, apellido, mail, numeroDoc, telefono, usuario, "
+            "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+        )
+    except OperationalError as e:
+        # SQLite compilado sin FTS5: la búsqueda usa LIKE
+        logger.warning('No se pudo crear el índice de búsqueda de clientes: %s', e)
+        return
+    insertar_nuevo = (
+        'INSERT INTO "ClienteFTS" (rowid, nombre, apellido, mail, numeroDoc, telefono, usuario) '
+        'SELECT new."idCliente", new.nombre, new.apellido, new.mail, new."numeroDoc", new.telefono, '
+        '(SELECT u.usuario FROM "Usuario" u WHERE u."idUsuario" = new."idUsuario"); '
+    )
+    conn.exec_driver_sql(
+        'CREATE TRIGGER IF NOT EXISTS "clientefts_insert" AFTER INSERT ON "Cliente" BEGIN '
+        f'{insertar_nuevo}END'
+    )
+    conn.exec_driver_sql(
+        'CREATE TRIGGER IF NOT EXISTS "clientefts_update" AFTER UPDATE ON "Cliente" BEGIN '
+        'DELETE FROM "ClienteFTS" WHERE rowid = old."idCliente"; '
+        f'{insertar_nuevo}END'
+    )
+    conn.exec_driver_sql(
+        'CREATE TRIGGER IF NOT EXISTS "clientefts_delete" AFTER DELETE ON "Cliente" BEGIN '
+        'DELETE FROM "ClienteFTS" WHERE rowid = old."idCliente"; END'
+    )
+    conn.exec_driver_sql(
+        'CREATE TRIGGER IF NOT EXISTS "clientefts_usuario_update" AFTER UPDATE OF usuario ON "Usuario" BEGIN '
+        'UPDATE "ClienteFTS" SET usuario = new.usuario '
+        'WHERE rowid IN (SELECT "idCliente" FROM "Cliente" WHERE "idUsuario" = new."idUsuario"); END'
+    )
+    conn.exec_driver_sql(
+        'CREATE TRIGGER IF NOT EXISTS "clientefts_usuario_delete" AFTER DELETE ON "Usuario" BEGIN '
+        'UPDATE "ClienteFTS" SET usuario = NULL '
+        'WHERE rowid IN (SELECT "idCliente" FROM "Cliente" WHERE "idUsuario" = old."idUsuario"); END'
+    )
+    # Carga inicial con los clientes existentes
+    conn.exec_driver_sql('DELETE FROM "ClienteFTS"')
+    conn.exec_driver_sql(
+        'INSERT INTO "ClienteFTS" (rowid, nombre, apellido, mail, numeroDoc, telefono, usuario) '
+        'SELECT c."idCliente", c.nombre, c.apellido, c.mail, c."numeroDoc", c.telefono, u.usuario '
+        'FROM "Cliente" c LEFT JOIN "Usuario" u ON u."idUsuario" = c."idUsuario"'
+    )
+
+
+# Tablas históricas que se mueven al archivo (services/archivo_service.py)
+TABLAS_ARCHIVADAS = ['Reserva', 'DetalleReserva', 'Pago']
+
+
+def _archivo_reservas(conn):
+    """
+    Tablas frías ReservaArchivo, DetalleReservaArchivo y PagoArchivo (sólo
+    SQLite): mismas columnas y tipos que las tablas de origen, sin claves
+    foráneas, con índices para las consultas de informes.
+    """
+    if conn.dialect.name != 'sqlite':
+        return
+    for tabla in TABLAS_ARCHIVADAS:
+        filas = conn.exec_driver_sql(f'PRAGMA table_info("{tabla}")').fetchall()
+        if not filas:
+            continue
+        columnas = ', '.join(f'"{f[1]}" {f[2]}' + (' PRIMARY KEY' if f[5] else '') for f in filas)
+        conn.exec_driver_sql(f'CREATE TABLE IF NOT EXISTS "{tabla}Archivo" ({columnas})')
+    indices = [
+        ('ReservaArchivo', 'fechaReservada'),
+        ('ReservaArchivo', 'idCliente'),
+        ('DetalleReservaArchivo', 'idReserva'),
+        ('DetalleReservaArchivo', 'idCxS'),
+        ('PagoArchivo', 'idReserva'),
+    ]
+    for tabla, columna in indices:
+        if _columnas(conn, tabla) is not None:
+            conn.exec_driver_sql(f'CREATE INDEX IF NOT EXISTS "ix_{tabla}_{columna}" ON "{tabla}" ("{columna}")')
+
+
+def _version_datos_tipo_doc(conn):
+    """
+    Triggers de VersionDatos también en TipoDoc (reporte-reservas-cancha
+    muestra el nombre del tipo de documento). Se incrementa la versión una vez
+    para descartar los resultados guardados sin ese trigger.
+    """
+    if conn.dialect.name != 'sqlite' or _columnas(conn, 'VersionDatos') is None:
+        return
+    _triggers_version(conn, ['TipoDoc'])
+    conn.exec_driver_sql('UPDATE "VersionDatos" SET version = version + 1 WHERE id = 1')
+
+
+MIGRACIONES = [
+    (1, 'columnas descripcion e imagen de Cancha', _columnas_cancha),
+    (2, 'columnas imagen de Usuario/Torneo y maxIntegrantes', _columnas_usuario_torneo),
+    (3, 'columnas comprobante, detalles e idEmpleado de Pago', _columnas_pago),
+    (4, 'tipos de documento por defecto', _tipos_documento),
+    (5, 'estados y métodos de pago', _estados_y_metodos_pago),
+    (6, 'versión de datos para los informes en segundo plano', _version_datos),
+    (7, 'eventos de disponibilidad para el stream SSE', _eventos_disponibilidad),
+    (8, 'índice de búsqueda de clientes (FTS5)', _busqueda_clientes),
+    (9, 'tablas de archivo de reservas históricas', _archivo_reservas),
+    (10, 'versión de datos también al cambiar tipos de documento', _version_datos_tipo_doc),
+]
+ULTIMA_VERSION = MIGRACIONES[-1][0]
+
+
+def _leer_version(conn):
+    """Versión aplicada, o None si la tabla de versiones todavía no existe"""
+    try:
+        return conn.exec_driver_sql(f'SELECT MAX(version) FROM "{TABLA_VERSION}"').scalar() or 0
+    except (OperationalError, ProgrammingError):
+        return None
+
+
+def version_actual(engine=None) -> int:
+    with (engine or engine_por_defecto).connect() as conn:
+        return _leer_version(conn) or 0
+
+
+def aplicar_migraciones(engine=None) -> list:
+    """Aplica las migraciones pendientes y devuelve los números aplicados"""
+    engine = engine or engine_por_defecto
+    with engine.connect() as conn:
+        if _leer_version(conn) == ULTIMA_VERSION:
+            return []
+        if _columnas(conn, 'Cancha') is None:
+            # Base sin esquema (todavía no se corrió mapeoCanchas.py): no registrar
+            # versiones que no se aplicaron de verdad
+            logger.warning('La base no tiene el esquema creado; se omiten las migraciones')
+            return []
+
+    with engine.connect() as conn:
+        if conn.dialect.name == 'sqlite':
+            # Lock de escritura: los demás workers esperan (busy_timeout) hasta el commit
+            conn.exec_driver_sql('BEGIN IMMEDIATE')
+        try:
+            conn.exec_driver_sql(
+                f'CREATE TABLE IF NOT EXISTS "{TABLA_VERSION}" ('
+                'version INTEGER PRIMARY KEY, nombre VARCHAR(200) NOT NULL, fechaAplicada VARCHAR(19) NOT NULL)'
+            )
+            actual = _leer_version(conn) or 0
+            aplicadas = []
+            for version, nombre, migrar in MIGRACIONES:
+                if version <= actual:
+                    continue
+                migrar(conn)
+                conn.execute(
+                    text(f'INSERT INTO "{TABLA_VERSION}" (version, nombre, fechaAplicada) VALUES (:v, :n, :f)'),
+                    {'v': version, 'n': nombre, 'f': datetime.now().strftime('%Y-%m-%d %H:%M:%S')},
+                )
+                aplicadas.append(version)
+            conn.commit()
+        except IntegrityError:
+            # Otro proceso registró la misma versión primero (motores sin BEGIN IMMEDIATE)
+            conn.rollback()
+            return []
+        except Exception:
+            conn.rollback()
+            raise
+
+    for version in aplicadas:
+        logger.info('Migración %d aplicada: %s', version, dict((v, n) for v, n, _ in MIGRACIONES)[version])
+    return aplicadas
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Migraciones de esquema versionadas')
+    parser.add_argument('--estado', action='store_true', help='mostrar la versión actual sin aplicar nada')
+    args = parser.parse_args()
+
+    from backend.logging_config import configurar_logging
+    configurar_logging()
+    if args.estado:
+        actual = version_actual()
+        pendientes = [f'{v} ({n})' for v, n, _ in MIGRACIONES if v > actual]
+        logger.info('Versión actual: %d de %d', actual, ULTIMA_VERSION)
+        logger.info('Pendientes: %s', ', '.join(pendientes) or 'ninguna')
+        return
+    aplicadas = aplicar_migraciones()
+    logger.info('Migraciones aplicadas: %s', aplicadas or 'ninguna (el esquema está al día)')
+
+
+if __name__ == '__main__':
+    main()
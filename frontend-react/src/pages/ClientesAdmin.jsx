@@ -57,29 +57,11 @@ export default function ClientesAdmin(){
   async function fetchClientes(){
     setLoading(true)
     try{
-      const res = await fetch('/api/clientes')
+      // include=usuario: el usuario de cada cliente viene en la misma respuesta
+      const res = await fetch('/api/clientes?include=usuario')
       if (!res.ok) throw new Error('Error al obtener clientes')
       const data = await res.json()
-      
-      // For each cliente, fetch their usuario info
-      const clientesConUsuarios = await Promise.all(
-        data.map(async (cli) => {
-          if (cli.idUsuario) {
-            try {
-              const userRes = await fetch(`/api/usuarios/${cli.idUsuario}`)
-              if (userRes.ok) {
-                const userData = await userRes.json()
-                return { ...cli, usuario: userData }
-              }
-            } catch(e) {
-              console.error('Error fetching usuario:', e)
-            }
-          }
-          return cli
-        })
-      )
-      
-      setClientes(clientesConUsuarios)
+      setClientes(data)
     }catch(e){
       console.error(e)
       alert('Error al cargar clientes')
@@ -98,20 +98,25 @@ export default function ProximasReservas(){
       console.log('Reservas filtradas (futuras de hoy):', futureReservas.length)
       setReservas(futureReservas)
 
-      // Cargar información de pagos para cada reserva
+      // Cargar información de pagos de todas las reservas en una sola llamada
       const pagosMapTemp = {}
-      await Promise.all(futureReservas.map(async (r) => {
+      if (futureReservas.length > 0) {
         try {
-          const pagoRes = await fetch(`/api/pagos/reserva/${r.idReserva}`)
+          const pagoRes = await fetch('/api/pagos/reservas', {
+            method: 'POST',
+            headers: {'Content-Type':'application/json'},
+            body: JSON.stringify({ ids: futureReservas.map(r => r.idReserva) })
+          })
           if (pagoRes.ok) {
-            const pagoData = await pagoRes.json()
-            pagosMapTemp[r.idReserva] = pagoData
+            const pagosData = await pagoRes.json()
+            for (const [idReserva, pago] of Object.entries(pagosData)) {
+              if (pago) pagosMapTemp[idReserva] = pago
+            }
           }
         } catch(e) {
-          // No hay pago para esta reserva
-          console.log('No se encontró pago para reserva', r.idReserva)
+          console.log('No se pudieron cargar los pagos de las reservas', e)
         }
-      }))
+      }
       setPagosMap(pagosMapTemp)
 
       // Fetch cancha, deporte, and service info
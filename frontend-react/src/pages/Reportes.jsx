@@ -1157,16 +1157,29 @@ function ModalReporte({ tipo, onClose, onGenerar }) {
   const [year, setYear] = React.useState(new Date().getFullYear())
   const [canchas, setCanchas] = React.useState([])
   const [clientes, setClientes] = React.useState([])
+  const [busquedaCliente, setBusquedaCliente] = React.useState('')
 
   React.useEffect(() => {
     if (tipo === 'reservas-cancha') {
       fetch('/api/canchas').then(r => r.json()).then(setCanchas)
     }
-    if (tipo === 'reservas-cliente') {
-      fetch('/api/clientes').then(r => r.json()).then(setClientes)
-    }
   }, [tipo])
 
+  // Los clientes se buscan en el servidor mientras se tipea (no se descarga la lista completa)
+  React.useEffect(() => {
+    if (tipo !== 'reservas-cliente') return
+    const q = busquedaCliente.trim()
+    if (q.length < 2) { setClientes([]); return }
+    const controller = new AbortController()
+    const timer = setTimeout(() => {
+      fetch(`/api/clientes/buscar?q=${encodeURIComponent(q)}&limit=20`, { signal: controller.signal })
+        .then(r => r.json())
+        .then(data => setClientes(data.resultados || []))
+        .catch(() => {})
+    }, 200)
+    return () => { clearTimeout(timer); controller.abort() }
+  }, [tipo, busquedaCliente])
+
   const handleGenerar = () => {
     onGenerar({ fechaDesde, fechaHasta, idCancha, idCliente, year })
   }
@@ -1281,6 +1294,21 @@ function ModalReporte({ tipo, onClose, onGenerar }) {
               <label style={{ display: 'block', fontSize: 14, marginBottom: 6, fontWeight: 500 }}>
                 Cliente (opcional)
               </label>
+              <input
+                type="text"
+                placeholder="Buscar por nombre, documento o mail..."
+                value={busquedaCliente}
+                onChange={(e) => setBusquedaCliente(e.target.value)}
+                style={{
+                  width: '100%',
+                  padding: '10px 12px',
+                  border: '1px solid #ddd',
+                  borderRadius: 6,
+                  fontSize: 14,
+                  marginBottom: 6,
+                  boxSizing: 'border-box'
+                }}
+              />
               <select
                 value={idCliente}
                 onChange={(e) => setIdCliente(e.target.value)}
@@ -1,5 +1,6 @@
-import React, { useEffect, useState, useMemo } from 'react'
+import React, { useEffect, useState, useMemo, useRef } from 'react'
 import { parseLocalDate, toYMD } from '../utils/dateUtils'
+import { suscribirDisponibilidad } from '../utils/disponibilidadStream'
 import { useLocation, Link, useNavigate } from 'react-router-dom'
 
 function useQuery() {
@@ -566,6 +567,36 @@ export default function Reservas(){
   // recompute when inputs that affect availability change
   }, [idCancha, horarios, events, weekStart, requestedTurns])
 
+  // Turnos que otros usuarios ocupan o liberan mientras la página está abierta:
+  // el servidor los empuja por SSE y se aplican sobre `events` sin volver a consultar.
+  // Si el stream no está disponible se vuelve a pedir la semana visible cada tanto.
+  const recargarSemanaRef = useRef(null)
+  recargarSemanaRef.current = () => loadEventsForWeek(weekStart)
+  useEffect(()=>{
+    if (!idCancha || typeof EventSource === 'undefined') return
+    return suscribirDisponibilidad({
+      url: `/api/stream/disponibilidad?idCancha=${idCancha}`,
+      refrescar: () => recargarSemanaRef.current(),
+      handlers: {
+        ocupado: (msg)=>{
+          try{
+            const ev = JSON.parse(msg.data)
+            setEvents(prev => [
+              ...prev.filter(e => !(e.idReserva === ev.idReserva && e.fechaReservada === ev.fecha)),
+              ...ev.horarios.map(idHorario => ({ idReserva: ev.idReserva, idHorario, fechaReservada: ev.fecha }))
+            ])
+          }catch(e){ console.error('Evento de disponibilidad inválido', e) }
+        },
+        liberado: (msg)=>{
+          try{
+            const ev = JSON.parse(msg.data)
+            setEvents(prev => prev.filter(e => !(e.idReserva === ev.idReserva && e.fechaReservada === ev.fecha)))
+          }catch(e){ console.error('Evento de disponibilidad inválido', e) }
+        },
+      },
+    })
+  }, [idCancha])
+
   function computeModalTotal(){
     if (!selectedSlot) return 0
     const servicios = Array.isArray(selectedSlot.servicios) ? selectedSlot.servicios : []
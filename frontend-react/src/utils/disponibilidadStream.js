@@ -0,0 +1,56 @@
+// Suscripción al stream SSE de disponibilidad (/api/stream/disponibilidad)
+// con respaldo por sondeo.
+//
+// Si la conexión se corta, EventSource reconecta solo. Pero si el servidor
+// responde algo distinto de 200 (p. ej. 503 porque el worker ya tiene todas
+// las conexiones que acepta), EventSource queda cerrado para siempre. En ese
+// caso se vuelve a consultar cada REINTENTO_MS con `refrescar` y se reintenta
+// el stream después de ese mismo tiempo (el Retry-After del 503 es 30 s).
+// Al volver a conectar se refresca una vez para recuperar lo que pasó en el medio.
+
+const REINTENTO_MS = 30000
+
+export function suscribirDisponibilidad({ url, handlers, refrescar }){
+  let es = null
+  let timerReintento = null
+  let timerSondeo = null
+  let cerrado = false
+
+  function detenerSondeo(){
+    if (timerSondeo){
+      clearInterval(timerSondeo)
+      timerSondeo = null
+      // Hubo un rato sin stream: lo que cambió mientras tanto no llegó como evento
+      refrescar()
+    }
+  }
+
+  function iniciarSondeo(){
+    if (timerSondeo) return
+    refrescar()
+    timerSondeo = setInterval(refrescar, REINTENTO_MS)
+  }
+
+  function conectar(){
+    if (cerrado) return
+    es = new EventSource(url)
+    Object.entries(handlers).forEach(([tipo, fn]) => es.addEventListener(tipo, fn))
+    es.onopen = detenerSondeo
+    es.onerror = ()=>{
+      // CONNECTING: el navegador ya está reintentando; CLOSED: no va a reintentar
+      if (es.readyState !== EventSource.CLOSED) return
+      es.close()
+      iniciarSondeo()
+      // Con algo de azar para que las pestañas rechazadas no vuelvan todas juntas
+      timerReintento = setTimeout(conectar, REINTENTO_MS + Math.random() * 5000)
+    }
+  }
+
+  conectar()
+  return ()=>{
+    cerrado = true
+    clearTimeout(timerReintento)
+    clearInterval(timerSondeo)
+    if (es) es.close()
+  }
+}
@@ -1,6 +1,7 @@
 """
 Script para inicializar estados de pago y métodos de pago en la base de datos
 """
+import logging
 import sys
 from pathlib import Path
 
@@ -11,9 +12,13 @@ if str(ROOT) not in sys.path:
 
 # Ahora importar
 from backend.services.pago_service import inicializar_estados_y_metodos
+from backend.logging_config import configurar_logging
+
+logger = logging.getLogger(__name__)
 
 if __name__ == '__main__':
-    print("Inicializando estados y métodos de pago...")
+    configurar_logging()
+    logger.info('Inicializando estados y métodos de pago...')
     resultado = inicializar_estados_y_metodos()
-    print(resultado)
-    print("\n✅ Inicialización completada!")
+    logger.info('%s', resultado)
+    logger.info('Inicialización completada')